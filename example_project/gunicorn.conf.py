@@ -0,0 +1,47 @@
+"""Gunicorn configuration for serving many concurrent clients.
+
+The supported Django versions can only be served over WSGI, and the
+default synchronous workers tie up a whole worker for as long as a
+request is open. Running the WSGI application on gevent workers lets
+each worker process keep many mostly idle connections open at once
+(such as long-polling clients) while only the requests doing work use
+the CPU. The settings below are a starting point rather than measured
+limits, so load test them before relying on them.
+
+Run the example project with:
+
+    gunicorn -c gunicorn.conf.py example_project.wsgi
+
+This requires the ``gevent`` package. When using PostgreSQL, the
+``psycogreen`` package should also be installed so that waiting on the
+database yields to other requests instead of blocking the worker.
+"""
+
+import multiprocessing
+
+
+bind = '127.0.0.1:8000'
+
+worker_class = 'gevent'
+
+# One worker per core keeps every core busy, and each worker serves its
+# requests concurrently.
+workers = multiprocessing.cpu_count()
+
+# The most clients each worker will hold open at once. This is an upper
+# bound, not a measured capacity.
+worker_connections = 2000
+
+# Long-polling requests are held open for a while by design, so workers
+# shouldn't be killed for being slow to respond.
+timeout = 120
+
+
+def post_fork(server, worker):
+    """Make the PostgreSQL driver cooperate with gevent if possible."""
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        return
+
+    patch_psycopg()
@@ -18,20 +18,17 @@ setup(
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Environment :: Web Environment',
-        'Framework :: Django :: 1.8',
-        'Framework :: Django :: 1.9',
         'Framework :: Django :: 1.10',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python :: 2.7',
-        'Programming Language :: Python :: 3.3',
         'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
     ],
     packages=find_packages(exclude=['example_project']),
     include_package_data=True,
     install_requires=[
-        'django >= 1.8, < 1.11',
+        'django >= 1.10, < 1.11',
         'djangorestframework',
     ],
     zip_safe=False)
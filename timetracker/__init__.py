@@ -1,2 +1,4 @@
 __version__ = '0.1.0'
 __version_info__ = tuple(map(int, __version__.split('.')))
+
+default_app_config = 'timetracker.apps.TimetrackerConfig'
@@ -0,0 +1,93 @@
+"""Settings for the `timetracker` app.
+
+Each setting can be overridden from a project's settings module by
+prefixing its name with ``TIMETRACKER_``. For example, the default page
+size can be changed by setting ``TIMETRACKER_PAGE_SIZE = 50``.
+"""
+
+from django.conf import settings
+
+
+DEFAULTS = {
+    # The number of activities returned in each page of the list view.
+    'PAGE_SIZE': 100,
+
+    # The largest page size a client may request using the
+    # `page_size` query parameter.
+    'MAX_PAGE_SIZE': 1000,
+
+    # Whether the activity views only show the authenticated user's own
+    # activities. If enabled, every request must be authenticated.
+    'SCOPE_TO_OWNER': False,
+
+    # Whether responses from the activity views are cached.
+    'CACHE_ENABLED': False,
+
+    # The alias of the cache (from the `CACHES` setting) to store
+    # responses in. The number of responses kept is bounded by the
+    # cache's own `MAX_ENTRIES` option.
+    'CACHE_ALIAS': 'default',
+
+    # The number of seconds a cached response is kept for.
+    'CACHE_TIMEOUT': 60,
+
+    # Whether requests are measured by `InstrumentationMiddleware`.
+    'METRICS_ENABLED': False,
+
+    # The longest number of seconds a request to the change feed is
+    # held open while waiting for changes.
+    'FEED_TIMEOUT': 30,
+
+    # The number of seconds between checks of the database for changes
+    # made by other processes while a feed request is waiting.
+    'FEED_POLL_INTERVAL': 1,
+
+    # The number of days changes are kept for by the `prune_changes`
+    # command. Clients that haven't synced in this long have to sync
+    # everything again.
+    'CHANGE_RETENTION_DAYS': 30,
+
+    # The aliases of the databases that replicate the default database.
+    # When `ReplicaRouter` is installed, the read-only list, detail, and
+    # report views read from them in turn, one per request. Either a
+    # list of aliases, or a dictionary of aliases and the relative share
+    # of requests each one should receive.
+    'REPLICAS': (),
+
+    # The number of project ids each process keeps cached, so that
+    # saving activities with recently used titles doesn't have to look
+    # up their projects.
+    'PROJECT_CACHE_SIZE': 1000,
+}
+
+
+class AppSettings(object):
+    """Lazy accessor for the app's settings.
+
+    Settings are looked up each time they are accessed so that
+    overrides made while the project is running (such as with
+    `override_settings` in tests) are respected.
+    """
+
+    def __getattr__(self, name):
+        """Get the value of a setting.
+
+        Args:
+            name (str): The name of the setting without the
+                ``TIMETRACKER_`` prefix.
+
+        Returns:
+            The value of the setting from the project's settings if it
+            is defined there, otherwise the default value.
+
+        Raises:
+            AttributeError: If `name` is not a known setting.
+        """
+        if name not in DEFAULTS:
+            raise AttributeError("Invalid timetracker setting: '{}'".format(
+                name))
+
+        return getattr(settings, 'TIMETRACKER_' + name, DEFAULTS[name])
+
+
+app_settings = AppSettings()
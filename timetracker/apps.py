@@ -0,0 +1,25 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+class TimetrackerConfig(AppConfig):
+    """Configuration for the `timetracker` app."""
+    name = 'timetracker'
+    verbose_name = 'Time Tracker'
+
+    def ready(self):
+        """Connect the app's signal receivers."""
+        from timetracker import signals
+
+        Activity = self.get_model('Activity')
+        Project = self.get_model('Project')
+
+        post_delete.connect(signals.invalidate_cache, sender=Activity)
+        post_delete.connect(signals.record_deletion, sender=Activity)
+        post_delete.connect(signals.remove_from_rollups, sender=Activity)
+        post_delete.connect(signals.clear_project_cache, sender=Project)
+        post_migrate.connect(signals.clear_project_cache, sender=self)
+        post_migrate.connect(signals.create_partial_indexes, sender=self)
+        post_save.connect(signals.invalidate_cache, sender=Activity)
+        post_save.connect(signals.record_change, sender=Activity)
+        post_save.connect(signals.update_rollups, sender=Activity)
@@ -0,0 +1,250 @@
+"""Archival of old activities.
+
+Completed activities that ended before a cutoff can be moved to the
+`ArchivedActivity` table using the ``archive_activities`` management
+command, which keeps the table and indexes of current activities small.
+Activities are moved in batches, each in its own transaction, so the
+table is never locked for long.
+
+The views only read the archive when a request's time range reaches
+into it. Archived activities stay in the daily rollups. Archiving isn't
+recorded in the change log, so clients that already synced an activity
+keep it, but a full sync only returns current activities.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+
+from timetracker import cache, models
+
+
+def archive_activities(before, batch_size=500):
+    """Move the activities that ended before a time to the archive.
+
+    Args:
+        before (datetime): The time to archive the activities that
+            ended before.
+        batch_size (int, optional): The number of activities to move in
+            each transaction.
+
+    Returns:
+        int: The number of activities archived.
+    """
+    archived = 0
+
+    while True:
+        with transaction.atomic():
+            activities = list(
+                models.Activity.objects.completed().filter(
+                    end_time__lt=before).order_by('pk').select_for_update()
+                [:batch_size])
+
+            if not activities:
+                break
+
+            models.ArchivedActivity.objects.bulk_create(
+                [models.ArchivedActivity.from_activity(activity)
+                 for activity in activities])
+
+            # Purging the rows skips the deletion bookkeeping, so the
+            # activities stay in the rollups and no deletions are
+            # recorded in the change log.
+            models.Activity.objects.filter(
+                pk__in=[activity.pk for activity in activities]).purge()
+
+        archived += len(activities)
+
+    if archived:
+        cache.invalidate_on_commit()
+
+    return archived
+
+
+def reaches_archive(filters):
+    """Determine if a request's filters can match archived activities.
+
+    The filters are compared with the latest start and end times in the
+    archive, so requests for activities that started or ended after
+    everything in the archive don't read it. This doesn't assume that
+    archived activities are older than the ones left in the `Activity`
+    table, which isn't the case after backdated activities are imported.
+
+    Unless only active activities are requested, the check costs an
+    aggregate query over the archive. Requests without a `start_after`
+    or `ended_after` filter, such as an unfiltered list, can't rule the
+    archive out, so they always make that query and then read the
+    archive as well.
+
+    Args:
+        filters (dict): The validated filters from
+            `ActivityFilterBackend.get_filters`.
+
+    Returns:
+        bool: False if no archived activity can match the filters,
+            otherwise True.
+    """
+    if filters.get('active'):
+        return False
+
+    latest = models.ArchivedActivity.objects.aggregate(
+        start_time=Max('start_time'), end_time=Max('end_time'))
+    if latest['start_time'] is None:
+        return False
+
+    if filters.get('start_after', latest['start_time']) > latest['start_time']:
+        return False
+
+    return filters.get('ended_after', latest['end_time']) <= latest['end_time']
+
+
+def _get_value(item, name):
+    """Get a field's value from an activity or a dictionary of its values.
+
+    Args:
+        item: An activity or a dictionary of its values.
+        name (str): The name of the field.
+
+    Returns:
+        The value of the field.
+    """
+    if isinstance(item, dict):
+        return item[name]
+
+    return getattr(item, name)
+
+
+class CombinedQuerySet(object):
+    """The activities of several querysets, read as if they were one.
+
+    Filtering, selecting values, and ordering are applied to each
+    queryset. Slices are read from each queryset and merged, so each
+    page still only reads as many rows from each table as it returns.
+    Only the operations used by the list view and its paginator are
+    supported. Every field in an ordering must have the same direction,
+    and must be selected if only some values are selected.
+    """
+
+    aggregates = {
+        Count: sum,
+        Max: max,
+        Min: min,
+        Sum: sum,
+    }
+
+    def __init__(self, querysets, ordering=()):
+        """Initialize the combined queryset.
+
+        Args:
+            querysets (list): The querysets to combine.
+            ordering (tuple, optional): The names of the fields the
+                results are ordered by, as given to `order_by`.
+        """
+        self.querysets = list(querysets)
+        self.ordering = tuple(ordering)
+
+    def _apply(self, method, *args, **kwargs):
+        """Call a method of each queryset.
+
+        Args:
+            method (str): The name of the method to call.
+            *args: The positional arguments to call it with.
+            **kwargs: The keyword arguments to call it with.
+
+        Returns:
+            CombinedQuerySet: The combination of the results.
+        """
+        return CombinedQuerySet(
+            [getattr(queryset, method)(*args, **kwargs)
+             for queryset in self.querysets],
+            self.ordering)
+
+    def filter(self, *args, **kwargs):
+        """Filter each of the querysets."""
+        return self._apply('filter', *args, **kwargs)
+
+    def values(self, *fields):
+        """Select the values of some fields from each of the querysets."""
+        return self._apply('values', *fields)
+
+    def order_by(self, *fields):
+        """Order each of the querysets, and the merged results."""
+        combined = self._apply('order_by', *fields)
+        combined.ordering = fields
+
+        return combined
+
+    def aggregate(self, **kwargs):
+        """Aggregate each of the querysets and combine the results.
+
+        Args:
+            **kwargs: The `Count`, `Max`, `Min`, or `Sum` aggregates to
+                compute, by name.
+
+        Returns:
+            dict: The combined value of each aggregate.
+
+        Raises:
+            TypeError: If an unsupported aggregate is given.
+        """
+        combiners = {}
+        for name, expression in kwargs.items():
+            if type(expression) not in self.aggregates:
+                raise TypeError(
+                    'Unsupported aggregate: {}'.format(expression))
+
+            combiners[name] = self.aggregates[type(expression)]
+
+        results = [queryset.aggregate(**kwargs) for queryset in self.querysets]
+
+        combined = {}
+        for name, combine in combiners.items():
+            values = [result[name] for result in results
+                      if result[name] is not None]
+            combined[name] = combine(values) if values else None
+
+        return combined
+
+    def _merge(self, results):
+        """Merge the results of each queryset in the current ordering.
+
+        Args:
+            results (list): A list of the results of each queryset.
+
+        Returns:
+            list: The merged results.
+        """
+        merged = [item for items in results for item in items]
+        if not self.ordering:
+            return merged
+
+        names = [name.lstrip('-') for name in self.ordering]
+        merged.sort(
+            key=lambda item: [_get_value(item, name) for name in names],
+            reverse=self.ordering[0].startswith('-'))
+
+        return merged
+
+    def __getitem__(self, key):
+        """Get the first results of the combined querysets.
+
+        Args:
+            key (slice): A slice without a start or step.
+
+        Returns:
+            list: The results in the slice.
+
+        Raises:
+            TypeError: If the key isn't a supported slice.
+        """
+        if (not isinstance(key, slice) or key.start or key.step or
+                key.stop is None):
+            raise TypeError('Only slices of the first results are supported.')
+
+        return self._merge(
+            [list(queryset[:key.stop]) for queryset in self.querysets]
+        )[:key.stop]
+
+    def __iter__(self):
+        """Iterate over every result of the combined querysets."""
+        return iter(self._merge(
+            [list(queryset) for queryset in self.querysets]))
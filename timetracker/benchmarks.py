@@ -0,0 +1,399 @@
+"""Benchmarks for the `timetracker` app.
+
+The benchmarks in this module are run using the `benchmark_activities`
+management command. They operate on whatever database is active when
+they are called, so the command is responsible for providing a
+disposable database to seed.
+"""
+
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from timeit import default_timer
+
+from django.core.urlresolvers import reverse
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from rest_framework.test import APIRequestFactory
+
+from timetracker import models, serializers, views
+
+try:
+    import tracemalloc
+except ImportError:     # pragma: no cover
+    tracemalloc = None
+
+
+TITLES = ('Coding', 'Email', 'Meetings', 'Planning', 'Reviews', 'Support')
+
+
+class Rollback(Exception):
+    """Exception used to roll back changes made during a benchmark."""
+
+
+def seed_activities(count, batch_size=10000, seed=0):
+    """Insert a number of randomly generated activities.
+
+    The activities are spread over the period leading up to the current
+    time, and roughly one in a thousand of them is left in progress.
+
+    Args:
+        count (int): The number of activities to create.
+        batch_size (int, optional): The number of activities to insert
+            in each query.
+        seed (int, optional): The seed for the random number generator,
+            so that the same data can be generated repeatedly.
+    """
+    rand = random.Random(seed)
+    now = timezone.now()
+
+    created = 0
+    while created < count:
+        batch = []
+        for _ in range(min(batch_size, count - created)):
+            start_time = now - timedelta(seconds=rand.randint(0, 10 ** 8))
+
+            if rand.random() < 0.001:
+                end_time = None
+            else:
+                end_time = start_time + timedelta(
+                    seconds=rand.randint(60, 8 * 3600))
+
+            activity = models.Activity(
+                title=rand.choice(TITLES),
+                start_time=start_time,
+                end_time=end_time)
+            activity.update_duration()
+
+            batch.append(activity)
+
+        models.Activity.objects.bulk_create(batch)
+        created += len(batch)
+
+
+def explain(queryset):
+    """Get the query plan for a queryset.
+
+    Args:
+        queryset (QuerySet): The queryset to explain.
+
+    Returns:
+        list: The lines of the query plan as reported by the database.
+    """
+    sql, params = queryset.query.get_compiler(connection=connection).as_sql()
+
+    if connection.vendor == 'sqlite':
+        sql = 'EXPLAIN QUERY PLAN ' + sql
+    else:
+        sql = 'EXPLAIN ' + sql
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [' '.join(str(column) for column in row) for row in rows]
+
+
+def time_call(func, repeat=5):
+    """Time how long a function takes to run.
+
+    Args:
+        func (callable): The function to time.
+        repeat (int, optional): The number of times to run the function.
+
+    Returns:
+        float: The fastest run time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = default_timer()
+        func()
+        timings.append(default_timer() - start)
+
+    return min(timings)
+
+
+@contextmanager
+def indexes_dropped():
+    """Temporarily drop the indexes on the activity table.
+
+    The indexes are dropped inside a transaction that is rolled back
+    once the block exits, so this only works on backends that can roll
+    back schema changes.
+    """
+    table = models.Activity._meta.db_table
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+
+    names = [
+        name for name, info in constraints.items()
+        if info['index'] and not info['primary_key'] and not info['unique']
+    ]
+
+    try:
+        with transaction.atomic():
+            with connection.schema_editor() as schema_editor:
+                for name in names:
+                    schema_editor.execute(schema_editor.sql_delete_index % {
+                        'name': schema_editor.quote_name(name),
+                        'table': schema_editor.quote_name(table),
+                    })
+
+            yield
+
+            raise Rollback()
+    except Rollback:
+        pass
+
+
+def percentile(values, fraction):
+    """Get a percentile of some measurements.
+
+    The nearest-rank method is used, so the result is always one of the
+    measurements.
+
+    Args:
+        values (list): The measurements.
+        fraction (float): The percentile as a fraction between 0 and 1.
+
+    Returns:
+        The measurement below which the given fraction of the
+        measurements fall.
+    """
+    ordered = sorted(values)
+    index = max(0, int(round(fraction * len(ordered))) - 1)
+
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def measure_memory(func):
+    """Measure the peak memory allocated while calling a function.
+
+    Args:
+        func (callable): The function to measure.
+
+    Returns:
+        int: The peak number of bytes allocated while `func` ran, or
+            `None` if memory allocations can't be traced on this
+            version of Python.
+    """
+    if tracemalloc is None:
+        return None
+
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def get_query_plan_cases():
+    """Get the queries used to benchmark the activity table's indexes.
+
+    Returns:
+        list: Pairs of names and querysets representing the queries
+            made by the app's hot paths.
+    """
+    activities = models.Activity.objects.all()
+    middle = activities.order_by('start_time', 'id')[
+        activities.count() // 2]
+
+    return [
+        ('list_first_page', activities.order_by('start_time', 'id')[:100]),
+        ('list_deep_page', activities.filter(
+            start_time__gte=middle.start_time).order_by(
+                'start_time', 'id')[:100]),
+        ('active', activities.filter(end_time__isnull=True)),
+    ]
+
+
+def benchmark_query_plans(rows=1000000, repeat=5):
+    """Benchmark the queries that depend on the activity indexes.
+
+    Args:
+        rows (int, optional): The number of activities to seed the
+            database with.
+        repeat (int, optional): The number of times to run each query.
+
+    Returns:
+        list: A dictionary for each query containing its name, and its
+            plan and fastest run time with the indexes in place. If the
+            database can roll back schema changes, the plan and timing
+            without the indexes are included for comparison.
+    """
+    seed_activities(rows)
+
+    results = []
+    for name, queryset in get_query_plan_cases():
+        result = {
+            'name': name,
+            'plan': explain(queryset),
+            'seconds': time_call(lambda: list(queryset.all()), repeat),
+        }
+
+        if connection.features.can_rollback_ddl:
+            with indexes_dropped():
+                result['unindexed_plan'] = explain(queryset)
+                result['unindexed_seconds'] = time_call(
+                    lambda: list(queryset.all()), repeat)
+
+        results.append(result)
+
+    return results
+
+
+def benchmark_serializers(rows=10000, repeat=3):
+    """Compare the speed of the activity serializers.
+
+    Each serializer is timed serializing a single page containing every
+    seeded activity, including the time taken to query the activities.
+
+    Args:
+        rows (int, optional): The number of activities to serialize.
+        repeat (int, optional): The number of times to run each case.
+
+    Returns:
+        list: A dictionary for each serializer containing its name, its
+            fastest run time, and the number of rows it serialized per
+            second.
+    """
+    seed_activities(rows)
+
+    queryset = models.Activity.objects.order_by('start_time', 'id')
+    fields = serializers.ActivityReadSerializer.fields
+
+    cases = [
+        ('model_serializer', lambda: serializers.ActivitySerializer(
+            list(queryset.all()), many=True).data),
+        ('read_serializer', lambda: serializers.ActivityReadSerializer(
+            list(queryset.values(*fields)), many=True).data),
+    ]
+
+    results = []
+    for name, func in cases:
+        seconds = time_call(func, repeat)
+        results.append({
+            'name': name,
+            'rows_per_second': rows / seconds,
+            'seconds': seconds,
+        })
+
+    return results
+
+
+def get_endpoint_cases():
+    """Get the requests used to benchmark the activity endpoints.
+
+    Each case builds a fresh request, passes it to the view that serves
+    it, and renders the response, so the timings include everything
+    but the network.
+
+    Returns:
+        list: Pairs of names and functions making a single request.
+    """
+    factory = APIRequestFactory()
+
+    detail_view = views.ActivityViewSet.as_view({
+        'get': 'retrieve',
+        'patch': 'partial_update',
+    })
+    list_view = views.ActivityViewSet.as_view({
+        'get': 'list',
+        'post': 'create',
+    })
+
+    activities = models.Activity.objects.all()
+    middle = activities.order_by('pk').values_list('pk', flat=True)[
+        activities.count() // 2]
+
+    list_url = reverse('activity-list')
+    detail_url = reverse('activity-detail', kwargs={'pk': middle})
+    page = list(activities.order_by('start_time', 'id').values(
+        *serializers.ActivityReadSerializer.fields)[:100])
+
+    def call(view, request, **kwargs):
+        return view(request, **kwargs).render()
+
+    return [
+        ('list', lambda: call(list_view, factory.get(list_url))),
+        ('filter', lambda: call(list_view, factory.get(list_url, {
+            'active': 'false',
+            'title': TITLES[0],
+        }))),
+        ('detail', lambda: call(
+            detail_view, factory.get(detail_url), pk=middle)),
+        ('create', lambda: call(list_view, factory.post(list_url, {
+            'title': TITLES[0],
+        }, format='json'))),
+        ('update', lambda: call(detail_view, factory.patch(detail_url, {
+            'title': TITLES[1],
+        }, format='json'), pk=middle)),
+        ('serialize', lambda: serializers.ActivityReadSerializer(
+            page, many=True).data),
+    ]
+
+
+def benchmark_endpoints(rows=10000, repeat=100):
+    """Benchmark the requests made to the activity endpoints.
+
+    Args:
+        rows (int, optional): The number of activities to seed the
+            database with.
+        repeat (int, optional): The number of times to make each
+            request.
+
+    Returns:
+        list: A dictionary for each request containing its name, the
+            number of activities in the database, the average number of
+            queries per request, the 50th and 99th percentile latencies
+            in milliseconds, and the peak memory allocated by a single
+            request in bytes.
+    """
+    seed_activities(rows)
+
+    results = []
+    for name, func in get_endpoint_cases():
+        # The request factory uses the 'testserver' host name.
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            result = benchmark_endpoint(name, func, repeat)
+
+        result['rows'] = rows
+        results.append(result)
+
+    return results
+
+
+def benchmark_endpoint(name, func, repeat):
+    """Benchmark a single request.
+
+    Args:
+        name (str): The name of the request.
+        func (callable): A function making the request.
+        repeat (int): The number of times to make the request.
+
+    Returns:
+        dict: The request's measurements, as described in
+            `benchmark_endpoints`.
+    """
+    timings = []
+    queries = 0
+
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = default_timer()
+            func()
+            timings.append((default_timer() - start) * 1000)
+
+        queries += len(context.captured_queries)
+
+    return {
+        'name': name,
+        'p50_ms': percentile(timings, 0.5),
+        'p99_ms': percentile(timings, 0.99),
+        'peak_memory_bytes': measure_memory(func),
+        'queries_per_request': queries / float(repeat),
+    }
@@ -0,0 +1,182 @@
+"""Caching of the responses from the activity views.
+
+Cached responses are stored under keys containing a generation number.
+Whenever an activity is saved or deleted, the generation is incremented
+once the change is committed, which invalidates every cached response at
+once without having to know which responses contained the activity.
+
+The cache is disabled unless the ``TIMETRACKER_CACHE_ENABLED`` setting
+is true.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+from timetracker.app_settings import app_settings
+
+
+GENERATION_KEY = 'timetracker:generation'
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def _get_cache():
+    """Get the cache responses are stored in."""
+    return caches[app_settings.CACHE_ALIAS]
+
+
+def _get_generation(cache):
+    """Get the current generation of cached responses.
+
+    If the generation has never been set (or has been evicted), it is
+    initialized from the current time so that it can never return to
+    the value of a previous generation.
+
+    Args:
+        cache: The cache responses are stored in.
+
+    Returns:
+        int: The current generation.
+    """
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+
+    return generation
+
+
+def _get_key(cache, request):
+    """Get the key a response to a request is stored under.
+
+    Args:
+        cache: The cache responses are stored in.
+        request (Request): The request being responded to.
+
+    Returns:
+        str: The key for the response to the request.
+    """
+    # Responses are cached separately for each user in case they are
+    # allowed to see different activities.
+    identity = '{}:{}:{}'.format(
+        getattr(request.user, 'pk', None),
+        request.accepted_renderer.format,
+        request.get_full_path())
+    digest = hashlib.md5(identity.encode('utf-8')).hexdigest()
+
+    return 'timetracker:response:{}:{}'.format(
+        _get_generation(cache), digest)
+
+
+def _record(stat):
+    """Increment one of the cache's hit or miss counters."""
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def get_response(request):
+    """Get the cached response to a request.
+
+    The key the response is cached under is also returned, to be passed
+    to `set_response`. It contains the generation current before the
+    response's data is read, so that if an activity changes in the
+    meantime, the old data isn't cached under the new generation.
+
+    Args:
+        request (Request): The request being responded to.
+
+    Returns:
+        tuple: The key for the response to the request, and the cached
+            response's `data`, `etag`, and `last_modified` time as a
+            dictionary, or `None` if there is no cached response. Both
+            are `None` if caching is disabled.
+    """
+    if not app_settings.CACHE_ENABLED:
+        return None, None
+
+    cache = _get_cache()
+    key = _get_key(cache, request)
+    entry = cache.get(key)
+
+    _record('misses' if entry is None else 'hits')
+
+    return key, entry
+
+
+def set_response(key, data, etag, last_modified=None):
+    """Cache the response to a request.
+
+    Args:
+        key (str): The key returned by `get_response` before the
+            response's data was read, or `None` to not cache it.
+        data: The serialized data in the response.
+        etag (str): The ETag of the response.
+        last_modified (datetime, optional): The time the response's
+            contents were last modified.
+    """
+    if key is None or not app_settings.CACHE_ENABLED:
+        return
+
+    _get_cache().set(
+        key,
+        {'data': data, 'etag': etag, 'last_modified': last_modified},
+        app_settings.CACHE_TIMEOUT)
+
+
+def invalidate():
+    """Invalidate every cached response."""
+    if not app_settings.CACHE_ENABLED:
+        return
+
+    cache = _get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # The generation has never been set, so there is nothing to
+        # invalidate.
+        pass
+
+
+def invalidate_on_commit(using=None):
+    """Invalidate every cached response once the current transaction
+    commits.
+
+    If the responses were invalidated straight away, a request made
+    before the commit could cache the old data under the new generation,
+    where it would be served until it expired. Outside of a transaction,
+    the responses are invalidated immediately.
+
+    Args:
+        using (str, optional): The alias of the database whose
+            transaction has to commit first.
+    """
+    transaction.on_commit(invalidate, using=using)
+
+
+def get_stats():
+    """Get the number of cache hits and misses.
+
+    The counts are kept in memory for the current process.
+
+    Returns:
+        dict: The number of `hits` and `misses`, and the `hit_ratio`.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / float(lookups) if lookups else None
+
+    return stats
+
+
+def reset_stats():
+    """Reset the cache's hit and miss counters."""
+    with _stats_lock:
+        _stats['hits'] = 0
+        _stats['misses'] = 0
@@ -0,0 +1,159 @@
+"""Support for conditional requests to the activity views.
+
+Clients that poll the API can send back the validators (`ETag` and
+`Last-Modified`) from a previous response. If nothing has changed since
+then, a 304 response is returned without serializing any activities.
+"""
+
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.http import (
+    http_date, parse_etags, parse_http_date_safe, quote_etag)
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _hash(*parts):
+    """Hash a sequence of values into a quoted ETag.
+
+    Args:
+        *parts: The values identifying a representation.
+
+    Returns:
+        str: A quoted ETag.
+    """
+    content = ':'.join(str(part) for part in parts)
+
+    return quote_etag(hashlib.md5(content.encode('utf-8')).hexdigest())
+
+
+def get_detail_etag(request, activity):
+    """Get the ETag for the representation of an activity.
+
+    Args:
+        request (Request): The request for the activity.
+        activity (Activity): The activity being requested.
+
+    Returns:
+        str: The activity's ETag.
+    """
+    return _hash(
+        request.accepted_renderer.format, request.get_full_path(),
+        activity.pk, activity.updated_at.isoformat())
+
+
+def get_list_etag(request, queryset):
+    """Get the ETag for a list of activities.
+
+    The ETag is computed from the number of activities and the time the
+    most recent of them was modified, which the database can compute
+    from its indexes. Creating, updating, or deleting an activity
+    changes at least one of those values.
+
+    Args:
+        request (Request): The request for the list.
+        queryset (QuerySet): The filtered activities being listed.
+
+    Returns:
+        str: The list's ETag.
+    """
+    stats = queryset.order_by().aggregate(
+        count=Count('id'), updated_at=Max('updated_at'))
+
+    updated_at = stats['updated_at']
+    if updated_at is not None:
+        updated_at = updated_at.isoformat()
+
+    return _hash(
+        request.accepted_renderer.format, request.get_full_path(),
+        stats['count'], updated_at)
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """Determine if a client's copy of a representation is current.
+
+    The `If-None-Match` header takes precedence over the
+    `If-Modified-Since` header, as described in RFC 7232.
+
+    Args:
+        request (Request): The request to check the headers of.
+        etag (str): The current ETag of the representation.
+        last_modified (datetime, optional): The time the representation
+            was last modified.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+
+        return '*' in etags or etag.strip('"') in etags
+
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since and last_modified is not None:
+        if_modified_since = parse_http_date_safe(if_modified_since)
+
+        return (if_modified_since is not None and
+                int(_timestamp(last_modified)) <= if_modified_since)
+
+    return False
+
+
+def not_modified(etag, last_modified=None):
+    """Create a 304 response.
+
+    Args:
+        etag (str): The current ETag of the representation.
+        last_modified (datetime, optional): The time the representation
+            was last modified.
+
+    Returns:
+        Response: An empty response with a 304 status code.
+    """
+    return set_validators(
+        Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add the validators for a representation to a response.
+
+    Args:
+        response (Response): The response to add the headers to.
+        etag (str): The ETag of the representation.
+        last_modified (datetime, optional): The time the representation
+            was last modified.
+
+    Returns:
+        Response: The response that was passed in.
+    """
+    response['ETag'] = etag
+
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+
+    return response
+
+
+def _timestamp(value):
+    """Convert a datetime to a POSIX timestamp.
+
+    Naive datetimes are treated as if they were in UTC. Since the result
+    is only compared with headers generated from the same values, it
+    only has to be consistent.
+
+    Args:
+        value (datetime): The datetime to convert.
+
+    Returns:
+        float: The number of seconds since the epoch.
+    """
+    if value.tzinfo is not None:
+        value = value.utctimetuple()
+    else:
+        value = value.timetuple()
+
+    return timegm(value)
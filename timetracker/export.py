@@ -0,0 +1,122 @@
+"""Streaming export of activities.
+
+Activities are read from the database in chunks of rows and formatted
+directly from those rows, so exporting the whole table uses the same
+amount of memory no matter how large it is.
+"""
+
+import csv
+import json
+
+from django.utils import six
+
+from timetracker.serializers import format_duration, get_datetime_formatter
+
+
+FIELDS = ('id', 'title', 'start_time', 'end_time', 'duration')
+
+
+class Echo(object):
+    """File-like object that returns what is written to it.
+
+    This allows the `csv` module to be used to format individual lines.
+    """
+
+    def write(self, value):
+        """Return the value that was written."""
+        return value
+
+
+def iter_rows(queryset, chunk_size=2000):
+    """Iterate over the rows of a queryset of activities.
+
+    The rows are fetched in chunks ordered by primary key. Each chunk is
+    selected by filtering on the last primary key of the previous chunk,
+    so neither the database nor the client has to hold the whole result
+    at once.
+
+    Args:
+        queryset (QuerySet): The activities to iterate over.
+        chunk_size (int, optional): The number of rows to fetch in each
+            query.
+
+    Yields:
+        tuple: The values of `FIELDS` for each activity.
+    """
+    queryset = queryset.order_by('pk').values_list(*FIELDS)
+    last_pk = None
+
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+
+        rows = list(chunk[:chunk_size])
+        for row in rows:
+            yield row
+
+        if len(rows) < chunk_size:
+            return
+
+        last_pk = rows[-1][0]
+
+
+def iter_csv(queryset, chunk_size=2000):
+    """Export activities as CSV.
+
+    Args:
+        queryset (QuerySet): The activities to export.
+        chunk_size (int, optional): The number of rows to fetch in each
+            query.
+
+    Yields:
+        str: A header line followed by a line for each activity.
+    """
+    format_datetime = get_datetime_formatter()
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(FIELDS)
+
+    rows = iter_rows(queryset, chunk_size)
+    for pk, title, start_time, end_time, duration in rows:
+        if six.PY2:
+            title = title.encode('utf-8')
+
+        yield writer.writerow([
+            pk,
+            title,
+            format_datetime(start_time),
+            format_datetime(end_time),
+            format_duration(duration),
+        ])
+
+
+def iter_ndjson(queryset, chunk_size=2000):
+    """Export activities as newline delimited JSON.
+
+    Args:
+        queryset (QuerySet): The activities to export.
+        chunk_size (int, optional): The number of rows to fetch in each
+            query.
+
+    Yields:
+        str: A line containing a JSON object for each activity.
+    """
+    format_datetime = get_datetime_formatter()
+
+    rows = iter_rows(queryset, chunk_size)
+    for pk, title, start_time, end_time, duration in rows:
+        yield json.dumps({
+            'id': pk,
+            'title': title,
+            'start_time': format_datetime(start_time),
+            'end_time': format_datetime(end_time),
+            'duration': format_duration(duration),
+        }, sort_keys=True) + '\n'
+
+
+# Map of export formats to their exporters and content types.
+FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
@@ -0,0 +1,242 @@
+"""Feed of the changes made to activities.
+
+Every change to an activity is recorded as an `ActivityChange`, which is
+given a sequence number when it is committed. Clients remember the last
+sequence number they have seen and ask for the changes made since then,
+so they only receive the activities that actually changed.
+
+Clients can either long-poll for changes, or keep a connection open and
+receive the changes as server-sent events.
+"""
+
+import json
+from collections import OrderedDict
+from timeit import default_timer
+
+from django.db import connections
+from django.db.models import Max
+
+from timetracker import models, pubsub
+from timetracker.app_settings import app_settings
+from timetracker.serializers import ActivityReadSerializer
+
+
+# The number of seconds between comments sent to keep an event stream's
+# connection open while there are no changes.
+HEARTBEAT_INTERVAL = 15
+
+
+def get_numbered_changes():
+    """Get the changes that clients can read.
+
+    Changes are given sequence numbers once they are committed (see
+    `ActivityChangeQuerySet.number`), so a change can never be numbered
+    before a change that a client has already read. Changes that were
+    committed but not numbered yet, for example because the process
+    that committed them stopped, are numbered first.
+
+    Returns:
+        QuerySet: The changes that have sequence numbers.
+    """
+    models.ActivityChange.objects.number()
+
+    return models.ActivityChange.objects.filter(sequence__isnull=False)
+
+
+def get_sequence():
+    """Get the sequence number of the most recent change.
+
+    Returns:
+        int: The sequence number, or 0 if nothing has changed yet.
+    """
+    return get_numbered_changes().aggregate(
+        sequence=Max('sequence'))['sequence'] or 0
+
+
+def _serialize(queryset, ids):
+    """Serialize the activities with the given ids.
+
+    Args:
+        queryset (QuerySet): The activities or archived activities to
+            read.
+        ids (list): The ids of the activities.
+
+    Returns:
+        dict: The serialized activities that exist, by id.
+    """
+    activities = queryset.filter(pk__in=ids).values(
+        *ActivityReadSerializer.fields)
+
+    return {
+        item['id']: item
+        for item in ActivityReadSerializer(activities, many=True).data
+    }
+
+
+def get_changes(since, limit, owner=None):
+    """Get the changes made after a sequence number.
+
+    Only numbered changes are read (see `get_numbered_changes`). If an
+    activity changed more than once, only its most recent change is
+    returned. An activity that was created and then updated is reported
+    as created. Activities that have since been archived are returned as
+    they were archived, rather than as deletions.
+
+    Args:
+        since (int): The sequence number of the last change the client
+            has seen.
+        limit (int): The maximum number of changes to read.
+        owner (User, optional): If given, only changes to this user's
+            activities are returned.
+
+    Returns:
+        list: A dictionary for each change containing its `sequence`
+            number, its `action`, the `id` of the activity, and the
+            serialized `activity` (or `None` if it was deleted), ordered
+            by sequence number.
+    """
+    rows = get_numbered_changes().filter(sequence__gt=since)
+    if owner is not None:
+        rows = rows.filter(owner_id=owner.pk)
+
+    rows = rows.order_by('sequence').values_list(
+        'sequence', 'action', 'activity_id')[:limit]
+
+    latest = OrderedDict()
+    for sequence, action, activity_id in rows:
+        previous = latest.pop(activity_id, None)
+        if (previous is not None and
+                previous[1] == models.ActivityChange.CREATED and
+                action == models.ActivityChange.UPDATED):
+            action = models.ActivityChange.CREATED
+
+        latest[activity_id] = (sequence, action)
+
+    serialized = _serialize(models.Activity.objects, list(latest.keys()))
+
+    # Activities that were archived since they changed are read from the
+    # archive, so they aren't reported as deleted.
+    missing = [pk for pk in latest if pk not in serialized]
+    if missing:
+        serialized.update(
+            _serialize(models.ArchivedActivity.objects, missing))
+
+    changes = []
+    for activity_id, (sequence, action) in latest.items():
+        activity = serialized.get(activity_id)
+        if activity is None:
+            action = models.ActivityChange.DELETED
+
+        changes.append(OrderedDict([
+            ('sequence', sequence),
+            ('action', action),
+            ('id', activity_id),
+            ('activity', activity),
+        ]))
+
+    return changes
+
+
+def release_connections():
+    """Close the database connections that aren't in a transaction.
+
+    Waiting requests would otherwise each hold a connection while doing
+    nothing, so the number of clients waiting for changes would be
+    limited by the database's connection limit. The connections are
+    opened again when the changes are next read.
+    """
+    for connection in connections.all():
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def wait_for_changes(since, timeout, limit, owner=None):
+    """Wait until there are changes after a sequence number.
+
+    Changes committed by the current process end the wait immediately.
+    Changes committed by other processes are found by checking the
+    database every ``TIMETRACKER_FEED_POLL_INTERVAL`` seconds. No
+    database connection is held between checks, unless the request is
+    inside a transaction.
+
+    Args:
+        since (int): The sequence number of the last change the client
+            has seen.
+        timeout (float): The maximum number of seconds to wait.
+        limit (int): The maximum number of changes to read.
+        owner (User, optional): If given, only changes to this user's
+            activities are returned.
+
+    Returns:
+        list: The changes made after `since`, as returned by
+            `get_changes`, or an empty list if the timeout expired.
+    """
+    deadline = default_timer() + timeout
+
+    while True:
+        # The version is read before checking for changes so that a
+        # change committed in between isn't missed.
+        version = pubsub.get_version()
+
+        changes = get_changes(since, limit, owner)
+        remaining = deadline - default_timer()
+        if changes or remaining <= 0:
+            return changes
+
+        release_connections()
+        pubsub.wait(
+            version, min(remaining, app_settings.FEED_POLL_INTERVAL))
+
+
+def format_event(change):
+    """Format a change as a server-sent event.
+
+    Args:
+        change (dict): The change, as returned by `get_changes`.
+
+    Returns:
+        str: The event, with the change's sequence number as its id and
+            its action as its type.
+    """
+    return 'id: {}\nevent: {}\ndata: {}\n\n'.format(
+        change['sequence'], change['action'], json.dumps(change))
+
+
+def iter_events(since, duration, limit, owner=None):
+    """Stream the changes made after a sequence number as events.
+
+    The stream ends after the given duration, at which point clients
+    reconnect and resume from the id of the last event they received.
+
+    Args:
+        since (int): The sequence number of the last change the client
+            has seen.
+        duration (float): The number of seconds to keep the stream
+            open for.
+        limit (int): The maximum number of changes to read at once.
+        owner (User, optional): If given, only changes to this user's
+            activities are streamed.
+
+    Yields:
+        str: The lines of the event stream.
+    """
+    deadline = default_timer() + duration
+
+    yield 'retry: {}\n\n'.format(
+        int(app_settings.FEED_POLL_INTERVAL * 1000))
+
+    while True:
+        remaining = deadline - default_timer()
+        if remaining <= 0:
+            return
+
+        changes = wait_for_changes(
+            since, min(remaining, HEARTBEAT_INTERVAL), limit, owner)
+        if not changes:
+            yield ': keep-alive\n\n'
+            continue
+
+        for change in changes:
+            yield format_event(change)
+
+        since = changes[-1]['sequence']
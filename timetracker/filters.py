@@ -0,0 +1,100 @@
+"""Filters for the `timetracker` app.
+
+These filters let clients narrow down the activities they request so
+that the filtering is done by the database rather than by the client.
+"""
+
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+
+class ActivityFilterSerializer(serializers.Serializer):
+    """Serializer used to validate the query parameters for filtering
+    activities.
+    """
+    active = serializers.NullBooleanField(required=False)
+    ended_after = serializers.DateTimeField(required=False)
+    max_duration = serializers.DurationField(required=False)
+    min_duration = serializers.DurationField(required=False)
+    project = serializers.IntegerField(required=False)
+    start_after = serializers.DateTimeField(required=False)
+    start_before = serializers.DateTimeField(required=False)
+    title = serializers.CharField(required=False)
+
+
+class ActivityFilterBackend(BaseFilterBackend):
+    """Filter backend for `Activity` querysets.
+
+    The following query parameters are supported:
+
+    - ``active``: If true, only in-progress activities are returned. If
+      false, only completed activities are returned.
+    - ``ended_after``: Only return activities that ended at or after the
+      given time.
+    - ``max_duration``: Only return completed activities that lasted at
+      most the given duration.
+    - ``min_duration``: Only return completed activities that lasted at
+      least the given duration.
+    - ``project``: Only return activities belonging to the project with
+      the given id.
+    - ``start_after``: Only return activities that started at or after
+      the given time.
+    - ``start_before``: Only return activities that started before the
+      given time.
+    - ``title``: Only return activities whose title starts with the
+      given value.
+
+    Invalid parameters result in a 400 response describing the problem.
+    """
+    lookups = {
+        'ended_after': 'end_time__gte',
+        'max_duration': 'duration__lte',
+        'min_duration': 'duration__gte',
+        'project': 'project_id',
+        'start_after': 'start_time__gte',
+        'start_before': 'start_time__lt',
+        'title': 'title__startswith',
+    }
+
+    def get_filters(self, request):
+        """Get the validated filters from a request.
+
+        Args:
+            request (Request): The request containing the filters as
+                query parameters.
+
+        Returns:
+            dict: The validated filter values.
+
+        Raises:
+            ValidationError: If any of the filters are invalid.
+        """
+        serializer = ActivityFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        return serializer.validated_data
+
+    def filter_queryset(self, request, queryset, view):
+        """Filter a queryset of activities.
+
+        Args:
+            request (Request): The request containing the filters.
+            queryset (QuerySet): The activities to filter.
+            view (APIView): The view handling the request.
+
+        Returns:
+            QuerySet: The activities matching the request's filters.
+        """
+        filters = self.get_filters(request)
+
+        kwargs = {
+            self.lookups[name]: value
+            for name, value in filters.items()
+            if name in self.lookups
+        }
+
+        active = filters.get('active')
+        if active is not None:
+            kwargs['end_time__isnull'] = active
+
+        return queryset.filter(**kwargs)
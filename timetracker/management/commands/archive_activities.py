@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from timetracker import archive
+
+
+class Command(BaseCommand):
+    """Move old, completed activities to the archive.
+
+    The activities are moved in batches, each in its own transaction.
+    Archived activities are still returned by the API when a request's
+    time range reaches into the archive.
+    """
+    help = 'Move the activities that ended before a date to the archive.'
+
+    def add_arguments(self, parser):
+        """Add the command's arguments to the parser."""
+        parser.add_argument(
+            '--before',
+            required=True,
+            help=('Archive the activities that ended before this date or '
+                  'time, given as YYYY-MM-DD or an ISO 8601 time.'))
+        parser.add_argument(
+            '--batch-size',
+            default=500,
+            type=int,
+            help='The number of activities to move in each transaction.')
+
+    def handle(self, *args, **options):
+        """Archive the activities that ended before the given time."""
+        before = self.parse_time(options['before'])
+
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        archived = archive.archive_activities(
+            before, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Archived {} activities.'.format(archived)))
+
+    def parse_time(self, value):
+        """Parse the time given by the `--before` option.
+
+        Args:
+            value (str): The value of the option.
+
+        Returns:
+            datetime: The parsed time. Dates are converted to midnight,
+                in the current time zone if time zone support is
+                enabled.
+
+        Raises:
+            CommandError: If the value is not a valid date or time.
+        """
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                if day is not None:
+                    parsed = datetime(day.year, day.month, day.day)
+        except ValueError:
+            parsed = None
+
+        if parsed is None:
+            raise CommandError('--before must be a date or time.')
+
+        if settings.USE_TZ and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+
+        return parsed
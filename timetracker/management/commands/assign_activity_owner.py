@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from timetracker import models, rollups
+
+
+class Command(BaseCommand):
+    """Assign the activities without an owner to a user.
+
+    Activities created before activities had owners don't belong to
+    anyone, so they aren't visible to anyone when activities are scoped
+    to their owners. This gives them, including archived ones, to an
+    existing user.
+    """
+    help = 'Assign the activities without an owner to a user.'
+
+    def add_arguments(self, parser):
+        """Add the command's arguments to the parser."""
+        parser.add_argument(
+            'username',
+            help='The username of the user to assign the activities to.')
+
+    def handle(self, *args, **options):
+        """Assign the unowned activities to the given user."""
+        User = get_user_model()
+
+        try:
+            owner = User.objects.get(**{
+                User.USERNAME_FIELD: options['username'],
+            })
+        except User.DoesNotExist:
+            raise CommandError(
+                "No user with the username '{}' exists.".format(
+                    options['username']))
+
+        assigned = models.Activity.objects.filter(
+            owner__isnull=True).update(owner=owner)
+        assigned += models.ArchivedActivity.objects.filter(
+            owner__isnull=True).update(owner=owner)
+
+        # Updates don't send the `post_save` signal, but the assigned
+        # activities still have to appear in their owner's change feed.
+        models.ActivityChange.objects.filter(
+            owner_id__isnull=True).update(owner_id=owner.pk)
+        if assigned:
+            rollups.rebuild_rollups()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Assigned {} activities to {}.'.format(
+                assigned, options['username'])))
@@ -0,0 +1,100 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from timetracker import benchmarks
+
+
+class Command(BaseCommand):
+    """Benchmark the performance of the `timetracker` app.
+
+    The benchmarks are run against a freshly created test database, so
+    running them never touches any existing data. If several row counts
+    are given, the benchmark is repeated against a new database for
+    each of them.
+    """
+    help = 'Benchmark the performance of the timetracker app.'
+
+    benchmarks = {
+        'endpoints': benchmarks.benchmark_endpoints,
+        'plans': benchmarks.benchmark_query_plans,
+        'serializers': benchmarks.benchmark_serializers,
+    }
+
+    def add_arguments(self, parser):
+        """Add the command's arguments to the parser."""
+        parser.add_argument(
+            'benchmark',
+            choices=sorted(self.benchmarks.keys()),
+            help='The benchmark to run.')
+        parser.add_argument(
+            '--rows',
+            action='append',
+            type=int,
+            help=('The number of activities to seed the database with. '
+                  'May be given more than once to compare sizes. Each '
+                  'benchmark has its own default.'))
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            default=False,
+            help='Output the results as JSON.')
+
+    def handle(self, *args, **options):
+        """Run the requested benchmark and report its results."""
+        benchmark = self.benchmarks[options['benchmark']]
+
+        if options['rows']:
+            results = []
+            for rows in options['rows']:
+                for result in self.run_benchmark(benchmark, rows=rows):
+                    result.setdefault('rows', rows)
+                    results.append(result)
+        else:
+            results = self.run_benchmark(benchmark)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+        else:
+            self.write_results(results)
+
+    def run_benchmark(self, benchmark, **kwargs):
+        """Run a benchmark against a new test database.
+
+        Args:
+            benchmark (callable): The benchmark to run.
+            **kwargs: The arguments to pass to the benchmark.
+
+        Returns:
+            list: The benchmark's results.
+        """
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+
+        try:
+            return benchmark(**kwargs)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def write_results(self, results):
+        """Write benchmark results in a human readable format.
+
+        Args:
+            results (list): A dictionary for each benchmarked case.
+        """
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(result['name']))
+
+            for key in sorted(result.keys()):
+                if key == 'name':
+                    continue
+
+                value = result[key]
+                if isinstance(value, list):
+                    self.stdout.write('  {}:'.format(key))
+                    for line in value:
+                        self.stdout.write('    {}'.format(line))
+                else:
+                    self.stdout.write('  {}: {}'.format(key, value))
@@ -0,0 +1,65 @@
+import io
+
+from django.core.management.base import BaseCommand
+from django.utils import six
+
+from timetracker import export, models
+
+
+class Command(BaseCommand):
+    """Export every activity as newline delimited JSON or CSV.
+
+    Activities are streamed from the database in chunks, so the export
+    uses a constant amount of memory regardless of the number of
+    activities.
+    """
+    help = 'Export all activities as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        """Add the command's arguments to the parser."""
+        parser.add_argument(
+            '--format',
+            choices=sorted(export.FORMATS.keys()),
+            default='ndjson',
+            dest='file_format',
+            help='The format to export the activities in.')
+        parser.add_argument(
+            '--output',
+            help='The file to write the export to. Defaults to stdout.')
+        parser.add_argument(
+            '--chunk-size',
+            default=2000,
+            type=int,
+            help='The number of activities to fetch in each query.')
+
+    def handle(self, *args, **options):
+        """Write the export to the requested output."""
+        exporter, _ = export.FORMATS[options['file_format']]
+        lines = exporter(
+            models.Activity.objects.all(), chunk_size=options['chunk_size'])
+
+        if options['output']:
+            with self.open_output(options['output']) as f:
+                for line in lines:
+                    f.write(line)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+
+    def open_output(self, path):
+        """Open the file to write the export to.
+
+        On Python 2 the exporters produce UTF-8 encoded byte strings,
+        which have to be written to a binary file, while on Python 3
+        they produce text.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            file: The opened file.
+        """
+        if six.PY2:
+            return open(path, 'wb')
+
+        return io.open(path, 'w', encoding='utf-8', newline='')
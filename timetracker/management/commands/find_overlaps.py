@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.duration import duration_string
+
+from timetracker import models, overlaps
+
+
+class Command(BaseCommand):
+    """List the activities that overlap each other.
+
+    Overlapping activities usually mean the same time was recorded
+    twice. The search can be limited to a window of time.
+    """
+    help = 'List the pairs of activities that overlap each other.'
+
+    def add_arguments(self, parser):
+        """Add the command's arguments to the parser."""
+        parser.add_argument(
+            '--start',
+            help='Only find overlaps after this ISO 8601 time.')
+        parser.add_argument(
+            '--end',
+            help='Only find overlaps before this ISO 8601 time.')
+        parser.add_argument(
+            '--chunk-size',
+            default=2000,
+            type=int,
+            help='The number of activities to fetch in each query.')
+
+    def handle(self, *args, **options):
+        """Write each overlapping pair of activities."""
+        start = self.parse_time(options['start'], '--start')
+        end = self.parse_time(options['end'], '--end')
+
+        if end is not None and start is None:
+            raise CommandError('--end requires --start.')
+
+        found = overlaps.find_overlaps(
+            models.Activity.objects.all(),
+            start=start,
+            end=end,
+            chunk_size=options['chunk_size'])
+
+        count = 0
+        for overlap in found:
+            if overlap.end is None:
+                length = 'ongoing'
+            else:
+                length = duration_string(overlap.end - overlap.start)
+
+            self.stdout.write('{} and {} overlap from {} ({})'.format(
+                overlap.first,
+                overlap.second,
+                overlap.start.isoformat(),
+                length))
+            count += 1
+
+        if count:
+            self.stdout.write(self.style.WARNING(
+                'Found {} overlapping pairs of activities.'.format(count)))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                'No overlapping activities found.'))
+
+    def parse_time(self, value, option):
+        """Parse a time given as an option.
+
+        Args:
+            value (str): The value of the option, or `None`.
+            option (str): The name of the option.
+
+        Returns:
+            datetime: The parsed time, or `None` if no value was given.
+                Times without an offset are in the current time zone.
+
+        Raises:
+            CommandError: If the value is not a valid time.
+        """
+        if value is None:
+            return None
+
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+
+        if parsed is None:
+            raise CommandError('{} must be an ISO 8601 time.'.format(option))
+
+        if settings.USE_TZ and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+
+        return parsed
@@ -0,0 +1,268 @@
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+from itertools import islice
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import six
+
+from timetracker import serializers
+
+
+def read_csv(stream):
+    """Read activities from a CSV stream.
+
+    The first line of the stream must be a header naming the columns.
+    Empty values are treated as missing.
+
+    On Python 2, the `csv` module can only read byte strings, so the
+    stream must be opened in binary mode and the values are decoded from
+    UTF-8.
+
+    Args:
+        stream: A file-like object to read from.
+
+    Yields:
+        dict: The data for each activity.
+    """
+    for row in csv.DictReader(stream):
+        if six.PY2:
+            row = {
+                key.decode('utf-8'): value.decode('utf-8')
+                for key, value in row.items()
+            }
+
+        yield {key: value for key, value in row.items() if value != ''}
+
+
+def read_ndjson(stream):
+    """Read activities from a newline delimited JSON stream.
+
+    Blank lines are ignored.
+
+    Args:
+        stream: A file-like object to read from.
+
+    Yields:
+        dict: The data for each activity.
+
+    Raises:
+        CommandError: If a line contains invalid JSON.
+    """
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise CommandError('Invalid JSON on line {}: {}'.format(
+                number, e))
+
+
+# Replaces a file atomically. Python 2 only has `rename`, which does the
+# same on POSIX systems.
+replace = getattr(os, 'replace', os.rename)
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+class Command(BaseCommand):
+    """Import activities from a CSV or NDJSON file.
+
+    Each activity is validated using the same rules as the API, and the
+    activities are inserted in bulk. Activities are committed in
+    chunks, and if a checkpoint file is given, the number of committed
+    activities is recorded in it after each chunk. If the import fails,
+    running the command again with the same checkpoint file resumes
+    from the last committed chunk.
+
+    Resuming is at-least-once: the checkpoint is written after a chunk
+    commits, so if the import is interrupted between the two, the chunk
+    is imported again when the import is resumed.
+    """
+    help = 'Import activities from a CSV or NDJSON file.'
+
+    def add_arguments(self, parser):
+        """Add the command's arguments to the parser."""
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default='-',
+            help="The file to import from, or '-' to read from stdin.")
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS.keys()),
+            dest='file_format',
+            help=('The format of the input. Defaults to the extension of '
+                  'the file, or NDJSON when reading from stdin.'))
+        parser.add_argument(
+            '--batch-size',
+            default=1000,
+            type=int,
+            help='The number of activities to insert in each query.')
+        parser.add_argument(
+            '--chunk-size',
+            default=10000,
+            type=int,
+            help='The number of activities to commit in each transaction.')
+        parser.add_argument(
+            '--checkpoint',
+            help=('A file used to record the number of committed '
+                  'activities so that a failed import can be resumed.'))
+
+    def handle(self, *args, **options):
+        """Import the activities from the given file."""
+        path = options['path']
+        file_format = options['file_format']
+
+        if file_format is None:
+            extension = os.path.splitext(path)[1].lstrip('.').lower()
+            file_format = extension if extension in READERS else 'ndjson'
+
+        committed = self.read_checkpoint(options['checkpoint'])
+
+        if path == '-':
+            self.import_stream(sys.stdin, file_format, committed, options)
+        else:
+            with self.open_input(path) as stream:
+                self.import_stream(stream, file_format, committed, options)
+
+    def open_input(self, path):
+        """Open the file to import from.
+
+        On Python 2 the file is opened in binary mode, since the `csv`
+        module can't read text and `json` decodes UTF-8 itself.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            file: The opened file.
+        """
+        if six.PY2:
+            return open(path, 'rb')
+
+        return io.open(path, encoding='utf-8', newline='')
+
+    def import_stream(self, stream, file_format, committed, options):
+        """Import the activities from a stream.
+
+        Args:
+            stream: A file-like object to read from.
+            file_format (str): The format of the stream's contents.
+            committed (int): The number of activities at the start of
+                the stream that have already been imported.
+            options (dict): The options passed to the command.
+
+        Raises:
+            CommandError: If any of the activities are invalid.
+        """
+        rows = islice(READERS[file_format](stream), committed, None)
+        imported = 0
+        start = default_timer()
+
+        if committed:
+            self.stdout.write(
+                'Resuming after {} committed activities.'.format(committed))
+
+        while True:
+            chunk = list(islice(rows, options['chunk_size']))
+            if not chunk:
+                break
+
+            serializer = serializers.ActivitySerializer(
+                context={'batch_size': options['batch_size']},
+                data=chunk,
+                many=True)
+
+            if not serializer.is_valid():
+                self.raise_invalid(serializer.errors, committed)
+
+            with transaction.atomic():
+                serializer.save()
+
+            committed += len(chunk)
+            imported += len(chunk)
+            self.write_checkpoint(options['checkpoint'], committed)
+
+            self.stdout.write('Committed {} activities ({:.1f}/s).'.format(
+                committed, imported / (default_timer() - start)))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Imported {} activities in {:.2f}s.'.format(
+                imported, default_timer() - start)))
+
+    def raise_invalid(self, errors, committed):
+        """Report the invalid activities in a chunk.
+
+        Args:
+            errors (list): The validation errors for each activity in
+                the chunk.
+            committed (int): The number of activities committed before
+                the chunk.
+
+        Raises:
+            CommandError: Always, describing the invalid activities.
+        """
+        messages = [
+            'Activity {}: {}'.format(committed + i + 1, dict(item_errors))
+            for i, item_errors in enumerate(errors)
+            if item_errors
+        ]
+
+        raise CommandError(
+            'Invalid activities; {} activities were committed.\n{}'.format(
+                committed, '\n'.join(messages)))
+
+    def read_checkpoint(self, path):
+        """Read the number of committed activities from a checkpoint.
+
+        Args:
+            path (str): The path of the checkpoint file, or `None`.
+
+        Returns:
+            int: The number of committed activities, or 0 if there is no
+                checkpoint.
+        """
+        if path is None or not os.path.exists(path):
+            return 0
+
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+
+    def write_checkpoint(self, path, committed):
+        """Record the number of committed activities in a checkpoint.
+
+        The checkpoint is written to a temporary file that then replaces
+        the checkpoint, so an interrupted write can't leave a truncated
+        checkpoint behind.
+
+        Args:
+            path (str): The path of the checkpoint file, or `None`.
+            committed (int): The number of committed activities.
+        """
+        if path is None:
+            return
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.checkpoint')
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(committed))
+                f.flush()
+                os.fsync(f.fileno())
+
+            replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
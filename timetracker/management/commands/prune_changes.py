@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from timetracker import sync
+from timetracker.app_settings import app_settings
+
+
+class Command(BaseCommand):
+    """Delete old entries from the activity change log.
+
+    Clients that last synced before the oldest remaining change have to
+    sync every activity again.
+    """
+    help = 'Delete changes to activities older than the retention period.'
+
+    def add_arguments(self, parser):
+        """Add the command's arguments to the parser."""
+        parser.add_argument(
+            '--days',
+            default=None,
+            type=int,
+            help=('The number of days of changes to keep. Defaults to the '
+                  'TIMETRACKER_CHANGE_RETENTION_DAYS setting.'))
+
+    def handle(self, *args, **options):
+        """Delete the changes older than the retention period."""
+        days = options['days']
+        if days is None:
+            days = app_settings.CHANGE_RETENTION_DAYS
+
+        deleted = sync.prune_changes(timezone.now() - timedelta(days=days))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted {} changes.'.format(deleted)))
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from timetracker import rollups
+
+
+class Command(BaseCommand):
+    """Recompute the daily rollups of activities.
+
+    The rollups are kept up to date as activities change, so this only
+    has to be run to create the rollups of existing activities, or to
+    repair rollups that drifted. The days are rebuilt in chunks, several
+    of which can be rebuilt in parallel.
+    """
+    help = 'Recompute the daily rollups of activities.'
+
+    def add_arguments(self, parser):
+        """Add the command's arguments to the parser."""
+        parser.add_argument(
+            '--start',
+            help='The first day to rebuild, as YYYY-MM-DD.')
+        parser.add_argument(
+            '--end',
+            help='The day after the last day to rebuild, as YYYY-MM-DD.')
+        parser.add_argument(
+            '--workers',
+            default=4,
+            type=int,
+            help='The number of chunks of days to rebuild in parallel.')
+        parser.add_argument(
+            '--chunk-days',
+            default=31,
+            type=int,
+            help='The number of days to rebuild in each chunk.')
+
+    def handle(self, *args, **options):
+        """Rebuild the rollups of the given days."""
+        start = self.parse_day(options['start'], '--start')
+        end = self.parse_day(options['end'], '--end')
+
+        if start is not None and end is not None and end <= start:
+            raise CommandError('--end must be after --start.')
+
+        if options['workers'] < 1 or options['chunk_days'] < 1:
+            raise CommandError(
+                '--workers and --chunk-days must be at least 1.')
+
+        created = rollups.rebuild_rollups(
+            start=start,
+            end=end,
+            workers=options['workers'],
+            chunk_days=options['chunk_days'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Created {} rollups.'.format(created)))
+
+    def parse_day(self, value, option):
+        """Parse a day given as an option.
+
+        Args:
+            value (str): The value of the option, or `None`.
+            option (str): The name of the option.
+
+        Returns:
+            date: The parsed day, or `None` if no value was given.
+
+        Raises:
+            CommandError: If the value is not a valid date.
+        """
+        if value is None:
+            return None
+
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+
+        if parsed is None:
+            raise CommandError('{} must be a date.'.format(option))
+
+        return parsed
@@ -0,0 +1,259 @@
+"""Instrumentation of the requests made to the app.
+
+When the ``TIMETRACKER_METRICS_ENABLED`` setting is true,
+`InstrumentationMiddleware` measures each request's total time and the
+number of queries it makes and the time they take. Views using
+`InstrumentedViewMixin` also report the time spent serializing and
+rendering their responses.
+
+The measurements are added to each response as a ``Server-Timing``
+header, and are totalled per endpoint in memory for the current
+process.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from timeit import default_timer
+
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+from timetracker.app_settings import app_settings
+
+
+# The names of the timings that are totalled for each endpoint, in the
+# order they appear in the ``Server-Timing`` header.
+TIMINGS = ('db', 'serialize', 'render', 'total')
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _get_timings(request):
+    """Get the timings being recorded for a request.
+
+    Args:
+        request: The Django or REST framework request.
+
+    Returns:
+        dict: The timings recorded so far in milliseconds, or `None` if
+            the request isn't being instrumented.
+    """
+    return getattr(request, 'timetracker_timings', None)
+
+
+@contextmanager
+def timed(request, name):
+    """Time a block of code as part of a request.
+
+    If the request isn't being instrumented, the block is run without
+    being timed.
+
+    Args:
+        request: The request the block is run for.
+        name (str): The name of the timing to add the block's duration
+            to. One of `TIMINGS`.
+    """
+    timings = _get_timings(request)
+    if timings is None:
+        yield
+        return
+
+    start = default_timer()
+    try:
+        yield
+    finally:
+        timings[name] = (
+            timings.get(name, 0) + (default_timer() - start) * 1000)
+
+
+def record(endpoint, queries, timings):
+    """Add a request's measurements to its endpoint's totals.
+
+    Args:
+        endpoint (str): The name of the endpoint that was requested.
+        queries (int): The number of queries the request made.
+        timings (dict): The request's timings in milliseconds.
+    """
+    with _metrics_lock:
+        totals = _metrics.get(endpoint)
+        if totals is None:
+            totals = _metrics[endpoint] = dict.fromkeys(
+                ['requests', 'queries', 'max_total_ms'] +
+                ['{}_ms'.format(name) for name in TIMINGS], 0)
+
+        totals['requests'] += 1
+        totals['queries'] += queries
+        totals['max_total_ms'] = max(
+            totals['max_total_ms'], timings.get('total', 0))
+
+        for name in TIMINGS:
+            totals['{}_ms'.format(name)] += timings.get(name, 0)
+
+
+def get_metrics():
+    """Get the totals recorded for each endpoint.
+
+    The totals are kept in memory for the current process.
+
+    Returns:
+        dict: A dictionary for each endpoint containing the number of
+            `requests` and `queries`, the total milliseconds spent in
+            each of `TIMINGS`, and the `max_total_ms` of a single
+            request.
+    """
+    with _metrics_lock:
+        return OrderedDict(
+            (endpoint, dict(_metrics[endpoint]))
+            for endpoint in sorted(_metrics.keys()))
+
+
+def reset_metrics():
+    """Discard the totals recorded for every endpoint."""
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def get_server_timing(queries, timings):
+    """Format a request's measurements as a ``Server-Timing`` header.
+
+    Args:
+        queries (int): The number of queries the request made.
+        timings (dict): The request's timings in milliseconds.
+
+    Returns:
+        str: The value of the header.
+    """
+    entries = []
+    for name in TIMINGS:
+        if name not in timings:
+            continue
+
+        entry = '{};dur={:.2f}'.format(name, timings[name])
+        if name == 'db':
+            entry += ';desc="{} queries"'.format(queries)
+
+        entries.append(entry)
+
+    return ', '.join(entries)
+
+
+class InstrumentationMiddleware(MiddlewareMixin):
+    """Middleware measuring the requests made to the app.
+
+    The queries made by a request are captured in the same way as when
+    ``DEBUG`` is true, but only while the request is being handled. If
+    instrumentation is disabled, requests pass straight through.
+    """
+
+    def process_request(self, request):
+        """Start instrumenting a request."""
+        if not app_settings.METRICS_ENABLED:
+            return
+
+        request.timetracker_timings = {}
+        request.timetracker_queries = {}
+
+        for connection in connections.all():
+            request.timetracker_queries[connection.alias] = (
+                connection.force_debug_cursor, len(connection.queries_log))
+            connection.force_debug_cursor = True
+
+        request.timetracker_start = default_timer()
+
+    def process_response(self, request, response):
+        """Finish instrumenting a request and record its measurements.
+
+        Returns:
+            The response, with a ``Server-Timing`` header added if the
+            request was instrumented.
+        """
+        timings = _get_timings(request)
+        if timings is None:
+            return response
+
+        timings['total'] = (
+            default_timer() - request.timetracker_start) * 1000
+
+        queries = 0
+        timings['db'] = 0
+        for connection in connections.all():
+            if connection.alias not in request.timetracker_queries:
+                continue
+
+            debug, start = request.timetracker_queries[connection.alias]
+            connection.force_debug_cursor = debug
+
+            log = list(connection.queries_log)[start:]
+            queries += len(log)
+            timings['db'] += sum(float(query['time']) for query in log) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = '{} {}'.format(
+            request.method, match.url_name if match else 'unknown')
+
+        record(endpoint, queries, timings)
+        response['Server-Timing'] = get_server_timing(queries, timings)
+
+        return response
+
+
+class TimedRenderer(object):
+    """Wrapper around a renderer that times the rendering of responses.
+
+    Every other attribute is passed through to the wrapped renderer.
+    """
+
+    def __init__(self, renderer, request):
+        """Wrap a renderer.
+
+        Args:
+            renderer: The renderer to wrap.
+            request: The request the response is rendered for.
+        """
+        self.renderer = renderer
+        self.request = request
+
+    def __getattr__(self, name):
+        """Get an attribute of the wrapped renderer."""
+        return getattr(self.renderer, name)
+
+    def render(self, *args, **kwargs):
+        """Render a response using the wrapped renderer."""
+        with timed(self.request, 'render'):
+            return self.renderer.render(*args, **kwargs)
+
+
+class InstrumentedViewMixin(object):
+    """Mixin for views whose serialization should be instrumented.
+
+    Responses are rendered using a `TimedRenderer`, and the view can
+    time its own serialization using `timed`.
+    """
+
+    def perform_content_negotiation(self, request, force=False):
+        """Select a renderer, wrapping it if the request is instrumented.
+
+        Returns:
+            tuple: The renderer and the accepted media type.
+        """
+        renderer, media_type = super(
+            InstrumentedViewMixin, self).perform_content_negotiation(
+                request, force)
+
+        if _get_timings(request) is not None:
+            renderer = TimedRenderer(renderer, request)
+
+        return renderer, media_type
+
+    def timed(self, name):
+        """Time a block of code as part of the current request.
+
+        Args:
+            name (str): The name of the timing. One of `TIMINGS`.
+
+        Returns:
+            A context manager timing the block it wraps.
+        """
+        return timed(self.request, name)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 00:43
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+ACTIVE_INDEX_NAME = 'timetracker_activity_active'
+
+# Backends that support indexes with a WHERE clause.
+PARTIAL_INDEX_VENDORS = ('postgresql', 'sqlite')
+
+
+def create_active_index(apps, schema_editor):
+    """Create an index covering in-progress activities.
+
+    On backends supporting partial indexes, only rows without an
+    `end_time` are indexed, which keeps the index tiny no matter how
+    many completed activities there are. Other backends get a regular
+    index on `end_time`.
+    """
+    Activity = apps.get_model('timetracker', 'Activity')
+    table = schema_editor.quote_name(Activity._meta.db_table)
+    name = schema_editor.quote_name(ACTIVE_INDEX_NAME)
+
+    if schema_editor.connection.vendor in PARTIAL_INDEX_VENDORS:
+        sql = 'CREATE INDEX {} ON {} ({}) WHERE {} IS NULL'.format(
+            name, table, schema_editor.quote_name('start_time'),
+            schema_editor.quote_name('end_time'))
+    else:
+        sql = 'CREATE INDEX {} ON {} ({})'.format(
+            name, table, schema_editor.quote_name('end_time'))
+
+    schema_editor.execute(sql)
+
+
+def drop_active_index(apps, schema_editor):
+    """Drop the index covering in-progress activities."""
+    Activity = apps.get_model('timetracker', 'Activity')
+
+    schema_editor.execute(schema_editor.sql_delete_index % {
+        'name': schema_editor.quote_name(ACTIVE_INDEX_NAME),
+        'table': schema_editor.quote_name(Activity._meta.db_table),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetracker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='activity',
+            index_together=set([('start_time', 'id')]),
+        ),
+        migrations.RunPython(create_active_index, drop_active_index),
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 00:53
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def populate_durations(apps, schema_editor):
+    """Calculate the duration of existing completed activities."""
+    Activity = apps.get_model('timetracker', 'Activity')
+
+    Activity.objects.filter(end_time__isnull=False).update(
+        duration=models.ExpressionWrapper(
+            models.F('end_time') - models.F('start_time'),
+            output_field=models.DurationField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetracker', '0004_activity_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='duration',
+            field=models.DurationField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_durations, migrations.RunPython.noop),
+    ]
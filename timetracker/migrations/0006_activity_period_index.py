@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 01:10
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+PERIOD_INDEX_NAME = 'timetracker_activity_period'
+
+
+def create_period_index(apps, schema_editor):
+    """Create a GiST index on the time range of each activity.
+
+    The index lets PostgreSQL find overlapping activities with a range
+    overlap join. Activities that end before they start can't be
+    represented as a range, so they are left out of the index. Other
+    backends find overlaps without an index.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Activity = apps.get_model('timetracker', 'Activity')
+    start_time = schema_editor.quote_name('start_time')
+    end_time = schema_editor.quote_name('end_time')
+
+    schema_editor.execute(
+        'CREATE INDEX {} ON {} USING gist (tstzrange({}, {})) '
+        'WHERE {} IS NULL OR {} >= {}'.format(
+            schema_editor.quote_name(PERIOD_INDEX_NAME),
+            schema_editor.quote_name(Activity._meta.db_table),
+            start_time, end_time, end_time, end_time, start_time))
+
+
+def drop_period_index(apps, schema_editor):
+    """Drop the GiST index on the time range of each activity."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Activity = apps.get_model('timetracker', 'Activity')
+
+    schema_editor.execute(schema_editor.sql_delete_index % {
+        'name': schema_editor.quote_name(PERIOD_INDEX_NAME),
+        'table': schema_editor.quote_name(Activity._meta.db_table),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetracker', '0005_activity_duration'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_period_index, drop_period_index),
+    ]
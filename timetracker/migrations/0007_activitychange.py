@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 01:20
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetracker', '0006_activity_period_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity_id', models.PositiveIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('deleted', 'Deleted'), ('updated', 'Updated')], max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
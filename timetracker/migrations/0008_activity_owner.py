@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 01:30
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('timetracker', '0007_activitychange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activities', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='activitychange',
+            name='owner_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterIndexTogether(
+            name='activity',
+            index_together=set([('start_time', 'id'), ('owner', 'start_time', 'id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='activitychange',
+            index_together=set([('owner_id', 'id')]),
+        ),
+    ]
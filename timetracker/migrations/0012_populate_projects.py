@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 02:36
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+def populate_projects(apps, schema_editor):
+    """Create a project for each distinct title and assign activities."""
+    db = schema_editor.connection.alias
+    Activity = apps.get_model('timetracker', 'Activity')
+    ArchivedActivity = apps.get_model('timetracker', 'ArchivedActivity')
+    Project = apps.get_model('timetracker', 'Project')
+
+    titles = set(Activity.objects.using(db).values_list(
+        'title', flat=True).distinct())
+    titles.update(ArchivedActivity.objects.using(db).values_list(
+        'title', flat=True).distinct())
+
+    Project.objects.using(db).bulk_create(
+        [Project(name=title) for title in sorted(titles)])
+
+    for pk, name in Project.objects.using(db).values_list('pk', 'name'):
+        Activity.objects.using(db).filter(title=name).update(project=pk)
+        ArchivedActivity.objects.using(db).filter(title=name).update(
+            project=pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetracker', '0011_project'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_projects, migrations.RunPython.noop),
+    ]
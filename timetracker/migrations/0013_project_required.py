@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 02:37
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetracker', '0012_populate_projects'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activity',
+            name='project',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='activities', to='timetracker.Project'),
+        ),
+        migrations.AlterField(
+            model_name='archivedactivity',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_activities', to='timetracker.Project'),
+        ),
+    ]
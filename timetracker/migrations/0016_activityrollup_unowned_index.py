@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 02:50
+from __future__ import unicode_literals
+
+from django.db import migrations
+from django.db.models import Count, Min, Sum
+
+
+UNOWNED_ROLLUP_INDEX_NAME = 'timetracker_activityrollup_unowned'
+
+# Backends that support indexes with a WHERE clause.
+PARTIAL_INDEX_VENDORS = ('postgresql', 'sqlite')
+
+
+def merge_unowned_rollups(apps, schema_editor):
+    """Merge the rollups without an owner for the same day and title.
+
+    Concurrent saves could insert several of them, since they're never
+    equal in the unique constraint.
+    """
+    db = schema_editor.connection.alias
+    ActivityRollup = apps.get_model('timetracker', 'ActivityRollup')
+    unowned = ActivityRollup.objects.using(db).filter(owner__isnull=True)
+
+    duplicates = unowned.values('date', 'title').annotate(
+        first=Min('pk'),
+        rows=Count('pk'),
+        total_count=Sum('count'),
+        total=Sum('total_seconds'),
+    ).filter(rows__gt=1)
+
+    for row in duplicates:
+        rollups = unowned.filter(date=row['date'], title=row['title'])
+        rollups.exclude(pk=row['first']).delete()
+        rollups.update(count=row['total_count'], total_seconds=row['total'])
+
+
+def create_unowned_index(apps, schema_editor):
+    """Create a unique index on the rollups without an owner.
+
+    Other backends have no partial indexes, so concurrent saves can
+    still duplicate these rollups there until they are rebuilt.
+    """
+    if schema_editor.connection.vendor not in PARTIAL_INDEX_VENDORS:
+        return
+
+    ActivityRollup = apps.get_model('timetracker', 'ActivityRollup')
+
+    schema_editor.execute(
+        'CREATE UNIQUE INDEX {} ON {} ({}, {}) WHERE {} IS NULL'.format(
+            schema_editor.quote_name(UNOWNED_ROLLUP_INDEX_NAME),
+            schema_editor.quote_name(ActivityRollup._meta.db_table),
+            schema_editor.quote_name('date'),
+            schema_editor.quote_name('title'),
+            schema_editor.quote_name('owner_id')))
+
+
+def drop_unowned_index(apps, schema_editor):
+    """Drop the unique index on the rollups without an owner."""
+    if schema_editor.connection.vendor not in PARTIAL_INDEX_VENDORS:
+        return
+
+    ActivityRollup = apps.get_model('timetracker', 'ActivityRollup')
+
+    schema_editor.execute(schema_editor.sql_delete_index % {
+        'name': schema_editor.quote_name(UNOWNED_ROLLUP_INDEX_NAME),
+        'table': schema_editor.quote_name(ActivityRollup._meta.db_table),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetracker', '0015_activitychange_created_at_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_unowned_rollups, migrations.RunPython.noop),
+        migrations.RunPython(create_unowned_index, drop_unowned_index),
+    ]
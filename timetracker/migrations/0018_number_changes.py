@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 03:00
+from __future__ import unicode_literals
+
+from django.db import migrations
+from django.db.models import F, Max
+
+
+def number_changes(apps, schema_editor):
+    """Number the existing changes after their ids and start the counter."""
+    db = schema_editor.connection.alias
+    ActivityChange = apps.get_model('timetracker', 'ActivityChange')
+    ActivityChangeCounter = apps.get_model(
+        'timetracker', 'ActivityChangeCounter')
+
+    ActivityChange.objects.using(db).update(sequence=F('pk'))
+
+    newest = ActivityChange.objects.using(db).aggregate(
+        newest=Max('pk'))['newest']
+    ActivityChangeCounter.objects.using(db).create(pk=1, value=newest or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timetracker', '0017_activitychange_sequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(number_changes, migrations.RunPython.noop),
+    ]
@@ -4,15 +4,368 @@ These models are responsible for storing and representing the data that
 is manipulated within the app.
 """
 
-from django.db import models
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import (
+    IntegrityError, connections, models, router, transaction)
+from django.db.models import (
+    DateTimeField, DurationField, ExpressionWrapper, F, Max, Min, Q, Value)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from timetracker import cache, projects, pubsub, reports
+
+
+# The values of an activity that determine its contribution to the
+# daily rollups.
+RollupState = namedtuple(
+    'RollupState', ['owner_id', 'title', 'start_time', 'end_time'])
+
+
+class ActivityQuerySet(models.QuerySet):
+    """Custom queryset for `Activity` instances."""
+
+    # The largest number of activities deleted in each query, which
+    # keeps the number of parameters within SQLite's limit.
+    delete_batch_size = 500
+
+    def active(self):
+        """Get the activities that are in progress.
+
+        Returns:
+            QuerySet: The activities without an `end_time`.
+        """
+        return self.filter(end_time__isnull=True)
+
+    def bulk_create(self, objs, batch_size=None):
+        """Insert activities in bulk, recording their creation.
+
+        The primary keys of the inserted activities are always set, so
+        that their creation can be recorded in the change log. SQLite
+        can't return them from the insert, but holds a write lock on the
+        database for the rest of the transaction, so they are the most
+        recently inserted keys, unless some of the activities were given
+        their own keys. Otherwise, on SQLite and on backends that can't
+        return the keys either (such as MySQL), each activity is saved
+        individually.
+
+        Args:
+            objs (list): The activities to insert.
+            batch_size (int, optional): The number of activities to
+                insert in each query.
+
+        Returns:
+            list: The inserted activities.
+        """
+        objs = list(objs)
+        connection = connections[self.db]
+
+        with transaction.atomic(using=self.db):
+            Activity.assign_projects(objs, using=self.db)
+
+            # The keys can only be read back on SQLite when every
+            # activity was given one by the insert.
+            read_back = (
+                connection.vendor == 'sqlite' and
+                all(obj.pk is None for obj in objs))
+
+            if not (connection.features.can_return_ids_from_bulk_insert or
+                    read_back):
+                for obj in objs:
+                    obj.save(force_insert=True, using=self.db)
+
+                return objs
+
+            objs = super(ActivityQuerySet, self).bulk_create(
+                objs, batch_size=batch_size)
+
+            missing = [obj for obj in objs if obj.pk is None]
+            if missing:
+                pks = self.model._default_manager.using(self.db).order_by(
+                    '-pk').values_list('pk', flat=True)[:len(missing)]
+
+                for obj, pk in zip(missing, reversed(list(pks))):
+                    obj.pk = pk
+                    obj._state.adding = False
+                    obj._state.db = self.db
+
+            ActivityChange.objects.using(self.db).record(
+                ActivityChange.CREATED, objs)
+            ActivityRollup.objects.using(self.db).update_for(objs)
+
+        return objs
+
+    def completed(self):
+        """Get the activities that have ended.
+
+        Returns:
+            QuerySet: The activities with an `end_time`.
+        """
+        return self.filter(end_time__isnull=False)
+
+    def delete(self):
+        """Delete the activities in bulk, recording their deletion.
+
+        The activities are deleted using as few queries as possible
+        rather than one at a time, so the `post_delete` receivers aren't
+        run. Their deletions are recorded, the rollups updated, and the
+        cached responses invalidated once for all of the activities
+        instead.
+
+        Returns:
+            tuple: The number of activities deleted, and a dictionary of
+                the number deleted by model, like `QuerySet.delete`.
+        """
+        assert self.query.can_filter(), \
+            "Cannot use 'limit' or 'offset' with delete."
+
+        db = self._db or router.db_for_write(self.model)
+
+        with transaction.atomic(using=db):
+            activities = list(self.using(db).select_for_update().only(
+                *RollupState._fields))
+            deleted = self._delete_rows(
+                db, [activity.pk for activity in activities])
+
+            if activities:
+                cache.invalidate_on_commit(db)
+                ActivityChange.objects.using(db).record(
+                    ActivityChange.DELETED, activities)
+                ActivityRollup.objects.using(db).update_for(
+                    activities, deleted=True)
+
+        return deleted, {self.model._meta.label: deleted}
+
+    def overlapping(self, start, end=None):
+        """Get the activities that overlap a period of time.
+
+        In-progress activities are treated as if they never end.
+
+        Args:
+            start (datetime): The start of the period.
+            end (datetime, optional): The end of the period. If not
+                given, the period has no end.
+
+        Returns:
+            QuerySet: The activities that were in progress at some point
+                during the period.
+        """
+        queryset = self.filter(
+            Q(end_time__gt=start) | Q(end_time__isnull=True))
+
+        if end is not None:
+            queryset = queryset.filter(start_time__lt=end)
+
+        return queryset
+
+    def purge(self):
+        """Delete the activities without any of the usual bookkeeping.
+
+        The rows are deleted with SQL, so no signals are sent: the
+        deletions aren't recorded in the change log, the activities stay
+        in the rollups, and cached responses aren't invalidated.
+
+        Returns:
+            int: The number of activities deleted.
+        """
+        db = self._db or router.db_for_write(self.model)
+
+        return self._delete_rows(
+            db, list(self.using(db).values_list('pk', flat=True)))
+
+    def _delete_rows(self, db, ids):
+        """Delete the rows of activities with SQL.
+
+        Args:
+            db (str): The alias of the database to delete them from.
+            ids (list): The ids of the activities.
+
+        Returns:
+            int: The number of activities deleted.
+        """
+        connection = connections[db]
+        sql = 'DELETE FROM {table} WHERE {pk} IN ({{ids}})'.format(
+            table=connection.ops.quote_name(self.model._meta.db_table),
+            pk=connection.ops.quote_name(self.model._meta.pk.column))
+
+        deleted = 0
+        with connection.cursor() as cursor:
+            for i in range(0, len(ids), self.delete_batch_size):
+                batch = ids[i:i + self.delete_batch_size]
+                cursor.execute(
+                    sql.format(ids=', '.join(['%s'] * len(batch))), batch)
+                deleted += cursor.rowcount
+
+        return deleted
+
+    def start(self, title, start_time=None, owner=None):
+        """Start a new activity, stopping any that are in progress.
+
+        The owner's timer (see `ActivityTimer`) is locked, then the
+        in-progress activities are stopped and the new activity is
+        created in the same transaction, so concurrent starts can't
+        leave more than one activity in progress. To only stop the
+        activities of the new activity's owner, call this on a queryset
+        of their activities.
+
+        Args:
+            title (str): The title of the new activity.
+            start_time (datetime, optional): The time the new activity
+                started. Defaults to the current time.
+            owner (User, optional): The user who owns the new activity.
+
+        Returns:
+            tuple: The new activity and a list of the activities that
+                were stopped.
+
+        Raises:
+            ValueError: If an in-progress activity started after
+                `start_time`, since it can't be stopped before it began.
+        """
+        start_time = start_time or timezone.now()
+
+        with transaction.atomic(using=self.db):
+            ActivityTimer.objects.using(self.db).acquire(owner)
+
+            if self.active().filter(start_time__gt=start_time).exists():
+                raise ValueError(
+                    'An activity that started later is in progress.')
+
+            stopped = self.stop(end_time=start_time)
+            activity = self.create(
+                owner=owner, start_time=start_time, title=title)
+
+        return activity, stopped
+
+    def stop(self, end_time=None):
+        """Stop the in-progress activities in the queryset.
+
+        The activities are locked and then stopped using a single
+        conditional ``UPDATE ... WHERE end_time IS NULL``, so concurrent
+        requests can't stop the same activity twice. Activities that
+        started after `end_time` are left running.
+
+        Args:
+            end_time (datetime, optional): The time the activities
+                ended. Defaults to the current time.
+
+        Returns:
+            list: The activities that were stopped.
+        """
+        end_time = end_time or timezone.now()
+        updated_at = timezone.now()
+
+        with transaction.atomic(using=self.db):
+            activities = list(self.active().filter(
+                start_time__lte=end_time).select_for_update())
+
+            if activities:
+                self.model._default_manager.using(self.db).filter(
+                    end_time__isnull=True,
+                    pk__in=[activity.pk for activity in activities],
+                ).update(
+                    duration=ExpressionWrapper(
+                        Value(end_time, output_field=DateTimeField()) -
+                        F('start_time'),
+                        output_field=DurationField()),
+                    end_time=end_time,
+                    updated_at=updated_at)
+
+                # Updates don't send the `post_save` signal.
+                cache.invalidate_on_commit(self.db)
+                ActivityChange.objects.using(self.db).record(
+                    ActivityChange.UPDATED, activities)
+
+            for activity in activities:
+                activity.end_time = end_time
+                activity.updated_at = updated_at
+                activity.update_duration()
+
+            ActivityRollup.objects.using(self.db).update_for(activities)
+
+        return activities
+
+    def with_duration(self, now=None):
+        """Annotate activities with the time spent on them so far.
+
+        Unlike the stored `duration`, the `current_duration` annotation
+        includes the time spent on in-progress activities.
+
+        Args:
+            now (datetime, optional): The time in-progress activities
+                are measured up to. Defaults to the current time.
+
+        Returns:
+            QuerySet: The activities with a `current_duration`
+                annotation.
+        """
+        now = Value(now or timezone.now(), output_field=DateTimeField())
+
+        return self.annotate(current_duration=ExpressionWrapper(
+            Coalesce('end_time', now) - F('start_time'),
+            output_field=DurationField()))
+
 
 class Activity(models.Model):
-    """An activity with a title, start time, and end time."""
-    title = models.CharField(max_length=200)
+    """An activity with a title, start time, and end time.
+
+    The time an activity was last modified is tracked in `updated_at`,
+    which is used to tell clients whether their copy is up to date.
+
+    The `duration` of completed activities is stored so that the
+    database can sort, filter, and sum activities by their duration. It
+    is calculated whenever the activity is saved.
+
+    Each activity belongs to the `project` named after its title, which
+    is assigned whenever the activity is saved, so that reports can group
+    activities by an integer key.
+
+    Activities can belong to an `owner`, which allows a single
+    deployment to serve many users when ``TIMETRACKER_SCOPE_TO_OWNER``
+    is enabled. Activities created before owners were introduced have
+    no owner until they are assigned one.
+    """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        db_index=False,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='activities')
+    title = models.CharField(db_index=True, max_length=200)
+    project = models.ForeignKey(
+        'Project',
+        editable=False,
+        on_delete=models.PROTECT,
+        related_name='activities')
     start_time = models.DateTimeField(default=timezone.now)
-    end_time = models.DateTimeField(blank=True, null=True)
+    end_time = models.DateTimeField(blank=True, db_index=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    duration = models.DurationField(
+        blank=True, db_index=True, editable=False, null=True)
+
+    objects = ActivityQuerySet.as_manager()
+
+    class Meta(object):
+        """Options for the `Activity` model.
+
+        Activities are listed in ``(start_time, id)`` order, so an index
+        on those columns lets each page be read straight from the index.
+        The same index prefixed by the owner does the same for each
+        owner's activities, and also serves lookups by owner, so the
+        foreign key doesn't need an index of its own.
+        In-progress activities are also covered by a partial index that
+        is maintained outside of the model, since Django can't express
+        one here (see `signals.create_partial_indexes`). On PostgreSQL,
+        each activity's time range is covered by a GiST index used to
+        find overlapping activities (see `overlaps`).
+        """
+        index_together = (
+            ('owner', 'start_time', 'id'),
+            ('start_time', 'id'),
+        )
 
     def __str__(self):
         """Convert the instance to a string.
@@ -30,9 +383,651 @@ class Activity(models.Model):
         return '{}: {} - {}'.format(
             self.title, self.start_time.strftime('%Y-%M-%d %H:%m'), end_str)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Create an activity loaded from the database.
+
+        The values the activity was loaded with are remembered, so that
+        its old contribution to the rollups can be removed when it is
+        changed.
+        """
+        instance = super(Activity, cls).from_db(db, field_names, values)
+
+        if set(RollupState._fields).issubset(field_names):
+            instance.remember_rollup_state()
+
+        return instance
+
+    @classmethod
+    def assign_projects(cls, activities, using=None):
+        """Assign activities to the projects named after their titles.
+
+        Args:
+            activities (list): The activities to assign.
+            using (str, optional): The alias of the database the
+                activities are saved to.
+        """
+        ids = Project.objects.db_manager(using).get_ids(
+            activity.title for activity in activities)
+
+        for activity in activities:
+            activity.project_id = ids[activity.title]
+
     @property
     def is_active(self):
         """bool: True if the instance has no `end_time`, False
             otherwise.
         """
         return self.end_time is None
+
+    def get_rollup_state(self):
+        """Get the values that determine the activity's rollups.
+
+        Returns:
+            RollupState: The activity's owner id, title, start time, and
+                end time.
+        """
+        return RollupState(
+            self.owner_id, self.title, self.start_time, self.end_time)
+
+    def remember_rollup_state(self):
+        """Remember the values the rollups were last updated with."""
+        self._rollup_state = self.get_rollup_state()
+
+    def save(self, *args, **kwargs):
+        """Save the activity after calculating its duration.
+
+        The activity is assigned to the project named after its title if
+        it has none yet, or if its title changed since it was loaded.
+        """
+        self.update_duration()
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+
+        # The `post_save` receivers record the change and update the
+        # rollups, so they're run in the same transaction as the save.
+        with transaction.atomic(using=using):
+            state = getattr(self, '_rollup_state', None)
+            if (self.project_id is None or state is None or
+                    state.title != self.title):
+                self.assign_projects([self], using=using)
+
+            if self.pk is not None and state is None:
+                # The activity wasn't loaded from the database, so the
+                # values it is about to replace have to be read first.
+                row = type(self)._default_manager.db_manager(
+                    using).filter(pk=self.pk).values_list(
+                        *RollupState._fields).first()
+                if row is not None:
+                    self._rollup_state = RollupState(*row)
+
+            super(Activity, self).save(*args, **kwargs)
+
+    def update_duration(self):
+        """Calculate the activity's duration from its start and end.
+
+        This is called automatically when the activity is saved, but has
+        to be called explicitly before bulk inserts or updates.
+        """
+        if self.end_time is None:
+            self.duration = None
+        else:
+            self.duration = self.end_time - self.start_time
+
+
+class ActivityChangeQuerySet(models.QuerySet):
+    """Custom queryset for `ActivityChange` instances."""
+
+    def number(self):
+        """Give sequence numbers to the committed changes without one.
+
+        The changes are numbered in a transaction that locks the
+        `ActivityChangeCounter`, so changes are numbered in the order
+        they become visible, however long the transactions that made
+        them took to commit. Clients that have read the changes up to a
+        sequence number therefore never miss a change that commits
+        later.
+
+        Returns:
+            int: The number of changes numbered.
+        """
+        db = self._db or router.db_for_write(self.model)
+        pending = self.model._default_manager.using(db).filter(
+            sequence__isnull=True)
+
+        if not pending.exists():
+            return 0
+
+        with transaction.atomic(using=db):
+            counter, _ = ActivityChangeCounter.objects.using(
+                db).select_for_update().get_or_create(pk=1)
+
+            bounds = pending.aggregate(first=Min('pk'), last=Max('pk'))
+            if bounds['first'] is None:
+                return 0
+
+            # Each change is numbered after its id, offset so that the
+            # numbers follow the last number given.
+            offset = counter.value + 1 - bounds['first']
+            numbered = pending.filter(
+                pk__gte=bounds['first'], pk__lte=bounds['last'],
+            ).update(sequence=F('pk') + offset)
+
+            counter.value = bounds['last'] + offset
+            counter.save(update_fields=['value'])
+
+        return numbered
+
+    def record(self, action, activities):
+        """Record a change to some activities.
+
+        Once the current transaction is committed, the changes are
+        numbered and requests waiting for changes in this process are
+        notified.
+
+        Args:
+            action (str): The change that was made. One of the actions
+                defined on `ActivityChange`.
+            activities (list): The changed activities.
+        """
+        if not activities:
+            return
+
+        created_at = timezone.now()
+        self.bulk_create([
+            ActivityChange(
+                action=action,
+                activity_id=activity.pk,
+                created_at=created_at,
+                owner_id=activity.owner_id)
+            for activity in activities
+        ])
+
+        db = self.db
+
+        def number_and_publish():
+            ActivityChange.objects.using(db).number()
+            pubsub.publish()
+
+        transaction.on_commit(number_and_publish, using=db)
+
+
+class ActivityChange(models.Model):
+    """A record of an activity being created, updated, or deleted.
+
+    Changes are given sequence numbers once they are committed, which
+    are used by the change feed, so that clients can fetch only the
+    changes made since they last checked. The activity and its owner
+    are referred to by their ids rather than foreign keys so that
+    deletions can be recorded.
+
+    Changes are recorded in the same transaction as the change to the
+    activity. Their ids are assigned when they are inserted, so a change
+    with a lower id can commit after one with a higher id, which is why
+    the ids aren't used as sequence numbers. Committed changes that
+    haven't been numbered yet are numbered before the feed is read.
+    """
+    CREATED = 'created'
+    DELETED = 'deleted'
+    UPDATED = 'updated'
+
+    ACTION_CHOICES = (
+        (CREATED, 'Created'),
+        (DELETED, 'Deleted'),
+        (UPDATED, 'Updated'),
+    )
+
+    activity_id = models.PositiveIntegerField()
+    owner_id = models.PositiveIntegerField(blank=True, null=True)
+    action = models.CharField(choices=ACTION_CHOICES, max_length=10)
+    created_at = models.DateTimeField(db_index=True, default=timezone.now)
+    sequence = models.BigIntegerField(blank=True, null=True, unique=True)
+
+    objects = ActivityChangeQuerySet.as_manager()
+
+    class Meta(object):
+        """Options for the `ActivityChange` model.
+
+        When activities are scoped to their owners, each owner's changes
+        are read in order starting from a sequence number.
+        """
+        index_together = (('owner_id', 'sequence'),)
+
+    def __str__(self):
+        """Convert the instance to a string.
+
+        Returns:
+            str: A string in the format "`sequence`: `action`
+                `activity_id`".
+        """
+        return '{}: {} {}'.format(
+            self.sequence, self.action, self.activity_id)
+
+
+class ActivityChangeCounter(models.Model):
+    """The last sequence number given to a change.
+
+    There is a single counter, which is locked while changes are
+    numbered so that they're numbered one transaction at a time (see
+    `ActivityChangeQuerySet.number`).
+    """
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        """Convert the instance to a string.
+
+        Returns:
+            str: The last sequence number given.
+        """
+        return str(self.value)
+
+
+class ActivityRollupQuerySet(models.QuerySet):
+    """Custom queryset for `ActivityRollup` instances."""
+
+    def add(self, states):
+        """Add the contributions of some new activities to the rollups.
+
+        Args:
+            states (list): The `RollupState` of each activity.
+        """
+        self.apply([(1, state) for state in states])
+
+    def apply(self, changes):
+        """Add and remove the contributions of activities to the rollups.
+
+        The rollups of each affected day and title that already exist
+        are adjusted using a single query each, so that concurrent
+        changes add up. The rollups that didn't exist, or were deleted
+        in the meantime, are then inserted together (see
+        `insert_missing`).
+
+        Args:
+            changes (list): Pairs of a sign, which is 1 to add a
+                contribution or -1 to remove it, and the `RollupState`
+                of an activity, or `None` if it contributes nothing.
+        """
+        deltas = defaultdict(lambda: [timedelta(), 0])
+
+        for sign, state in changes:
+            if state is None or state.end_time is None:
+                continue
+
+            days = reports.split_activity_by_day(
+                state.start_time, state.end_time)
+            for day, duration in days:
+                delta = deltas[(state.owner_id, day, state.title)]
+                delta[0] += duration * sign
+                delta[1] += sign
+
+        deltas = {
+            key: (duration.total_seconds(), count)
+            for key, (duration, count) in deltas.items()
+            if duration or count
+        }
+        if not deltas:
+            return
+
+        days = [key[1] for key in deltas]
+
+        with transaction.atomic(using=self.db):
+            existing = set(self.filter(
+                date__gte=min(days), date__lte=max(days)).values_list(
+                    'owner_id', 'date', 'title'))
+
+            missing = []
+            for key, (seconds, count) in deltas.items():
+                owner_id, day, title = key
+
+                updated = 0
+                rollups = self.filter(owner_id=owner_id, date=day, title=title)
+                if key in existing:
+                    updated = rollups.update(
+                        count=F('count') + count,
+                        total_seconds=F('total_seconds') + seconds)
+
+                if not updated:
+                    if count > 0:
+                        missing.append(ActivityRollup(
+                            count=count,
+                            date=day,
+                            owner_id=owner_id,
+                            title=title,
+                            total_seconds=seconds))
+                elif count < 0:
+                    rollups.filter(count__lte=0).delete()
+
+            if missing:
+                self.insert_missing(missing)
+
+    def insert_missing(self, rollups):
+        """Insert new rollups, adding to any inserted concurrently.
+
+        Another transaction may insert the same rollups after they were
+        found to be missing, in which case the insert fails and the
+        contributions are added to the other transaction's rollups once
+        it commits.
+
+        Args:
+            rollups (list): The unsaved rollups to insert.
+        """
+        try:
+            with transaction.atomic(using=self.db):
+                self.bulk_create(rollups)
+            return
+        except IntegrityError:
+            pass
+
+        for rollup in rollups:
+            try:
+                with transaction.atomic(using=self.db):
+                    self.bulk_create([rollup])
+            except IntegrityError:
+                self.filter(
+                    owner_id=rollup.owner_id,
+                    date=rollup.date,
+                    title=rollup.title,
+                ).update(
+                    count=F('count') + rollup.count,
+                    total_seconds=F('total_seconds') + rollup.total_seconds)
+
+    def update_for(self, activities, deleted=False):
+        """Update the rollups after some activities were changed.
+
+        The contribution each activity made to the rollups when it was
+        loaded or last saved is replaced by its current contribution.
+
+        Args:
+            activities (list): The activities that were created, updated,
+                or deleted.
+            deleted (bool, optional): Whether the activities were
+                deleted.
+        """
+        changes = []
+
+        for activity in activities:
+            previous = getattr(activity, '_rollup_state', None)
+
+            if deleted:
+                changes.append((-1, previous or activity.get_rollup_state()))
+                activity._rollup_state = None
+            else:
+                changes.append((-1, previous))
+                changes.append((1, activity.get_rollup_state()))
+                activity.remember_rollup_state()
+
+        self.apply(changes)
+
+
+class ActivityRollup(models.Model):
+    """The time spent on activities with the same title on one day.
+
+    Rollups let reports read one row per day and title instead of every
+    activity. They are kept up to date as activities are saved, and can
+    be recomputed from the activities using the
+    ``rebuild_activity_rollups`` management command (see `rollups`).
+
+    Like `reports.summarize`, the time spent on activities that cross
+    midnight is split between the days they cover, and they are counted
+    once on each day. In-progress activities are not included.
+    """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        db_index=False,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='activity_rollups')
+    date = models.DateField(db_index=True)
+    title = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+    total_seconds = models.FloatField(default=0)
+
+    objects = ActivityRollupQuerySet.as_manager()
+
+    class Meta(object):
+        """Options for the `ActivityRollup` model.
+
+        The unique constraint also serves lookups of an owner's rollups
+        by date, so the foreign key doesn't need an index of its own.
+        Rows without an owner are never equal in the constraint, so on
+        backends with partial indexes they are kept unique by a separate
+        index (see `signals.UNOWNED_ROLLUP_INDEX_NAME`).
+        """
+        unique_together = (('owner', 'date', 'title'),)
+
+    def __str__(self):
+        """Convert the instance to a string.
+
+        Returns:
+            str: A string in the format "`date` `title`: `count`".
+        """
+        return '{} {}: {}'.format(self.date, self.title, self.count)
+
+
+class ArchivedActivityQuerySet(models.QuerySet):
+    """Custom queryset for `ArchivedActivity` instances."""
+
+    def completed(self):
+        """Get the archived activities that have ended.
+
+        Only completed activities are archived, so this is every
+        archived activity. It lets archived activities be passed to the
+        same reports as activities.
+
+        Returns:
+            QuerySet: The archived activities.
+        """
+        return self.all()
+
+
+class ArchivedActivity(models.Model):
+    """A completed activity moved out of the `Activity` table.
+
+    Old activities are rarely read, so they can be moved to the archive
+    using the ``archive_activities`` management command to keep the
+    table and indexes of current activities small (see `archive`).
+    Archived activities keep their original ids, so links to them keep
+    working, and remain in the daily rollups.
+    """
+    id = models.IntegerField(primary_key=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        db_index=False,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='archived_activities')
+    title = models.CharField(max_length=200)
+    project = models.ForeignKey(
+        'Project',
+        on_delete=models.PROTECT,
+        related_name='archived_activities')
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField()
+    duration = models.DurationField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    objects = ArchivedActivityQuerySet.as_manager()
+
+    class Meta(object):
+        """Options for the `ArchivedActivity` model.
+
+        Archived activities are listed in the same order as activities,
+        so they have the same ``(start_time, id)`` indexes.
+        """
+        index_together = (
+            ('owner', 'start_time', 'id'),
+            ('start_time', 'id'),
+        )
+
+    def __str__(self):
+        """Convert the instance to a string.
+
+        Returns:
+            str: A string in the format "`title`: `start_time` -
+                `end_time`", where the dates are formatted like
+                YYYY-MM-DD HH:MM.
+        """
+        return '{}: {} - {}'.format(
+            self.title,
+            self.start_time.strftime('%Y-%m-%d %H:%M'),
+            self.end_time.strftime('%Y-%m-%d %H:%M'))
+
+    @classmethod
+    def from_activity(cls, activity):
+        """Create an unsaved archived copy of an activity.
+
+        Args:
+            activity (Activity): The completed activity to copy.
+
+        Returns:
+            ArchivedActivity: The copy of the activity.
+        """
+        return cls(
+            id=activity.pk,
+            owner_id=activity.owner_id,
+            title=activity.title,
+            project_id=activity.project_id,
+            start_time=activity.start_time,
+            end_time=activity.end_time,
+            updated_at=activity.updated_at,
+            duration=activity.duration)
+
+
+class ProjectQuerySet(models.QuerySet):
+    """Custom queryset for `Project` instances."""
+
+    # The largest number of names looked up in each query, which keeps
+    # the number of parameters within SQLite's limit.
+    lookup_batch_size = 500
+
+    def get_ids(self, names):
+        """Get the ids of the projects with the given names.
+
+        Projects that don't exist yet are created. The ids of recently
+        used projects are cached (see `projects`), so ingesting many
+        activities with the same few titles only looks them up once.
+
+        Args:
+            names (iterable): The names of the projects.
+
+        Returns:
+            dict: The id of each project, by name.
+        """
+        db = self._db or router.db_for_write(self.model)
+        queryset = self.model._default_manager.using(db)
+
+        names = set(names)
+        ids = projects.get_cached(db, names)
+
+        missing = sorted(names.difference(ids))
+        if not missing:
+            return ids
+
+        found = {}
+        for i in range(0, len(missing), self.lookup_batch_size):
+            batch = missing[i:i + self.lookup_batch_size]
+            found.update(queryset.filter(
+                name__in=batch).values_list('name', 'pk'))
+
+            new = [name for name in batch if name not in found]
+            if not new:
+                continue
+
+            try:
+                with transaction.atomic(using=db):
+                    queryset.bulk_create(
+                        [self.model(name=name) for name in new])
+            except IntegrityError:
+                # Another transaction created some of the projects
+                # first, so they are looked up instead.
+                pass
+
+            found.update(queryset.filter(
+                name__in=new).values_list('name', 'pk'))
+
+        # The projects may have been created in a transaction that is
+        # later rolled back, so they're only cached once it commits.
+        transaction.on_commit(
+            lambda: projects.remember(db, found), using=db)
+
+        ids.update(found)
+
+        return ids
+
+
+class Project(models.Model):
+    """A distinct title shared by activities.
+
+    Titles are repeated on every activity, so grouping activities by
+    title means comparing long strings. Each activity also refers to the
+    project with its title, so they can be grouped by the project's id
+    instead. Projects are created as needed when activities are saved.
+    """
+    name = models.CharField(max_length=200, unique=True)
+
+    objects = ProjectQuerySet.as_manager()
+
+    def __str__(self):
+        """Convert the instance to a string.
+
+        Returns:
+            str: The project's name.
+        """
+        return self.name
+
+
+class ActivityTimerQuerySet(models.QuerySet):
+    """Custom queryset for `ActivityTimer` instances."""
+
+    def acquire(self, owner=None):
+        """Lock the timer of an owner until the current transaction ends.
+
+        The timer's row is created if it doesn't exist yet. If another
+        transaction creates it first, the insert fails and the row is
+        locked once that transaction commits.
+
+        Args:
+            owner (User, optional): The user whose timer is locked.
+                Activities without an owner share a single timer.
+
+        Returns:
+            ActivityTimer: The locked timer.
+        """
+        db = self._db or router.db_for_write(self.model)
+        queryset = self.model._default_manager.using(db).select_for_update()
+        owner_key = getattr(owner, 'pk', None) or 0
+
+        timer = queryset.filter(owner_key=owner_key).first()
+        if timer is not None:
+            return timer
+
+        try:
+            with transaction.atomic(using=db):
+                return queryset.create(owner_key=owner_key)
+        except IntegrityError:
+            return queryset.get(owner_key=owner_key)
+
+
+class ActivityTimer(models.Model):
+    """A row locked while starting an owner's activities.
+
+    Starting an activity stops the owner's in-progress activities before
+    creating the new one. Concurrent starts lock the owner's timer
+    first, so they run one after the other and each stops the activity
+    created by the one before it. The timer of activities without an
+    owner has an `owner_key` of 0.
+    """
+    owner_key = models.PositiveIntegerField(unique=True)
+
+    objects = ActivityTimerQuerySet.as_manager()
+
+    def __str__(self):
+        """Convert the instance to a string.
+
+        Returns:
+            str: A string in the format "Timer `owner_key`".
+        """
+        return 'Timer {}'.format(self.owner_key)
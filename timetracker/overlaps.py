@@ -0,0 +1,200 @@
+"""Detection of overlapping activities.
+
+Two activities with the same owner overlap when they were both in
+progress at the same time, which usually means some time was recorded
+twice. Comparing every activity with every other one is quadratic, so
+overlaps are found either by the database using an index on each
+activity's time range, or by a single sweep over the activities in
+order of their start time.
+"""
+
+from collections import namedtuple
+from heapq import heappop, heappush
+
+from django.db import connections
+from django.db.models import Q
+
+
+Overlap = namedtuple('Overlap', ['first', 'second', 'start', 'end'])
+
+# The name of the GiST index on each activity's time range. It is only
+# created on PostgreSQL (see migration 0006).
+PERIOD_INDEX_NAME = 'timetracker_activity_period'
+
+OVERLAPS_SQL = '''
+SELECT a.id, b.id, b.start_time, LEAST(a.end_time, b.end_time)
+FROM {table} a
+JOIN {table} b
+  ON tstzrange(a.start_time, a.end_time) && tstzrange(b.start_time, b.end_time)
+ AND (a.start_time, a.id) < (b.start_time, b.id)
+ AND a.owner_id IS NOT DISTINCT FROM b.owner_id
+WHERE (a.end_time IS NULL OR a.end_time >= a.start_time)
+  AND (b.end_time IS NULL OR b.end_time >= b.start_time)
+  AND a.id IN ({subquery})
+  AND b.id IN ({subquery})
+ORDER BY b.start_time, b.id, a.start_time, a.id
+'''
+
+
+def find_overlaps(queryset, start=None, end=None, chunk_size=2000):
+    """Find the pairs of activities that overlap each other.
+
+    In-progress activities are treated as if they never end. If a window
+    is given, only overlaps within that window are found, and each
+    overlap is clipped to the window.
+
+    Args:
+        queryset (QuerySet): The activities to compare.
+        start (datetime, optional): The start of the window to search.
+        end (datetime, optional): The end of the window to search.
+        chunk_size (int, optional): The number of rows to fetch in each
+            query.
+
+    Yields:
+        Overlap: The ids of the two activities, and the start and end of
+            the time they were both in progress. The end is `None` if
+            both activities are still in progress. The first activity
+            is the one that started first, and overlaps are ordered by
+            the start of the second activity.
+    """
+    if start is not None:
+        queryset = queryset.overlapping(start, end)
+
+    if connections[queryset.db].vendor == 'postgresql':
+        overlaps = iter_indexed_overlaps(queryset, chunk_size)
+    else:
+        overlaps = iter_swept_overlaps(queryset, chunk_size)
+
+    for overlap in overlaps:
+        if start is not None and overlap.start < start:
+            overlap = overlap._replace(start=start)
+
+        if end is not None and (overlap.end is None or overlap.end > end):
+            overlap = overlap._replace(end=end)
+
+        if overlap.end is None or overlap.end > overlap.start:
+            yield overlap
+
+
+def iter_indexed_overlaps(queryset, chunk_size=2000):
+    """Find overlapping activities using a range index.
+
+    This joins the activity table to itself on the overlap of each
+    activity's time range, which PostgreSQL can answer using the GiST
+    index on those ranges.
+
+    Args:
+        queryset (QuerySet): The activities to compare.
+        chunk_size (int, optional): The number of rows to fetch from the
+            cursor at a time.
+
+    Yields:
+        Overlap: Each pair of overlapping activities.
+    """
+    connection = connections[queryset.db]
+    subquery, params = queryset.values('pk').query.sql_with_params()
+    sql = OVERLAPS_SQL.format(
+        subquery=subquery,
+        table=connection.ops.quote_name(queryset.model._meta.db_table))
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + params)
+
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+
+            for row in rows:
+                yield Overlap(*row)
+
+
+def iter_sorted_periods(queryset, chunk_size=2000):
+    """Iterate over the time periods of a queryset of activities.
+
+    The rows are fetched in chunks ordered by ``(start_time, id)``, each
+    chunk starting after the last row of the previous one, so the
+    ``(start_time, id)`` index is used and the whole table is never held
+    in memory.
+
+    Args:
+        queryset (QuerySet): The activities to iterate over.
+        chunk_size (int, optional): The number of rows to fetch in each
+            query.
+
+    Yields:
+        tuple: The id, owner id, start time, and end time of each
+            activity.
+    """
+    queryset = queryset.order_by('start_time', 'id').values_list(
+        'id', 'owner_id', 'start_time', 'end_time')
+    last = None
+
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(
+                Q(start_time__gt=last[2]) |
+                Q(start_time=last[2], id__gt=last[0]))
+
+        rows = list(chunk[:chunk_size])
+        for row in rows:
+            yield row
+
+        if len(rows) < chunk_size:
+            return
+
+        last = rows[-1]
+
+
+def iter_swept_overlaps(queryset, chunk_size=2000):
+    """Find overlapping activities by sweeping over their start times.
+
+    The activities are visited in order of their start time while
+    keeping a heap of each owner's activities that haven't ended yet.
+    Each activity overlaps exactly the activities left in its owner's
+    heap once the ones that ended before it started are removed, so the
+    activities are only compared with the ones they actually overlap.
+
+    Args:
+        queryset (QuerySet): The activities to compare.
+        chunk_size (int, optional): The number of rows to fetch in each
+            query.
+
+    Yields:
+        Overlap: Each pair of overlapping activities.
+    """
+    # Heap entries are ordered by end time, with in-progress activities
+    # last. The start time stands in for the missing end time of
+    # in-progress activities so that entries can always be compared.
+    heaps = {}
+
+    periods = iter_sorted_periods(queryset, chunk_size)
+    for pk, owner_id, start_time, end_time in periods:
+        if end_time is not None and end_time <= start_time:
+            continue
+
+        running = heaps.setdefault(owner_id, [])
+
+        while running and not running[0][0] and running[0][1] <= start_time:
+            heappop(running)
+
+        others = sorted(
+            (entry[3], entry[2], entry[4]) for entry in running)
+        for other_start, other_pk, other_end in others:
+            if other_end is None:
+                overlap_end = end_time
+            elif end_time is None:
+                overlap_end = other_end
+            else:
+                overlap_end = min(other_end, end_time)
+
+            yield Overlap(other_pk, pk, start_time, overlap_end)
+
+        heappush(running, (
+            end_time is None,
+            end_time or start_time,
+            pk,
+            start_time,
+            end_time,
+        ))
@@ -0,0 +1,268 @@
+"""Pagination classes for the `timetracker` app."""
+
+from base64 import b64decode, b64encode
+from collections import OrderedDict, namedtuple
+
+from django.db.models import Q
+from django.template import loader
+from django.utils.dateparse import parse_datetime
+from django.utils.six.moves.urllib import parse as urlparse
+
+from rest_framework.compat import template_render
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from timetracker.app_settings import app_settings
+
+
+Cursor = namedtuple('Cursor', ['start_time', 'pk', 'reverse'])
+
+
+class ActivityCursorPagination(BasePagination):
+    """Keyset pagination for `Activity` instances.
+
+    Activities are ordered by ``(start_time, id)``, and each page is
+    fetched by filtering on the position of the last item of the
+    previous page rather than by using an offset. This means the cost of
+    fetching a page stays the same no matter how deep into the results
+    it is.
+
+    The cursors given to clients are opaque, base64 encoded strings.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    page_size_query_param = 'page_size'
+    # The fields each item's position is read from.
+    position_fields = ('start_time', 'id')
+    template = 'rest_framework/pagination/previous_and_next.html'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Get a single page of results from a queryset.
+
+        Args:
+            queryset (QuerySet): The activities to paginate.
+            request (Request): The request being responded to.
+            view (APIView, optional): The view handling the request.
+
+        Returns:
+            list: The activities in the requested page, ordered by
+                ``(start_time, id)``.
+
+        Raises:
+            NotFound: If the request contains an invalid cursor.
+        """
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            reverse = False
+        else:
+            reverse = self.cursor.reverse
+            queryset = queryset.filter(self.get_position_filter(self.cursor))
+
+        if reverse:
+            queryset = queryset.order_by('-start_time', '-id')
+        else:
+            queryset = queryset.order_by('start_time', 'id')
+
+        # Fetch an extra item to determine if there is another page
+        # following this one.
+        results = list(queryset[:self.page_size + 1])
+        has_following = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+
+        # An empty page has no positions to build cursors from.
+        if not self.page:
+            self.has_next = self.has_previous = False
+
+        if (self.has_next or self.has_previous) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_page_size(self, request):
+        """Get the page size to use for a request.
+
+        Clients may request a specific page size using the
+        `page_size` query parameter, which is capped at the
+        ``MAX_PAGE_SIZE`` setting.
+
+        Args:
+            request (Request): The request being responded to.
+
+        Returns:
+            int: The number of items to include in the page.
+        """
+        page_size = request.query_params.get(self.page_size_query_param)
+
+        try:
+            page_size = int(page_size)
+        except (TypeError, ValueError):
+            return app_settings.PAGE_SIZE
+
+        if page_size <= 0:
+            return app_settings.PAGE_SIZE
+
+        return min(page_size, app_settings.MAX_PAGE_SIZE)
+
+    def get_position_filter(self, cursor):
+        """Get a filter selecting the activities following a cursor.
+
+        Args:
+            cursor (Cursor): The cursor to filter from.
+
+        Returns:
+            Q: A filter that selects activities after the cursor's
+                position, or before it if the cursor is reversed.
+        """
+        lookup = 'lt' if cursor.reverse else 'gt'
+
+        return (
+            Q(**{'start_time__' + lookup: cursor.start_time}) |
+            Q(**{'start_time': cursor.start_time, 'id__' + lookup: cursor.pk}))
+
+    def get_next_link(self):
+        """Get the URL of the next page.
+
+        Returns:
+            str: The URL of the next page, or `None` if this is the
+                last page.
+        """
+        if not self.has_next:
+            return None
+
+        start_time, pk = self._get_position(self.page[-1])
+
+        return self.encode_cursor(Cursor(start_time, pk, reverse=False))
+
+    def get_previous_link(self):
+        """Get the URL of the previous page.
+
+        Returns:
+            str: The URL of the previous page, or `None` if this is the
+                first page.
+        """
+        if not self.has_previous:
+            return None
+
+        start_time, pk = self._get_position(self.page[0])
+
+        return self.encode_cursor(Cursor(start_time, pk, reverse=True))
+
+    def decode_cursor(self, request):
+        """Get the cursor from a request.
+
+        Args:
+            request (Request): The request to get the cursor from.
+
+        Returns:
+            Cursor: The cursor contained in the request, or `None` if
+                the request has no cursor.
+
+        Raises:
+            NotFound: If the request's cursor is invalid.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = urlparse.parse_qs(querystring)
+
+            start_time = parse_datetime(tokens['t'][0])
+            pk = int(tokens['p'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if start_time is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(start_time, pk, reverse)
+
+    def encode_cursor(self, cursor):
+        """Get the URL of the page starting at a cursor.
+
+        Args:
+            cursor (Cursor): The cursor to encode.
+
+        Returns:
+            str: The current URL with its cursor parameter replaced by
+                the encoded cursor.
+        """
+        tokens = OrderedDict([
+            ('t', cursor.start_time.isoformat()),
+            ('p', str(cursor.pk)),
+        ])
+
+        if cursor.reverse:
+            tokens['r'] = '1'
+
+        querystring = urlparse.urlencode(tokens)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        """Get the response for a page of results.
+
+        Args:
+            data (list): The serialized items in the page.
+
+        Returns:
+            Response: A response containing the links to the next and
+                previous pages, as well as the page's results.
+        """
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_html_context(self):
+        """Get the context used to render the browsable API controls.
+
+        Returns:
+            dict: The links to the previous and next pages.
+        """
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
+
+    def to_html(self):
+        """Render the pagination controls for the browsable API.
+
+        Returns:
+            str: The rendered pagination controls.
+        """
+        template = loader.get_template(self.template)
+
+        return template_render(template, self.get_html_context())
+
+    def _get_position(self, item):
+        """Get the position of an item in the ordering.
+
+        Args:
+            item: An `Activity` instance or a dictionary of its values.
+
+        Returns:
+            tuple: The item's ``(start_time, id)`` pair.
+        """
+        if isinstance(item, dict):
+            return item['start_time'], item['id']
+
+        return item.start_time, item.pk
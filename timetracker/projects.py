@@ -0,0 +1,71 @@
+"""Interned ids of the projects activities belong to.
+
+Every activity refers to the `Project` named after its title, so that
+reports can group activities by an integer key rather than by comparing
+titles. Looking up the project of every saved activity would add a
+query to each write, so the ids of recently used projects are kept in a
+small least recently used cache in each process.
+
+Only the ids of committed projects are cached (see
+`ProjectQuerySet.get_ids`), so a rolled back transaction can't leave an
+id in the cache. Projects are never renamed, and the cache is cleared
+whenever a project is deleted.
+"""
+
+import threading
+from collections import OrderedDict
+
+from timetracker.app_settings import app_settings
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_cached(db, names):
+    """Get the cached ids of projects.
+
+    Args:
+        db (str): The alias of the database the projects are stored in.
+        names (iterable): The names of the projects.
+
+    Returns:
+        dict: The id of each project that was cached, by name.
+    """
+    ids = {}
+
+    with _lock:
+        for name in names:
+            pk = _cache.pop((db, name), None)
+            if pk is not None:
+                # Reinserting the entry marks it as the most recently
+                # used one.
+                _cache[(db, name)] = pk
+                ids[name] = pk
+
+    return ids
+
+
+def remember(db, ids):
+    """Cache the ids of projects.
+
+    The least recently used entries are evicted once the cache holds
+    more than ``TIMETRACKER_PROJECT_CACHE_SIZE`` projects.
+
+    Args:
+        db (str): The alias of the database the projects are stored in.
+        ids (dict): The id of each project, by name.
+    """
+    with _lock:
+        for name, pk in ids.items():
+            _cache.pop((db, name), None)
+            _cache[(db, name)] = pk
+
+        while len(_cache) > app_settings.PROJECT_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear():
+    """Remove every cached project id."""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,57 @@
+"""In-process notification of changes to activities.
+
+Requests waiting for changes (such as long-polling clients of the change
+feed) wait on a shared condition, and are woken as soon as a change is
+committed by the same process. Changes committed by other processes are
+picked up by waiting for a limited time and checking the database again.
+"""
+
+import threading
+from timeit import default_timer
+
+
+_condition = threading.Condition()
+_version = [0]
+
+
+def get_version():
+    """Get the number of notifications published so far.
+
+    Returns:
+        int: A number that changes whenever a notification is
+            published.
+    """
+    with _condition:
+        return _version[0]
+
+
+def publish():
+    """Wake every request waiting for a change."""
+    with _condition:
+        _version[0] += 1
+        _condition.notify_all()
+
+
+def wait(version, timeout):
+    """Wait for a notification to be published.
+
+    Args:
+        version (int): The value of `get_version` when the caller last
+            checked for changes. If a notification has been published
+            since then, this returns immediately.
+        timeout (float): The maximum number of seconds to wait.
+
+    Returns:
+        bool: Whether a notification was published.
+    """
+    deadline = default_timer() + timeout
+
+    with _condition:
+        while _version[0] == version:
+            remaining = deadline - default_timer()
+            if remaining <= 0:
+                return False
+
+            _condition.wait(remaining)
+
+        return True
@@ -0,0 +1,85 @@
+"""Renderers for the `timetracker` app."""
+
+import json
+from collections import OrderedDict
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+def to_columns(items):
+    """Convert a list of objects to columns.
+
+    Args:
+        items (list): The objects to convert.
+
+    Returns:
+        dict: The `fields` of the objects and a list of `rows`
+            containing each object's values in the same order, or the
+            original list if it doesn't contain objects that all have the
+            same fields.
+    """
+    if not items or not all(isinstance(item, dict) for item in items):
+        return items
+
+    fields = list(items[0])
+    if any(len(item) != len(fields) for item in items):
+        return items
+
+    try:
+        rows = [[item[name] for name in fields] for item in items]
+    except KeyError:
+        return items
+
+    return OrderedDict([('fields', fields), ('rows', rows)])
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """Renderer for clients that want smaller responses.
+
+    Lists of objects are rendered as columns, so the field names aren't
+    repeated for every object. The results of paginated lists are
+    rendered the same way. Views that support this renderer represent
+    times as seconds since the epoch and durations as seconds, which are
+    both smaller and cheaper to produce than formatted strings.
+    """
+    format = 'compact'
+    media_type = 'application/vnd.timetracker.compact+json'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data as compact JSON.
+
+        Returns:
+            bytes: The data as JSON, with lists of objects converted to
+                columns.
+        """
+        if isinstance(data, list):
+            data = to_columns(data)
+        elif isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = OrderedDict(data)
+            data['results'] = to_columns(data['results'])
+
+        return super(CompactJSONRenderer, self).render(
+            data, accepted_media_type, renderer_context)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Renderer for clients accepting server-sent events.
+
+    Event streams are normally returned as streaming responses, which
+    bypass the renderer. This renders any other response, such as an
+    error, as a single event.
+    """
+    charset = 'utf-8'
+    format = 'event-stream'
+    media_type = 'text/event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data as a single event.
+
+        Returns:
+            bytes: An event containing the data as JSON.
+        """
+        if data is None:
+            return b''
+
+        return 'data: {}\n\n'.format(json.dumps(data)).encode(self.charset)
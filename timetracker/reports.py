@@ -0,0 +1,247 @@
+"""Reports summarizing the time spent on activities.
+
+The totals are computed by the database wherever possible. Only the
+activities that cross the boundary between two periods are loaded, so
+that their duration can be split between the periods they cover.
+"""
+
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils import timezone
+
+
+PERIODS = ('day', 'week', 'month')
+
+
+def get_period_start(value, period):
+    """Get the date a period containing a time starts on.
+
+    Weeks are considered to start on Monday.
+
+    Args:
+        value (datetime): The time to get the period of.
+        period (str): The length of the period. One of `PERIODS`.
+
+    Returns:
+        date: The first day of the period containing `value`.
+    """
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = timezone.localtime(value)
+
+    day = value.date()
+
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+
+    if period == 'month':
+        return day.replace(day=1)
+
+    return day
+
+
+def get_next_period_start(day, period):
+    """Get the date the period following a given period starts on.
+
+    Args:
+        day (date): The first day of a period.
+        period (str): The length of the period. One of `PERIODS`.
+
+    Returns:
+        date: The first day of the next period.
+    """
+    if period == 'week':
+        return day + timedelta(days=7)
+
+    if period == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    return day + timedelta(days=1)
+
+
+def to_datetime(day):
+    """Convert a date to the time the day starts.
+
+    Args:
+        day (date): The date to convert.
+
+    Returns:
+        datetime: Midnight on the given day, in the current time zone if
+            time zone support is enabled.
+    """
+    value = datetime(day.year, day.month, day.day)
+
+    if settings.USE_TZ:
+        return timezone.make_aware(value)
+
+    return value
+
+
+def split_activity(start_time, end_time, period):
+    """Split an activity's duration between the periods it covers.
+
+    Args:
+        start_time (datetime): The time the activity started.
+        end_time (datetime): The time the activity ended.
+        period (str): The length of the periods. One of `PERIODS`.
+
+    Yields:
+        tuple: The first day of each period the activity covers and the
+            amount of time spent on the activity during that period.
+    """
+    day = get_period_start(start_time, period)
+    piece_start = start_time
+
+    while piece_start < end_time:
+        day_after = get_next_period_start(day, period)
+        piece_end = min(end_time, to_datetime(day_after))
+
+        if piece_end > piece_start:
+            yield day, piece_end - piece_start
+
+        piece_start = piece_end
+        day = day_after
+
+
+def split_activity_by_day(start_time, end_time):
+    """Split an activity's duration between days the way `summarize` does.
+
+    An activity that starts and ends on the same day counts towards that
+    day even if it has no duration.
+
+    Args:
+        start_time (datetime): The time the activity started.
+        end_time (datetime): The time the activity ended.
+
+    Returns:
+        list: The tuples returned by `split_activity` for daily periods.
+    """
+    day = get_period_start(start_time, 'day')
+    if day == get_period_start(end_time, 'day'):
+        return [(day, end_time - start_time)]
+
+    return list(split_activity(start_time, end_time, 'day'))
+
+
+def _get_rows(totals, counts):
+    """Build the rows of a summary from its totals.
+
+    Args:
+        totals (dict): The total duration of each period and title.
+        counts (dict): The number of activities in each period and
+            title.
+
+    Returns:
+        list: The rows of the summary, as returned by `summarize`.
+    """
+    return [
+        OrderedDict([
+            ('title', title),
+            ('period', day),
+            ('count', counts[(day, title)]),
+            ('total_duration', totals[(day, title)]),
+            ('average_duration', totals[(day, title)] / counts[(day, title)]),
+        ])
+        for day, title in sorted(totals.keys())
+    ]
+
+
+def summarize(queryset, period='day'):
+    """Summarize the time spent on activities.
+
+    Activities are grouped by title and by the period they took place
+    in. Activities that span more than one period have their duration
+    split between those periods, and are counted once in each of them.
+    In-progress activities are not included.
+
+    Args:
+        queryset (QuerySet): The activities to summarize.
+        period (str, optional): The length of the periods to group the
+            activities into. One of `PERIODS`.
+
+    Returns:
+        list: A dictionary for each title and period containing the
+            `title`, the first day of the `period`, and the `count`,
+            `total_duration` and `average_duration` of the activities.
+            The list is ordered by period and then by title.
+
+    Raises:
+        ValueError: If `period` is not one of `PERIODS`.
+    """
+    if period not in PERIODS:
+        raise ValueError('Invalid period: {}'.format(period))
+
+    # Weeks can't be truncated to by the supported Django versions, so
+    # they are built from the daily totals.
+    trunc = TruncMonth if period == 'month' else TruncDay
+
+    queryset = queryset.completed().annotate(
+        start_bucket=trunc('start_time'),
+        end_bucket=trunc('end_time'))
+
+    contained = queryset.filter(start_bucket=F('end_bucket'))
+    crossing = queryset.exclude(start_bucket=F('end_bucket'))
+
+    totals = defaultdict(timedelta)
+    counts = defaultdict(int)
+
+    # The activities are grouped by project, which the database can do
+    # by comparing integers rather than titles. The titles are the names
+    # of the projects.
+    rows = contained.values('project_id', 'start_bucket').annotate(
+        count=Count('id'),
+        total=Sum('duration')).order_by()
+
+    for row in rows:
+        key = (
+            get_period_start(row['start_bucket'], period),
+            row['project_id'],
+        )
+
+        totals[key] += row['total']
+        counts[key] += row['count']
+
+    rows = crossing.values_list('project_id', 'start_time', 'end_time')
+
+    for project_id, start_time, end_time in rows:
+        for day, duration in split_activity(start_time, end_time, period):
+            totals[(day, project_id)] += duration
+            counts[(day, project_id)] += 1
+
+    if not totals:
+        return []
+
+    project_model = queryset.model._meta.get_field('project').related_model
+    names = dict(project_model._default_manager.using(queryset.db).filter(
+        pk__in=set(key[1] for key in totals)).values_list('pk', 'name'))
+
+    return _get_rows(
+        {(day, names[pk]): total for (day, pk), total in totals.items()},
+        {(day, names[pk]): count for (day, pk), count in counts.items()})
+
+
+def merge_summaries(*summaries):
+    """Merge summaries of separate sets of activities.
+
+    Args:
+        *summaries (list): The summaries returned by `summarize` for the
+            same period.
+
+    Returns:
+        list: The combined summary, in the same format as `summarize`
+            returns.
+    """
+    totals = defaultdict(timedelta)
+    counts = defaultdict(int)
+
+    for summary in summaries:
+        for row in summary:
+            key = (row['period'], row['title'])
+
+            totals[key] += row['total_duration']
+            counts[key] += row['count']
+
+    return _get_rows(totals, counts)
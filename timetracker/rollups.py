@@ -0,0 +1,237 @@
+"""Daily rollups of the time spent on activities.
+
+Each `ActivityRollup` holds the number of activities with a title on a
+day and the total time spent on them, so dashboards can read a few
+hundred rollups rather than scanning every activity. The rollups are
+updated incrementally whenever activities change, and can be rebuilt
+from the activities in parallel chunks of days, for example after
+upgrading or to repair rollups that drifted because of concurrent
+changes.
+"""
+
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+from multiprocessing.pool import ThreadPool
+
+from django.db import connections, transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDay
+
+from timetracker import models, reports
+
+
+def get_daily_totals(rollups):
+    """Total the rollups of each day and title.
+
+    Args:
+        rollups (QuerySet): The rollups to total.
+
+    Returns:
+        list: A dictionary for each title and day in the same format as
+            `reports.summarize` returns for daily periods, ordered by day
+            and then by title.
+    """
+    rows = rollups.filter(count__gt=0).values('date', 'title').annotate(
+        total_count=Sum('count'),
+        total=Sum('total_seconds')).order_by('date', 'title')
+
+    totals = []
+    for row in rows:
+        total_duration = timedelta(seconds=row['total'])
+
+        totals.append(OrderedDict([
+            ('title', row['title']),
+            ('period', row['date']),
+            ('count', row['total_count']),
+            ('total_duration', total_duration),
+            ('average_duration', total_duration / row['total_count']),
+        ]))
+
+    return totals
+
+
+def compute_rollups(start, end):
+    """Compute the rollups of a range of days from the activities.
+
+    Archived activities are included, since they stay in the rollups.
+
+    Args:
+        start (date): The first day to compute.
+        end (date): The day after the last day to compute.
+
+    Returns:
+        list: The unsaved `ActivityRollup` instances.
+    """
+    start_time = reports.to_datetime(start)
+    end_time = reports.to_datetime(end)
+
+    totals = defaultdict(timedelta)
+    counts = defaultdict(int)
+
+    sources = (models.Activity.objects, models.ArchivedActivity.objects)
+
+    for activities in sources:
+        # Truncating times is relatively expensive, so it is only done
+        # for the activities that started in the range, which are found
+        # using the index on start times. Activities that started
+        # earlier and are still in progress at the start of the range
+        # cross midnight.
+        started = activities.completed().filter(
+            start_time__gte=start_time,
+            start_time__lt=end_time,
+        ).annotate(
+            start_day=TruncDay('start_time'),
+            end_day=TruncDay('end_time'))
+
+        contained = started.filter(start_day=F('end_day'))
+        crossing = started.exclude(start_day=F('end_day'))
+        continuing = activities.completed().filter(
+            start_time__lt=start_time,
+            end_time__gt=start_time)
+
+        rows = contained.values('owner_id', 'title', 'start_day').annotate(
+            count=Count('id'),
+            total=Sum('duration')).order_by()
+
+        for row in rows:
+            key = (
+                row['owner_id'],
+                reports.get_period_start(row['start_day'], 'day'),
+                row['title'],
+            )
+
+            totals[key] += row['total']
+            counts[key] += row['count']
+
+        for queryset in (crossing, continuing):
+            rows = queryset.values_list(
+                'owner_id', 'title', 'start_time', 'end_time')
+
+            for owner_id, title, activity_start, activity_end in (
+                    rows.iterator()):
+                days = reports.split_activity(
+                    activity_start, activity_end, 'day')
+                for day, duration in days:
+                    if start <= day < end:
+                        totals[(owner_id, day, title)] += duration
+                        counts[(owner_id, day, title)] += 1
+
+    return [
+        models.ActivityRollup(
+            count=counts[key],
+            date=key[1],
+            owner_id=key[0],
+            title=key[2],
+            total_seconds=totals[key].total_seconds())
+        for key in sorted(totals.keys(), key=lambda key: key[1:])
+    ]
+
+
+def rebuild_days(start, end):
+    """Replace the rollups of a range of days.
+
+    Args:
+        start (date): The first day to rebuild.
+        end (date): The day after the last day to rebuild.
+
+    Returns:
+        int: The number of rollups created.
+    """
+    with transaction.atomic():
+        models.ActivityRollup.objects.filter(
+            date__gte=start, date__lt=end).delete()
+
+        rollups = models.ActivityRollup.objects.bulk_create(
+            compute_rollups(start, end))
+
+    return len(rollups)
+
+
+def get_date_range():
+    """Get the range of days covered by the completed activities.
+
+    Archived activities are included.
+
+    Returns:
+        tuple: The first day and the day after the last day, or `None`
+            if there are no completed activities.
+    """
+    bounds = [
+        activities.completed().aggregate(
+            start=Min('start_time'), end=Max('end_time'))
+        for activities in (
+            models.Activity.objects, models.ArchivedActivity.objects)
+    ]
+    bounds = [bound for bound in bounds if bound['start'] is not None]
+
+    if not bounds:
+        return None
+
+    start = reports.get_period_start(
+        min(bound['start'] for bound in bounds), 'day')
+    end = reports.get_period_start(
+        max(bound['end'] for bound in bounds), 'day')
+
+    return start, max(start, end) + timedelta(days=1)
+
+
+def rebuild_rollups(start=None, end=None, workers=1, chunk_days=31):
+    """Recompute the rollups from the activities.
+
+    The days are split into chunks that are rebuilt in separate
+    transactions. With more than one worker, the chunks are rebuilt in
+    parallel threads, each using its own database connection.
+
+    Args:
+        start (date, optional): The first day to rebuild. Defaults to
+            the first day with a completed activity.
+        end (date, optional): The day after the last day to rebuild.
+            Defaults to the day after the last completed activity.
+        workers (int, optional): The number of chunks to rebuild at
+            once.
+        chunk_days (int, optional): The number of days in each chunk.
+
+    Returns:
+        int: The number of rollups created.
+    """
+    date_range = get_date_range()
+
+    if start is None and end is None:
+        # Days without activities can't have any rollups.
+        outside = models.ActivityRollup.objects.all()
+        if date_range is not None:
+            outside = outside.exclude(
+                date__gte=date_range[0], date__lt=date_range[1])
+
+        outside.delete()
+
+    if date_range is None:
+        if start is None or end is None:
+            return 0
+
+        date_range = (start, end)
+
+    start = start or date_range[0]
+    end = end or date_range[1]
+
+    chunks = []
+    while start < end:
+        chunk_end = min(start + timedelta(days=chunk_days), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end
+
+    if workers <= 1:
+        return sum(rebuild_days(*chunk) for chunk in chunks)
+
+    def rebuild_chunk(chunk):
+        try:
+            return rebuild_days(*chunk)
+        finally:
+            connections.close_all()
+
+    pool = ThreadPool(workers)
+    try:
+        return sum(pool.imap_unordered(rebuild_chunk, chunks))
+    finally:
+        pool.close()
+        pool.join()
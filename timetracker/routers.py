@@ -0,0 +1,190 @@
+"""Routing of reads to replicas of the default database.
+
+When `ReplicaRouter` is added to the ``DATABASE_ROUTERS`` setting, views
+using `ReplicaViewMixin` read activities from the databases given by
+``TIMETRACKER_REPLICAS`` while handling read-only requests to the
+actions they allow. Each request reads from a single replica, so its
+queries see the same data even if the replicas lag behind by different
+amounts. Every other query goes to the default database. Once anything
+is written, the rest of the request reads from the default database as
+well, so it sees its own changes.
+
+The router only routes the app's own models. The default database can
+act as its own replica, so a local setup can be tested by pointing a
+second alias at the same SQLite file.
+"""
+
+import itertools
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, router
+
+from rest_framework.permissions import SAFE_METHODS
+
+from timetracker.app_settings import app_settings
+
+
+_state = threading.local()
+
+_cycles = {}
+_cycles_lock = threading.Lock()
+
+
+def get_replicas():
+    """Get the aliases of the replicas in the order they are used.
+
+    Returns:
+        tuple: The alias of each replica, repeated according to its
+            weight if the replicas are given weights.
+    """
+    replicas = app_settings.REPLICAS
+
+    if isinstance(replicas, dict):
+        return tuple(
+            alias
+            for alias, weight in sorted(replicas.items())
+            for _ in range(weight))
+
+    return tuple(replicas)
+
+
+def get_replica():
+    """Get the next database to read from.
+
+    The replicas are used in turn by each request, across every thread
+    of the process.
+
+    Returns:
+        str: The alias of the next replica, or of the default database
+            if there are no replicas.
+    """
+    replicas = get_replicas()
+    if not replicas:
+        return DEFAULT_DB_ALIAS
+
+    with _cycles_lock:
+        cycle = _cycles.get(replicas)
+        if cycle is None:
+            cycle = _cycles[replicas] = itertools.cycle(replicas)
+
+        return next(cycle)
+
+
+def set_replica_reads(enabled):
+    """Allow or disallow the current thread to read from replicas.
+
+    When reads are allowed, the next replica is chosen, and every read
+    goes to it until reads are disallowed again.
+
+    Args:
+        enabled (bool): Whether reads may go to the replicas.
+    """
+    _state.replica = get_replica() if enabled else None
+
+
+def get_current_replica():
+    """Get the replica the current thread reads from.
+
+    Returns:
+        str: The alias of the replica, or `None` if the current thread
+            may not read from replicas.
+    """
+    return getattr(_state, 'replica', None)
+
+
+def replica_reads_enabled():
+    """Determine if the current thread may read from replicas.
+
+    Returns:
+        bool: True if reads may go to the replicas, False otherwise.
+    """
+    return get_current_replica() is not None
+
+
+def reads_from_replica(model):
+    """Determine if the current thread reads a model from a replica.
+
+    Args:
+        model: The model being read.
+
+    Returns:
+        bool: True if reads of the model are routed to a database other
+            than the default one, otherwise False.
+    """
+    return router.db_for_read(model) != DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter(object):
+    """Database router sending permitted reads to replicas."""
+
+    def db_for_read(self, model, **hints):
+        """Get the database to read a model from.
+
+        Returns:
+            str: A replica if replica reads are enabled, otherwise the
+                default database, or `None` for other apps' models.
+        """
+        if model._meta.app_label != 'timetracker':
+            return None
+
+        return get_current_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        """Get the database to write a model to.
+
+        Writes always go to the default database, even for instances
+        read from a replica. Replica reads are disabled for the rest of
+        the request so that it reads its own writes.
+
+        Returns:
+            str: The default database, or `None` for other apps' models.
+        """
+        if model._meta.app_label != 'timetracker':
+            return None
+
+        set_replica_reads(False)
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allow relations between instances from the same data.
+
+        Returns:
+            bool: True if both instances come from the default database
+                or its replicas, otherwise `None`.
+        """
+        aliases = {DEFAULT_DB_ALIAS}.union(get_replicas())
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+
+        return None
+
+
+class ReplicaViewMixin(object):
+    """Mixin for views whose read-only actions may read from replicas.
+
+    A replica is chosen when a request starts, and is used for the rest
+    of the request. Responses that are streamed are read after the
+    request is handled, so actions that stream their responses have to
+    bind their querysets to the request's database with `using`.
+
+    Attributes:
+        replica_actions (tuple): The names of the actions that may read
+            from the replicas when handling safe requests.
+    """
+    replica_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        """Allow replica reads if the request is a read-only action."""
+        set_replica_reads(
+            request.method in SAFE_METHODS and
+            getattr(self, 'action', None) in self.replica_actions)
+
+        super(ReplicaViewMixin, self).initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Stop allowing replica reads once the request is handled."""
+        set_replica_reads(False)
+
+        return super(ReplicaViewMixin, self).finalize_response(
+            request, response, *args, **kwargs)
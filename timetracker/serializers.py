@@ -1,6 +1,210 @@
-from rest_framework import serializers
+from datetime import datetime
 
-from timetracker import models
+from django.db import connections, router
+from django.db.models import Case, Value, When
+from django.utils import timezone
+from django.utils.duration import duration_string
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from timetracker import cache, models
+
+
+def get_datetime_formatter():
+    """Get a function that formats datetimes like DRF's serializers.
+
+    The output format is looked up once, so that the returned function
+    only has to do the formatting itself.
+
+    Returns:
+        callable: A function that takes a datetime (or `None`) and
+            returns it formatted according to the ``DATETIME_FORMAT``
+            setting of the REST framework.
+    """
+    output_format = api_settings.DATETIME_FORMAT
+
+    if output_format is None:
+        return lambda value: value or None
+
+    if output_format.lower() == ISO_8601:
+        def format_iso(value):
+            if not value:
+                return None
+
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+
+            return value
+
+        return format_iso
+
+    def format_custom(value):
+        if not value:
+            return None
+
+        return value.strftime(output_format)
+
+    return format_custom
+
+
+# The time that timestamps are measured from.
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def format_timestamp(value):
+    """Format a datetime as the number of seconds since the epoch.
+
+    Args:
+        value (datetime): The datetime to format, or `None`. Naive
+            datetimes are assumed to be in the default time zone.
+
+    Returns:
+        float: The number of seconds since the epoch, or `None` if no
+            datetime was given.
+    """
+    if value is None:
+        return None
+
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.get_default_timezone())
+
+    return (value - EPOCH).total_seconds()
+
+
+def format_duration_seconds(value):
+    """Format a duration as a number of seconds.
+
+    Args:
+        value (timedelta): The duration to format, or `None`.
+
+    Returns:
+        float: The number of seconds, or `None` if no duration was
+            given.
+    """
+    if value is None:
+        return None
+
+    return value.total_seconds()
+
+
+def format_duration(value):
+    """Format a duration the same way DRF's serializers do.
+
+    Args:
+        value (timedelta): The duration to format, or `None`.
+
+    Returns:
+        str: The formatted duration, or `None` if no duration was given.
+    """
+    if value is None:
+        return None
+
+    return duration_string(value)
+
+
+class ActivityListSerializer(serializers.ListSerializer):
+    """Serializer for saving many `Activity` instances at once.
+
+    Rather than saving each activity individually, the activities are
+    inserted or updated using as few queries as possible.
+    """
+
+    def create(self, validated_data):
+        """Create activities using a bulk insert.
+
+        The number of activities inserted in each query can be limited
+        by providing a `batch_size` in the serializer's context.
+
+        Args:
+            validated_data (list): The validated data for each activity.
+
+        Returns:
+            list: The created `Activity` instances.
+        """
+        activities = [models.Activity(**attrs) for attrs in validated_data]
+        for activity in activities:
+            activity.update_duration()
+
+        activities = models.Activity.objects.bulk_create(
+            activities, batch_size=self.context.get('batch_size'))
+
+        # Bulk inserts don't send the `post_save` signal.
+        cache.invalidate_on_commit(router.db_for_write(models.Activity))
+
+        return activities
+
+    def update(self, instances, validated_data):
+        """Update activities using bulk updates.
+
+        Each batch of activities is updated in a single query, with a
+        ``CASE`` expression selecting the new value of each field for
+        each activity.
+
+        Args:
+            instances (list): The activities to update, in the same order
+                as the data to update them with.
+            validated_data (list): The validated data for each activity.
+
+        Returns:
+            list: The updated activities.
+        """
+        field_names = set()
+        for instance, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                field_names.add(attr)
+
+            instance.update_duration()
+
+        if not field_names:
+            return instances
+
+        if field_names & {'start_time', 'end_time'}:
+            field_names.add('duration')
+
+        if 'title' in field_names:
+            models.Activity.assign_projects(instances)
+            field_names.add('project')
+
+        fields = [models.Activity._meta.get_field(name)
+                  for name in sorted(field_names)]
+
+        # Each activity requires a parameter for its primary key in the
+        # WHERE clause, and a primary key and value for each field.
+        connection = connections[router.db_for_write(models.Activity)]
+        batch_size = max(connection.ops.bulk_batch_size(
+            ['pk', 'pk'] + fields, instances), 1)
+
+        # Bulk updates don't call `save`, so the modification time has
+        # to be set explicitly.
+        updated_at = timezone.now()
+        for instance in instances:
+            instance.updated_at = updated_at
+
+        for i in range(0, len(instances), batch_size):
+            batch = instances[i:i + batch_size]
+            updates = {
+                field.name: Case(
+                    *[When(pk=instance.pk, then=Value(
+                        getattr(instance, field.attname), output_field=field))
+                      for instance in batch],
+                    output_field=field)
+                for field in fields
+            }
+            updates['updated_at'] = updated_at
+
+            models.Activity.objects.filter(
+                pk__in=[instance.pk for instance in batch]).update(**updates)
+
+        # Bulk updates don't send the `post_save` signal.
+        cache.invalidate_on_commit(connection.alias)
+        models.ActivityChange.objects.record(
+            models.ActivityChange.UPDATED, instances)
+        models.ActivityRollup.objects.update_for(instances)
+
+        return instances
 
 
 class ActivitySerializer(serializers.ModelSerializer):
@@ -8,5 +212,184 @@ class ActivitySerializer(serializers.ModelSerializer):
 
     class Meta(object):
         """Options for the `ActivitySerializer`."""
-        fields = ('id', 'title', 'start_time', 'end_time')
+        fields = (
+            'id', 'title', 'project', 'start_time', 'end_time', 'duration')
+        list_serializer_class = ActivityListSerializer
         model = models.Activity
+        read_only_fields = ('project',)
+
+
+class ActivityReadSerializer(object):
+    """Fast, read-only serializer for activities.
+
+    This produces the same representation as `ActivitySerializer`, but
+    skips the REST framework's per-field machinery. It accepts either
+    `Activity` instances or dictionaries of their values, such as those
+    returned by `QuerySet.values`. Clients can ask for only some of the
+    fields, and for a compact representation of times and durations.
+    """
+    # The attributes of instances that hold the values of fields whose
+    # names differ from them.
+    attributes = {'project': 'project_id'}
+    datetime_fields = ('start_time', 'end_time')
+    duration_fields = ('duration',)
+    fields = ActivitySerializer.Meta.fields
+
+    def __init__(self, instance, many=False, fields=None, compact=False):
+        """Prepare to serialize one or more activities.
+
+        Args:
+            instance: The activity, or the list of activities if `many`
+                is true, to serialize.
+            many (bool, optional): Whether a list of activities is being
+                serialized.
+            fields (tuple, optional): The names of the fields to include.
+                Defaults to every field.
+            compact (bool, optional): Whether times and durations should
+                be represented as numbers of seconds rather than
+                strings.
+        """
+        self.instance = instance
+        self.many = many
+
+        if fields:
+            self.fields = fields
+
+        if compact:
+            format_datetime = format_timestamp
+            format_interval = format_duration_seconds
+        else:
+            format_datetime = get_datetime_formatter()
+            format_interval = format_duration
+
+        self.converters = []
+        for name in self.fields:
+            if name in self.datetime_fields:
+                self.converters.append((name, format_datetime))
+            elif name in self.duration_fields:
+                self.converters.append((name, format_interval))
+            else:
+                self.converters.append((name, None))
+
+    @property
+    def data(self):
+        """The serialized representation of the activities."""
+        if self.many:
+            return [self.to_representation(item) for item in self.instance]
+
+        return self.to_representation(self.instance)
+
+    def to_representation(self, item):
+        """Serialize a single activity.
+
+        Args:
+            item: An `Activity` instance or a dictionary of its values.
+
+        Returns:
+            dict: The serialized activity.
+        """
+        if not isinstance(item, dict):
+            item = {
+                name: getattr(item, self.attributes.get(name, name))
+                for name in self.fields
+            }
+
+        return {
+            name: convert(item[name]) if convert else item[name]
+            for name, convert in self.converters
+        }
+
+
+class ActivityBulkDeleteSerializer(serializers.Serializer):
+    """Serializer for the ids of activities to delete in bulk."""
+    ids = serializers.ListField(child=serializers.IntegerField())
+
+
+class ActivityStartSerializer(serializers.Serializer):
+    """Serializer for the data used to start an activity."""
+    title = serializers.CharField(max_length=200)
+    start_time = serializers.DateTimeField(required=False)
+
+
+class ActivityStopSerializer(serializers.Serializer):
+    """Serializer for the data used to stop the current activity."""
+    end_time = serializers.DateTimeField(required=False)
+
+
+class ProjectSerializer(serializers.ModelSerializer):
+    """Serializer for the `Project` model."""
+
+    class Meta(object):
+        """Options for the `ProjectSerializer`."""
+        fields = ('id', 'name')
+        model = models.Project
+
+
+class ActivitySummarySerializer(serializers.Serializer):
+    """Serializer for the totals produced by `reports.summarize`."""
+    title = serializers.CharField()
+    period = serializers.DateField()
+    count = serializers.IntegerField()
+    total_duration = serializers.DurationField()
+    average_duration = serializers.DurationField()
+
+
+class ActivityChangesQuerySerializer(serializers.Serializer):
+    """Serializer for the query parameters of the change feed."""
+    since = serializers.IntegerField(min_value=0, required=False)
+    timeout = serializers.FloatField(min_value=0, required=False)
+
+
+class ActivityDailyTotalsQuerySerializer(serializers.Serializer):
+    """Serializer for the query parameters of the daily totals."""
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    title = serializers.CharField(required=False)
+
+
+class ActivityOverlapSerializer(serializers.Serializer):
+    """Serializer for the overlaps found by `overlaps.find_overlaps`."""
+    first = serializers.IntegerField()
+    second = serializers.IntegerField()
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    duration = serializers.SerializerMethodField()
+
+    def get_duration(self, overlap):
+        """Get the length of an overlap.
+
+        Args:
+            overlap (Overlap): The overlap being serialized.
+
+        Returns:
+            str: The length of the overlap, or `None` if it is still
+                ongoing.
+        """
+        if overlap.end is None:
+            return None
+
+        return format_duration(overlap.end - overlap.start)
+
+
+class ActivityOverlapWindowSerializer(serializers.Serializer):
+    """Serializer for the window to search for overlaps in."""
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        """Ensure the window ends after it starts.
+
+        Raises:
+            ValidationError: If the window ends before it starts, or has
+                an end without a start.
+        """
+        if 'end' in data:
+            if 'start' not in data:
+                raise serializers.ValidationError(
+                    'A window with an end must also have a start.')
+
+            if data['end'] <= data['start']:
+                raise serializers.ValidationError(
+                    'The window must end after it starts.')
+
+        return data
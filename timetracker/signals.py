@@ -0,0 +1,116 @@
+"""Signal receivers for the `timetracker` app."""
+
+from django.db import connections
+
+from timetracker import cache, models, projects
+
+
+ACTIVE_INDEX_NAME = 'timetracker_activity_active'
+
+# The name of the index keeping the rollups without an owner unique,
+# since they're never equal in the model's unique constraint.
+UNOWNED_ROLLUP_INDEX_NAME = 'timetracker_activityrollup_unowned'
+
+# Backends that support indexes with a WHERE clause.
+PARTIAL_INDEX_VENDORS = ('postgresql', 'sqlite')
+
+
+def create_partial_indexes(using, **kwargs):
+    """Ensure the partial indexes on activities and rollups exist.
+
+    The indexes are created by the app's migrations, but SQLite rebuilds
+    a table whenever one of its columns is altered, and the rebuilt
+    table only has the indexes Django knows about. Since the supported
+    Django versions can't declare partial indexes on a model, the
+    indexes are recreated after every migration if they are missing.
+
+    Args:
+        using (str): The alias of the database that was migrated.
+    """
+    connection = connections[using]
+    if connection.vendor not in PARTIAL_INDEX_VENDORS:
+        return
+
+    quote_name = connection.ops.quote_name
+    indexes = [
+        ('CREATE INDEX', ACTIVE_INDEX_NAME, models.Activity,
+         ['start_time'], 'end_time'),
+        ('CREATE UNIQUE INDEX', UNOWNED_ROLLUP_INDEX_NAME,
+         models.ActivityRollup, ['date', 'title'], 'owner_id'),
+    ]
+
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+
+        for create, name, model, columns, null_column in indexes:
+            if model._meta.db_table not in tables:
+                continue
+
+            cursor.execute(
+                '{} IF NOT EXISTS {} ON {} ({}) WHERE {} IS NULL'.format(
+                    create,
+                    quote_name(name),
+                    quote_name(model._meta.db_table),
+                    ', '.join(quote_name(column) for column in columns),
+                    quote_name(null_column)))
+
+
+def record_change(instance, created, using, **kwargs):
+    """Record that an activity was created or updated.
+
+    Args:
+        instance (Activity): The saved activity.
+        created (bool): Whether the activity was newly created.
+        using (str): The alias of the database it was saved to.
+    """
+    action = (models.ActivityChange.CREATED if created
+              else models.ActivityChange.UPDATED)
+
+    models.ActivityChange.objects.using(using).record(action, [instance])
+
+
+def record_deletion(instance, using, **kwargs):
+    """Record that an activity was deleted.
+
+    Args:
+        instance (Activity): The deleted activity.
+        using (str): The alias of the database it was deleted from.
+    """
+    models.ActivityChange.objects.using(using).record(
+        models.ActivityChange.DELETED, [instance])
+
+
+def update_rollups(instance, using, **kwargs):
+    """Update the daily rollups after an activity is saved.
+
+    Args:
+        instance (Activity): The saved activity.
+        using (str): The alias of the database it was saved to.
+    """
+    models.ActivityRollup.objects.using(using).update_for([instance])
+
+
+def remove_from_rollups(instance, using, **kwargs):
+    """Remove a deleted activity from the daily rollups.
+
+    Args:
+        instance (Activity): The deleted activity.
+        using (str): The alias of the database it was deleted from.
+    """
+    models.ActivityRollup.objects.using(using).update_for(
+        [instance], deleted=True)
+
+
+def invalidate_cache(using, **kwargs):
+    """Invalidate the cached responses when an activity changes.
+
+    Args:
+        using (str): The alias of the database the activity was saved
+            to or deleted from.
+    """
+    cache.invalidate_on_commit(using)
+
+
+def clear_project_cache(**kwargs):
+    """Forget the cached project ids when projects may have been removed."""
+    projects.clear()
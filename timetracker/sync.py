@@ -0,0 +1,217 @@
+"""Incremental synchronization of activities for offline clients.
+
+A client without a sync token starts with a full sync, which returns
+every activity in pages ordered by id. Every response contains a token
+to send with the next request. Once the full sync is complete, the
+token refers to a position in the change log, and later syncs only
+return the activities changed since then, along with the ids of the
+activities that were deleted.
+
+Changes older than ``TIMETRACKER_CHANGE_RETENTION_DAYS`` can be pruned
+using the ``prune_changes`` management command. Clients with a token
+from before the oldest remaining change have to start again with a full
+sync.
+"""
+
+from base64 import b64decode, b64encode
+from collections import OrderedDict, namedtuple
+
+from django.db.models import Max, Min
+from django.utils.six.moves.urllib import parse as urlparse
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from timetracker import feed, models
+from timetracker.serializers import ActivityReadSerializer
+
+
+SyncToken = namedtuple('SyncToken', ['sequence', 'pk'])
+
+
+class SyncExpired(APIException):
+    """Exception raised when a sync token can no longer be used."""
+    status_code = status.HTTP_410_GONE
+    default_detail = (
+        'The sync token has expired. Sync again without a token.')
+
+
+def decode_token(encoded):
+    """Decode a sync token given to a client.
+
+    Args:
+        encoded (str): The encoded token.
+
+    Returns:
+        SyncToken: The decoded token.
+
+    Raises:
+        ValueError: If the token is invalid.
+    """
+    try:
+        querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+        tokens = urlparse.parse_qs(querystring)
+
+        sequence = int(tokens['s'][0])
+        pk = int(tokens['p'][0]) if 'p' in tokens else None
+    except (KeyError, TypeError, UnicodeError, ValueError):
+        raise ValueError('Invalid sync token.')
+
+    return SyncToken(sequence, pk)
+
+
+def encode_token(token):
+    """Encode a sync token to give to a client.
+
+    Args:
+        token (SyncToken): The token to encode.
+
+    Returns:
+        str: The opaque, encoded token.
+    """
+    tokens = OrderedDict([('s', str(token.sequence))])
+    if token.pk is not None:
+        tokens['p'] = str(token.pk)
+
+    querystring = urlparse.urlencode(tokens)
+
+    return b64encode(querystring.encode('ascii')).decode('ascii')
+
+
+def check_token(token):
+    """Ensure the changes following a token are still available.
+
+    Args:
+        token (SyncToken): The client's token.
+
+    Raises:
+        SyncExpired: If changes after the token have been pruned, or
+            the token is ahead of the change log.
+    """
+    bounds = feed.get_numbered_changes().aggregate(
+        oldest=Min('sequence'), newest=Max('sequence'))
+
+    if bounds['oldest'] is None:
+        if token.sequence != 0:
+            raise SyncExpired()
+    elif not bounds['oldest'] - 1 <= token.sequence <= bounds['newest']:
+        raise SyncExpired()
+
+
+def get_snapshot(token, limit, owner=None):
+    """Get a page of a full sync.
+
+    Args:
+        token (SyncToken): The token of the full sync in progress, or
+            `None` to start a new one.
+        limit (int): The maximum number of activities to return.
+        owner (User, optional): If given, only this user's activities
+            are returned.
+
+    Returns:
+        tuple: The serialized activities in the page, the token for the
+            next request, and whether the full sync is incomplete.
+    """
+    if token is None:
+        token = SyncToken(feed.get_sequence(), 0)
+
+    activities = models.Activity.objects.filter(pk__gt=token.pk)
+    if owner is not None:
+        activities = activities.filter(owner=owner)
+
+    rows = list(activities.order_by('pk').values(
+        *ActivityReadSerializer.fields)[:limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+
+    if more:
+        next_token = SyncToken(token.sequence, rows[-1]['id'])
+    else:
+        # The changes made while the full sync was in progress are
+        # returned by the next sync.
+        next_token = SyncToken(token.sequence, None)
+
+    return ActivityReadSerializer(rows, many=True).data, next_token, more
+
+
+def sync(token, limit, owner=None):
+    """Get the activities a client needs to sync.
+
+    Args:
+        token (SyncToken): The token from the client's previous sync, or
+            `None` to start a full sync.
+        limit (int): The maximum number of changes to return.
+        owner (User, optional): If given, only this user's activities
+            are synced.
+
+    Returns:
+        dict: The `token` to send with the next sync, whether there is
+            `more` to sync straight away, the serialized `activities`
+            that were created or updated, and the ids of the activities
+            that were `deleted`.
+
+    Raises:
+        SyncExpired: If the token can no longer be used.
+    """
+    deleted = []
+
+    if token is None or token.pk is not None:
+        activities, token, more = get_snapshot(token, limit, owner)
+    else:
+        check_token(token)
+
+        # The sequence number is read before the changes, so that no
+        # change made in between is skipped if the client has none.
+        sequence = feed.get_sequence()
+
+        activities = []
+        changes = feed.get_changes(token.sequence, limit, owner)
+        for change in changes:
+            if change['activity'] is None:
+                deleted.append(change['id'])
+            else:
+                activities.append(change['activity'])
+
+        if changes:
+            token = SyncToken(changes[-1]['sequence'], None)
+        else:
+            # The changes made since the token, if any, were to other
+            # owners' activities, so the token moves past them and
+            # doesn't expire once they are pruned.
+            token = SyncToken(max(token.sequence, sequence), None)
+
+        remaining = feed.get_numbered_changes().filter(
+            sequence__gt=token.sequence)
+        if owner is not None:
+            remaining = remaining.filter(owner_id=owner.pk)
+
+        more = remaining.exists()
+
+    return OrderedDict([
+        ('token', encode_token(token)),
+        ('more', more),
+        ('activities', activities),
+        ('deleted', deleted),
+    ])
+
+
+def prune_changes(before):
+    """Delete the changes recorded before a time.
+
+    The most recent change is always kept, so that clients that have
+    seen it can keep syncing from its sequence number.
+
+    Args:
+        before (datetime): The time to delete the changes before.
+
+    Returns:
+        int: The number of changes deleted.
+    """
+    newest = feed.get_sequence()
+    if not newest:
+        return 0
+
+    deleted, _ = models.ActivityChange.objects.filter(
+        created_at__lt=before, sequence__lt=newest).delete()
+
+    return deleted
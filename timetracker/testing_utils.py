@@ -1,8 +1,39 @@
 import logging
+import random
+from datetime import timedelta
+
+from django.db import router, transaction
+from django.utils import timezone
 
 from rest_framework.test import APIRequestFactory
 
-from timetracker import models
+from timetracker import cache, models
+
+
+# The ways the start times of activities created by `create_activities`
+# can be distributed.
+DISTRIBUTIONS = ('even', 'random')
+
+# Reusable sets of activities, given as the arguments to pass to
+# `create_activities`. Test cases can load one using `DatasetMixin`.
+DATASETS = {
+    # A month of activities starting every three hours, with the last
+    # one left in progress.
+    'month': {
+        'count': 30 * 8,
+        'in_progress': 1,
+        'interval': timedelta(hours=3),
+        'titles': ('Coding', 'Email', 'Meetings', 'Reviews'),
+    },
+    # Enough activities to expose queries that scale with the table.
+    'large': {
+        'count': 100000,
+        'distribution': 'random',
+        'in_progress': 100,
+        'interval': timedelta(minutes=20),
+        'titles': ('Coding', 'Email', 'Meetings', 'Planning', 'Reviews'),
+    },
+}
 
 
 def create_activity(title='Test Title', start_time=None, end_time=None,
@@ -40,6 +71,109 @@ def create_activity(title='Test Title', start_time=None, end_time=None,
     return models.Activity.objects.create(**kwargs)
 
 
+def create_activities(count, titles=('Test Title',), start_time=None,
+                      interval=timedelta(hours=1),
+                      duration=timedelta(minutes=30), distribution='even',
+                      in_progress=0, owner=None, seed=0, batch_size=None):
+    """Create many `Activity` instances for testing purposes.
+
+    The activities are inserted in batches in a single transaction
+    using `ActivityQuerySet.bulk_create`, which also records their
+    creation in the change log and adds them to the rollups, so that
+    hundreds of thousands of them can be created in seconds.
+
+    With the 'even' distribution, each activity starts `interval` after
+    the previous one and lasts for `duration`. With the 'random'
+    distribution, the activities start at random times over the same
+    period and last for a random time of up to twice `duration`.
+
+    Args:
+        count (int): The number of activities to create.
+        titles (tuple, optional): The titles to give the activities,
+            which are used in turn.
+        start_time (datetime, optional): The start of the period the
+            activities are spread over. Defaults to the time that lets
+            the period end at the current time.
+        interval (timedelta, optional): The average time between the
+            starts of consecutive activities.
+        duration (timedelta, optional): The average duration of the
+            activities.
+        distribution (str, optional): How the start times and durations
+            are chosen. One of `DISTRIBUTIONS`.
+        in_progress (int, optional): The number of activities, starting
+            with the last one, that are left in progress.
+        owner (User, optional): The user who owns the activities.
+        seed (int, optional): The seed for the random number generator,
+            so that the same activities can be created repeatedly.
+        batch_size (int, optional): The number of activities to insert
+            in each query. Defaults to the most the database allows.
+
+    Returns:
+        QuerySet: The created activities, ordered by id.
+
+    Raises:
+        ValueError: If `distribution` is not one of `DISTRIBUTIONS`.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError('Invalid distribution: {}'.format(distribution))
+
+    rand = random.Random(seed)
+    if start_time is None:
+        start_time = timezone.now() - interval * count
+
+    period = (interval * count).total_seconds()
+
+    activities = []
+    for i in range(count):
+        if distribution == 'random':
+            start = start_time + timedelta(seconds=rand.uniform(0, period))
+            length = duration * rand.uniform(0, 2)
+        else:
+            start = start_time + interval * i
+            length = duration
+
+        activity = models.Activity(
+            owner=owner,
+            title=titles[i % len(titles)],
+            start_time=start,
+            end_time=None if i >= count - in_progress else start + length)
+        activity.update_duration()
+        activities.append(activity)
+
+    using = router.db_for_write(models.Activity)
+    with transaction.atomic(using=using):
+        activities = models.Activity.objects.using(using).bulk_create(
+            activities, batch_size=batch_size)
+
+    # Bulk inserts don't send the `post_save` signal.
+    cache.invalidate_on_commit(using)
+
+    pks = [activity.pk for activity in activities]
+
+    return models.Activity.objects.using(using).filter(
+        pk__gte=min(pks or [0]), pk__lte=max(pks or [0])).order_by('pk')
+
+
+class DatasetMixin(object):
+    """Mixin for test cases that share one of the `DATASETS`.
+
+    The dataset is created once for the whole test case rather than for
+    every test, and each test's changes to it are rolled back.
+
+    Attributes:
+        dataset (str): The name of the dataset to create.
+        activities (QuerySet): The activities in the dataset.
+    """
+    dataset = None
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the test case's dataset."""
+        super(DatasetMixin, cls).setUpTestData()
+
+        cls.activities = create_activities(**DATASETS[cls.dataset])
+
+
 class RequestTestMixin(object):
     """Mixin for test cases that need a request factory."""
 
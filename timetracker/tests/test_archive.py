@@ -0,0 +1,275 @@
+from datetime import date, datetime, timedelta
+
+from django.core.management import CommandError, call_command
+from django.core.urlresolvers import reverse
+from django.db.models import Count, Max
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from rest_framework import status
+
+from timetracker import archive, feed, models, rollups, sync, views
+from timetracker.testing_utils import RequestTestMixin, create_activity
+
+
+class ArchiveTestMixin(object):
+    """Mixin creating old and recent activities for archive tests."""
+
+    def setUp(self):
+        """Create old and recent activities."""
+        self.old = [
+            create_activity(
+                title='Old',
+                start_time=datetime(2016, 1, day, 9),
+                end_time=datetime(2016, 1, day, 10))
+            for day in range(1, 4)
+        ]
+        self.recent = create_activity(
+            title='Recent',
+            start_time=datetime(2016, 8, 1, 9),
+            end_time=datetime(2016, 8, 1, 11))
+        self.active = create_activity(
+            title='Active', start_time=datetime(2016, 8, 2, 9))
+
+
+class TestArchiveActivities(ArchiveTestMixin, TestCase):
+    """Test cases for moving activities to the archive."""
+
+    def test_archive(self):
+        """Test archiving the activities that ended before a time.
+
+        The old activities should be moved in batches, keeping their ids,
+        without changing the rollups or recording any changes.
+        """
+        totals = rollups.get_daily_totals(models.ActivityRollup.objects.all())
+        changes = models.ActivityChange.objects.count()
+
+        archived = archive.archive_activities(
+            datetime(2016, 2, 1), batch_size=2)
+
+        self.assertEqual(3, archived)
+        self.assertEqual(
+            [activity.pk for activity in self.old],
+            list(models.ArchivedActivity.objects.order_by(
+                'pk').values_list('pk', flat=True)))
+        self.assertEqual(
+            {self.recent.pk, self.active.pk},
+            set(models.Activity.objects.values_list('pk', flat=True)))
+        self.assertEqual(
+            totals,
+            rollups.get_daily_totals(models.ActivityRollup.objects.all()))
+        self.assertEqual(changes, models.ActivityChange.objects.count())
+
+        archived = models.ArchivedActivity.objects.get(pk=self.old[0].pk)
+        self.assertEqual(timedelta(hours=1), archived.duration)
+        self.assertEqual(self.old[0].updated_at, archived.updated_at)
+
+    def test_changes(self):
+        """Test reading changes to activities that were since archived.
+
+        The archived activities should be returned as they were
+        archived, rather than reported as deleted.
+        """
+        archive.archive_activities(datetime(2016, 2, 1))
+
+        changes = feed.get_changes(0, 100)
+        result = sync.sync(sync.SyncToken(0, None), 100)
+
+        self.assertEqual(
+            {models.ActivityChange.CREATED},
+            {change['action'] for change in changes})
+        self.assertEqual(
+            'Old', {change['id']: change for change in changes}[
+                self.old[0].pk]['activity']['title'])
+        self.assertEqual([], result['deleted'])
+        self.assertEqual(5, len(result['activities']))
+
+    def test_command(self):
+        """Test archiving activities using the management command."""
+        output = StringIO()
+        call_command(
+            'archive_activities', '--before', '2016-08-01', stdout=output)
+
+        self.assertIn('Archived 3 activities.', output.getvalue())
+        self.assertEqual(3, models.ArchivedActivity.objects.count())
+
+    def test_command_invalid_before(self):
+        """Test archiving activities before an invalid date."""
+        with self.assertRaises(CommandError):
+            call_command(
+                'archive_activities', '--before', 'last year',
+                stdout=StringIO())
+
+    def test_rebuild_rollups(self):
+        """Test rebuilding the rollups after archiving activities.
+
+        The archived activities should stay in the rollups.
+        """
+        totals = rollups.get_daily_totals(models.ActivityRollup.objects.all())
+        archive.archive_activities(datetime(2016, 2, 1))
+
+        rollups.rebuild_rollups()
+
+        self.assertEqual(
+            totals,
+            rollups.get_daily_totals(models.ActivityRollup.objects.all()))
+        self.assertEqual(
+            (date(2016, 1, 1), date(2016, 8, 2)), rollups.get_date_range())
+
+
+class TestReachesArchive(ArchiveTestMixin, TestCase):
+    """Test cases for determining if filters reach into the archive."""
+
+    def setUp(self):
+        """Archive the old activities."""
+        super(TestReachesArchive, self).setUp()
+        archive.archive_activities(datetime(2016, 2, 1))
+
+    def test_active(self):
+        """Test filtering on in-progress activities."""
+        self.assertFalse(archive.reaches_archive({'active': True}))
+
+    def test_empty_archive(self):
+        """Test filtering when nothing has been archived."""
+        models.ArchivedActivity.objects.all().delete()
+
+        self.assertFalse(archive.reaches_archive({}))
+
+    def test_ended_after(self):
+        """Test filtering on the time activities ended."""
+        self.assertTrue(archive.reaches_archive(
+            {'ended_after': datetime(2016, 1, 3, 10)}))
+        self.assertFalse(archive.reaches_archive(
+            {'ended_after': datetime(2016, 1, 3, 10, 1)}))
+
+    def test_start_after(self):
+        """Test filtering on the time activities started."""
+        self.assertTrue(archive.reaches_archive({}))
+        self.assertTrue(archive.reaches_archive(
+            {'start_after': datetime(2016, 1, 3, 9)}))
+        self.assertFalse(archive.reaches_archive(
+            {'start_after': datetime(2016, 1, 4)}))
+
+
+class TestCombinedQuerySet(ArchiveTestMixin, TestCase):
+    """Test cases for reading activities from several querysets."""
+
+    def setUp(self):
+        """Archive some of the old activities."""
+        super(TestCombinedQuerySet, self).setUp()
+        archive.archive_activities(datetime(2016, 1, 2, 12))
+
+        self.combined = archive.CombinedQuerySet([
+            models.Activity.objects.all(),
+            models.ArchivedActivity.objects.all(),
+        ])
+
+    def test_aggregate(self):
+        """Test combining aggregates of each queryset."""
+        stats = self.combined.aggregate(
+            count=Count('id'), updated_at=Max('updated_at'))
+
+        self.assertEqual(5, stats['count'])
+        self.assertEqual(self.active.updated_at, stats['updated_at'])
+
+    def test_slice(self):
+        """Test getting the first results in both orders."""
+        ordered = self.combined.order_by('start_time', 'id').values(
+            'id', 'start_time')
+
+        self.assertEqual(
+            [self.old[0].pk, self.old[1].pk, self.old[2].pk],
+            [row['id'] for row in ordered[:3]])
+
+        reverse = self.combined.order_by('-start_time', '-id')
+        self.assertEqual(
+            [self.active.pk, self.recent.pk],
+            [activity.pk for activity in reverse.filter(
+                start_time__gte=datetime(2016, 1, 3))[:2]])
+
+    def test_unsupported(self):
+        """Test using unsupported operations."""
+        with self.assertRaises(TypeError):
+            self.combined[1:2]
+
+        with self.assertRaises(TypeError):
+            self.combined.aggregate(count=Count('id', distinct=True) + 1)
+
+
+class TestArchiveViews(RequestTestMixin, ArchiveTestMixin, TestCase):
+    """Test cases for reading archived activities through the API."""
+
+    def setUp(self):
+        """Archive the old activities."""
+        super(TestArchiveViews, self).setUp()
+        archive.archive_activities(datetime(2016, 2, 1))
+
+    def test_list(self):
+        """Test listing activities in a range reaching into the archive.
+
+        The archived activities should be listed in order with the
+        current ones.
+        """
+        view = views.ActivityViewSet.as_view({'get': 'list'})
+        request = self.factory.get(
+            reverse('activity-list'),
+            {'start_after': '2016-01-02T00:00:00', 'page_size': 2})
+        response = view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [self.old[1].pk, self.old[2].pk],
+            [item['id'] for item in response.data['results']])
+
+        request = self.factory.get(response.data['next'])
+        response = view(request)
+
+        self.assertEqual(
+            [self.recent.pk, self.active.pk],
+            [item['id'] for item in response.data['results']])
+
+    def test_list_recent(self):
+        """Test listing activities in a range after the archive.
+
+        Only the current activities should be read.
+        """
+        view = views.ActivityViewSet.as_view({'get': 'list'})
+        request = self.factory.get(
+            reverse('activity-list'), {'start_after': '2016-08-01T00:00:00'})
+
+        with self.assertNumQueries(3):
+            response = view(request)
+
+        self.assertEqual(
+            [self.recent.pk, self.active.pk],
+            [item['id'] for item in response.data['results']])
+
+    def test_retrieve(self):
+        """Test retrieving an archived activity."""
+        view = views.ActivityViewSet.as_view({'get': 'retrieve'})
+        url = reverse('activity-detail', kwargs={'pk': self.old[0].pk})
+        response = view(self.factory.get(url), pk=self.old[0].pk)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('Old', response.data['title'])
+
+    def test_retrieve_missing(self):
+        """Test retrieving an activity that doesn't exist."""
+        view = views.ActivityViewSet.as_view({'get': 'retrieve'})
+        url = reverse('activity-detail', kwargs={'pk': 999})
+        response = view(self.factory.get(url), pk=999)
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_summary(self):
+        """Test summarizing activities including archived ones."""
+        view = views.ActivityViewSet.as_view({'get': 'summary'})
+        request = self.factory.get(
+            reverse('activity-summary'), {'period': 'month'})
+        response = view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [('2016-01-01', 'Old', 3), ('2016-08-01', 'Recent', 1)],
+            [(row['period'], row['title'], row['count'])
+             for row in response.data])
@@ -0,0 +1,85 @@
+from django.test import TestCase
+
+from timetracker import benchmarks, models
+
+
+class TestBenchmarks(TestCase):
+    """Test cases for the benchmark helpers."""
+
+    def test_benchmark_endpoints(self):
+        """Test benchmarking the activity endpoints.
+
+        Each request should report its query count and latencies.
+        """
+        results = benchmarks.benchmark_endpoints(20, repeat=2)
+
+        self.assertEqual(
+            ['list', 'filter', 'detail', 'create', 'update', 'serialize'],
+            [result['name'] for result in results])
+
+        for result in results:
+            self.assertEqual(20, result['rows'])
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+        queries = {
+            result['name']: result['queries_per_request']
+            for result in results
+        }
+
+        self.assertEqual(0, queries['serialize'])
+        self.assertGreater(queries['list'], 0)
+
+    def test_benchmark_query_plans(self):
+        """Test benchmarking the activity table's indexes.
+
+        Each query case should report its plan and timing.
+        """
+        results = benchmarks.benchmark_query_plans(100, repeat=1)
+
+        self.assertEqual(
+            ['list_first_page', 'list_deep_page', 'active'],
+            [result['name'] for result in results])
+
+        for result in results:
+            self.assertTrue(result['plan'])
+            self.assertGreaterEqual(result['seconds'], 0)
+
+    def test_benchmark_serializers(self):
+        """Test benchmarking the activity serializers.
+
+        Each serializer should report its throughput.
+        """
+        results = benchmarks.benchmark_serializers(10, repeat=1)
+
+        self.assertEqual(
+            ['model_serializer', 'read_serializer'],
+            [result['name'] for result in results])
+
+        for result in results:
+            self.assertGreater(result['rows_per_second'], 0)
+
+    def test_seed_activities(self):
+        """Test seeding the database with activities.
+
+        The requested number of activities should be created, and
+        seeding should be deterministic for a given seed.
+        """
+        benchmarks.seed_activities(25, batch_size=10)
+
+        self.assertEqual(25, models.Activity.objects.count())
+
+        titles = list(models.Activity.objects.order_by('pk').values_list(
+            'title', flat=True))
+        models.Activity.objects.all().delete()
+        benchmarks.seed_activities(25, batch_size=10)
+
+        self.assertEqual(titles, list(models.Activity.objects.order_by(
+            'pk').values_list('title', flat=True)))
+
+    def test_percentile(self):
+        """Test getting percentiles of measurements."""
+        values = list(range(100, 0, -1))
+
+        self.assertEqual(50, benchmarks.percentile(values, 0.5))
+        self.assertEqual(99, benchmarks.percentile(values, 0.99))
+        self.assertEqual(1, benchmarks.percentile([1], 0.99))
@@ -0,0 +1,172 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.urlresolvers import reverse
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import force_authenticate
+
+import mock
+
+from timetracker import cache, conditional, views
+from timetracker.testing_utils import RequestTestMixin, create_activity
+
+
+@override_settings(TIMETRACKER_CACHE_ENABLED=True)
+class TestResponseCache(RequestTestMixin, TestCase):
+    """Test cases for caching responses from the activity views."""
+
+    def setUp(self):
+        """Start each test with an empty cache."""
+        caches['default'].clear()
+        cache.reset_stats()
+
+        self.detail_view = views.ActivityViewSet.as_view({
+            'get': 'retrieve',
+            'patch': 'partial_update',
+        })
+        self.list_view = views.ActivityViewSet.as_view({'get': 'list'})
+
+    def test_detail_cached(self):
+        """Test caching an activity's detail view.
+
+        The second request should be served from the cache without any
+        queries.
+        """
+        activity = create_activity()
+
+        url = reverse('activity-detail', kwargs={'pk': activity.pk})
+        response = self.detail_view(self.factory.get(url), pk=activity.pk)
+
+        with self.assertNumQueries(0):
+            cached = self.detail_view(self.factory.get(url), pk=activity.pk)
+
+        self.assertEqual(response.data, cached.data)
+        self.assertEqual(response['ETag'], cached['ETag'])
+        self.assertEqual({'hits': 1, 'misses': 1, 'hit_ratio': 0.5},
+                         cache.get_stats())
+
+    def test_invalidated_during_request(self):
+        """Test invalidating the cache while a response is being built.
+
+        The response read before the change shouldn't be served to
+        later requests.
+        """
+        create_activity()
+        url = reverse('activity-list')
+        get_list_etag = conditional.get_list_etag
+
+        def invalidate_and_get_etag(*args, **kwargs):
+            cache.invalidate()
+            return get_list_etag(*args, **kwargs)
+
+        with mock.patch.object(
+                conditional, 'get_list_etag',
+                side_effect=invalidate_and_get_etag):
+            self.list_view(self.factory.get(url))
+
+        self.list_view(self.factory.get(url))
+
+        self.assertEqual(2, cache.get_stats()['misses'])
+
+    def test_disabled(self):
+        """Test requesting activities with caching disabled.
+
+        Nothing should be cached, and no lookups should be counted.
+        """
+        url = reverse('activity-list')
+
+        with override_settings(TIMETRACKER_CACHE_ENABLED=False):
+            self.list_view(self.factory.get(url))
+            self.list_view(self.factory.get(url))
+
+        self.assertEqual(0, cache.get_stats()['hits'] +
+                         cache.get_stats()['misses'])
+
+    def test_stats_view(self):
+        """Test the view reporting the cache statistics."""
+        self.list_view(self.factory.get(reverse('activity-list')))
+
+        request = self.factory.get(reverse('cache-stats'))
+        force_authenticate(request, user=User.objects.create_user(
+            'admin', is_staff=True))
+        response = views.CacheStatsView.as_view()(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(1, response.data['misses'])
+
+    def test_stats_view_not_staff(self):
+        """Test reading the cache statistics without being staff.
+
+        The request should be refused.
+        """
+        request = self.factory.get(reverse('cache-stats'))
+        force_authenticate(request, user=User.objects.create_user('user'))
+        response = views.CacheStatsView.as_view()(request)
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+
+@override_settings(TIMETRACKER_CACHE_ENABLED=True)
+class TestResponseCacheInvalidation(RequestTestMixin, TransactionTestCase):
+    """Test cases for invalidating cached responses.
+
+    Responses are only invalidated once changes are committed, so these
+    tests don't run inside a transaction.
+    """
+
+    def setUp(self):
+        """Start each test with an empty cache."""
+        caches['default'].clear()
+
+        self.list_view = views.ActivityViewSet.as_view({'get': 'list'})
+
+    def test_deferred_until_commit(self):
+        """Test changing an activity inside a transaction.
+
+        The cached list should only be invalidated once the transaction
+        commits.
+        """
+        activity = create_activity(title='Old')
+        self.list_view(self.factory.get(reverse('activity-list')))
+        generation = cache._get_generation(caches['default'])
+
+        with transaction.atomic():
+            activity.title = 'New'
+            activity.save()
+
+            self.assertEqual(
+                generation, cache._get_generation(caches['default']))
+
+        self.assertNotEqual(
+            generation, cache._get_generation(caches['default']))
+
+    def test_invalidated_on_save(self):
+        """Test that saving an activity invalidates the cache.
+
+        After an activity is changed, the list should be regenerated.
+        """
+        activity = create_activity(title='Old')
+        url = reverse('activity-list')
+
+        self.list_view(self.factory.get(url))
+
+        activity.title = 'New'
+        activity.save()
+
+        response = self.list_view(self.factory.get(url))
+
+        self.assertEqual('New', response.data['results'][0]['title'])
+
+    def test_invalidated_on_delete(self):
+        """Test that deleting an activity invalidates the cache."""
+        activity = create_activity()
+        url = reverse('activity-list')
+
+        self.list_view(self.factory.get(url))
+        activity.delete()
+
+        response = self.list_view(self.factory.get(url))
+
+        self.assertEqual([], response.data['results'])
@@ -0,0 +1,104 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from timetracker import export, models, serializers
+from timetracker.testing_utils import create_activity
+
+
+class TestExport(TestCase):
+    """Test cases for exporting activities."""
+
+    def setUp(self):
+        """Create some activities to export."""
+        end_time = timezone.now()
+        self.activities = [
+            create_activity(title='A1'),
+            create_activity(
+                title='A2',
+                start_time=end_time - timedelta(hours=1),
+                end_time=end_time),
+            create_activity(title='A, "3"'),
+        ]
+
+    def test_csv(self):
+        """Test exporting activities as CSV.
+
+        The export should start with a header line, followed by a line
+        for each activity.
+        """
+        lines = list(export.iter_csv(models.Activity.objects.all()))
+
+        self.assertEqual(
+            'id,title,start_time,end_time,duration\r\n', lines[0])
+        self.assertEqual(4, len(lines))
+        self.assertEqual(
+            '{},"A, ""3""",{},,\r\n'.format(
+                self.activities[2].pk,
+                self.activities[2].start_time.isoformat()),
+            lines[3])
+
+    def test_command(self):
+        """Test the `export_activities` management command.
+
+        The command should write each activity to stdout.
+        """
+        out = StringIO()
+        call_command('export_activities', stdout=out)
+
+        self.assertEqual(3, len(out.getvalue().splitlines()))
+
+    def test_command_output(self):
+        """Test exporting activities with non-ASCII titles to a file.
+
+        The file should contain the UTF-8 encoded export.
+        """
+        create_activity(title=u'Caf\xe9')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'activities.csv')
+
+        call_command(
+            'export_activities', '--format', 'csv', '--output', path)
+
+        with io.open(path, encoding='utf-8') as f:
+            contents = f.read()
+
+        self.assertIn(u'Caf\xe9', contents)
+        self.assertEqual(5, len(contents.splitlines()))
+
+    def test_iter_rows_chunks(self):
+        """Test iterating over activities in chunks.
+
+        Every activity should be returned once, using one query per
+        chunk.
+        """
+        with self.assertNumQueries(2):
+            rows = list(export.iter_rows(
+                models.Activity.objects.all(), chunk_size=2))
+
+        self.assertEqual(
+            [activity.pk for activity in self.activities],
+            [row[0] for row in rows])
+
+    def test_ndjson(self):
+        """Test exporting activities as newline delimited JSON.
+
+        Each line should match the serialized representation of an
+        activity, without its project, since project ids are specific to
+        each database.
+        """
+        lines = list(export.iter_ndjson(models.Activity.objects.all()))
+
+        expected = serializers.ActivityReadSerializer(
+            self.activities, many=True, fields=export.FIELDS).data
+
+        self.assertEqual(expected, [json.loads(line) for line in lines])
@@ -0,0 +1,311 @@
+import json
+import threading
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import force_authenticate
+
+import mock
+
+from timetracker import feed, models, pubsub, views
+from timetracker.testing_utils import RequestTestMixin, create_activity
+
+
+class TestChangeLog(TestCase):
+    """Test cases for recording changes to activities."""
+
+    def get_actions(self):
+        """Get the recorded changes.
+
+        Returns:
+            list: Pairs of the action and activity id of each change.
+        """
+        return list(models.ActivityChange.objects.order_by('pk').values_list(
+            'action', 'activity_id'))
+
+    def test_bulk_create(self):
+        """Test recording the creation of activities in bulk."""
+        activities = models.Activity.objects.bulk_create([
+            models.Activity(title='A1'),
+            models.Activity(title='A2'),
+        ])
+
+        self.assertEqual(
+            [(models.ActivityChange.CREATED, activity.pk)
+             for activity in activities],
+            self.get_actions())
+
+    def test_bulk_create_with_pks(self):
+        """Test creating activities in bulk when some have their own ids.
+
+        Each activity should keep its id, and the changes should refer
+        to them.
+        """
+        activities = models.Activity.objects.bulk_create([
+            models.Activity(title='A1'),
+            models.Activity(pk=1000, title='A2'),
+            models.Activity(title='A3'),
+        ])
+        pks = [activity.pk for activity in activities]
+
+        self.assertEqual(1000, pks[1])
+        self.assertEqual(
+            ['A1', 'A2', 'A3'],
+            [models.Activity.objects.get(pk=pk).title for pk in pks])
+        self.assertEqual(
+            [(models.ActivityChange.CREATED, pk) for pk in pks],
+            self.get_actions())
+
+    def test_save_and_delete(self):
+        """Test recording changes made to a single activity."""
+        activity = create_activity()
+        pk = activity.pk
+
+        activity.title = 'New Title'
+        activity.save()
+        activity.delete()
+
+        self.assertEqual([
+            (models.ActivityChange.CREATED, pk),
+            (models.ActivityChange.UPDATED, pk),
+            (models.ActivityChange.DELETED, pk),
+        ], self.get_actions())
+
+    def test_save_rolled_back(self):
+        """Test saving an activity when its change can't be recorded.
+
+        The activity should be rolled back with the change.
+        """
+        with mock.patch.object(
+                models.ActivityChangeQuerySet, 'record',
+                side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                create_activity()
+
+        self.assertFalse(models.Activity.objects.exists())
+
+    def test_stop(self):
+        """Test recording the activities stopped by the timer."""
+        activity = create_activity()
+        models.ActivityChange.objects.all().delete()
+
+        models.Activity.objects.stop()
+
+        self.assertEqual(
+            [(models.ActivityChange.UPDATED, activity.pk)],
+            self.get_actions())
+
+
+class TestFeed(TestCase):
+    """Test cases for reading the change feed."""
+
+    def test_get_changes(self):
+        """Test getting the changes made after a sequence number.
+
+        Only the most recent change to each activity should be returned,
+        and activities created since the sequence number should be
+        reported as created even if they were then updated.
+        """
+        deleted = create_activity(title='Deleted')
+        deleted_pk = deleted.pk
+        since = feed.get_sequence()
+
+        created = create_activity(title='Created')
+        created.title = 'Updated'
+        created.save()
+        deleted.delete()
+
+        changes = feed.get_changes(since, limit=100)
+
+        self.assertEqual(
+            [(models.ActivityChange.CREATED, created.pk, 'Updated'),
+             (models.ActivityChange.DELETED, deleted_pk, None)],
+            [(change['action'], change['id'],
+              change['activity'] and change['activity']['title'])
+             for change in changes])
+        self.assertEqual(feed.get_sequence(), changes[-1]['sequence'])
+
+    def test_get_changes_committed_late(self):
+        """Test reading a change that committed after a later change.
+
+        The change should be read after the later change, since it's
+        numbered once it commits.
+        """
+        first = create_activity()
+        second = create_activity()
+        since = feed.get_sequence()
+
+        # Simulate the first change committing after the second one
+        # was read.
+        models.ActivityChange.objects.filter(activity_id=first.pk).update(
+            sequence=None)
+
+        changes = feed.get_changes(since, 100)
+
+        self.assertEqual([first.pk], [change['id'] for change in changes])
+        self.assertGreater(changes[0]['sequence'], since)
+        self.assertEqual(changes[-1]['sequence'], feed.get_sequence())
+        self.assertNotIn(
+            second.pk, [change['id'] for change in changes])
+
+    @override_settings(TIMETRACKER_FEED_POLL_INTERVAL=0.01)
+    def test_wait_for_changes_timeout(self):
+        """Test waiting for changes when nothing changes.
+
+        An empty list should be returned once the timeout expires.
+        """
+        create_activity()
+
+        self.assertEqual(
+            [], feed.wait_for_changes(feed.get_sequence(), 0.05, 100))
+
+    def test_pubsub_wait(self):
+        """Test waking a waiting request when a change is published."""
+        version = pubsub.get_version()
+        threading.Timer(0.01, pubsub.publish).start()
+
+        self.assertTrue(pubsub.wait(version, 5))
+        self.assertFalse(pubsub.wait(pubsub.get_version(), 0.01))
+
+
+class TestChangeNumbering(TransactionTestCase):
+    """Test cases for numbering changes when they commit."""
+
+    def test_numbered_on_commit(self):
+        """Test committing a change to an activity.
+
+        The change should be numbered after the changes committed before
+        it.
+        """
+        first = create_activity()
+        with transaction.atomic():
+            second = create_activity()
+            self.assertIsNone(models.ActivityChange.objects.get(
+                activity_id=second.pk).sequence)
+
+        sequences = dict(models.ActivityChange.objects.values_list(
+            'activity_id', 'sequence'))
+
+        self.assertLess(sequences[first.pk], sequences[second.pk])
+        self.assertEqual(
+            sequences[second.pk],
+            models.ActivityChangeCounter.objects.get().value)
+
+
+class TestFeedConnections(TransactionTestCase):
+    """Test cases for the database connections used while waiting."""
+
+    @override_settings(TIMETRACKER_FEED_POLL_INTERVAL=0.01)
+    def test_wait_closes_connection(self):
+        """Test waiting for changes outside of a transaction.
+
+        The connection should be closed before each wait.
+        """
+        with mock.patch.object(pubsub, 'wait') as wait:
+            with mock.patch.object(connection, 'close') as close:
+                wait.side_effect = lambda *args: close.assert_called_with()
+
+                feed.wait_for_changes(feed.get_sequence(), 0.05, 100)
+
+        self.assertTrue(wait.called)
+
+
+class TestActivityChangesView(RequestTestMixin, TestCase):
+    """Test cases for the activity change feed view."""
+    url = reverse('activity-changes')
+
+    def setUp(self):
+        """Transform `ActivityViewSet` to a normal view function."""
+        self.view = views.ActivityViewSet.as_view(
+            {'get': 'changes'}, **views.ActivityViewSet.changes.kwargs)
+
+    def test_changes(self):
+        """Test listing the changes made after a sequence number.
+
+        The response should contain the changes and the sequence number
+        to request the next changes from.
+        """
+        since = self.view(self.factory.get(self.url)).data['sequence']
+        activity = create_activity()
+
+        response = self.view(self.factory.get(self.url, {'since': since}))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(feed.get_sequence(), response.data['sequence'])
+        self.assertEqual(
+            [activity.pk],
+            [change['id'] for change in response.data['changes']])
+
+    @override_settings(TIMETRACKER_SCOPE_TO_OWNER=True)
+    def test_changes_other_owners(self):
+        """Test listing changes when only other owners made any.
+
+        The sequence number should move past their changes.
+        """
+        owner = User.objects.create_user('owner')
+        other = User.objects.create_user('other')
+        models.Activity.objects.create(owner=other)
+
+        request = self.factory.get(self.url, {'since': 0})
+        force_authenticate(request, user=owner)
+        response = self.view(request)
+
+        self.assertEqual([], response.data['changes'])
+        self.assertEqual(feed.get_sequence(), response.data['sequence'])
+
+    def test_current_sequence(self):
+        """Test requesting the feed without a sequence number.
+
+        The current sequence number should be returned without any
+        changes.
+        """
+        create_activity()
+
+        response = self.view(self.factory.get(self.url))
+
+        self.assertEqual(
+            {'sequence': feed.get_sequence(), 'changes': []}, response.data)
+
+    @override_settings(
+        TIMETRACKER_FEED_POLL_INTERVAL=0.01,
+        TIMETRACKER_FEED_TIMEOUT=0.05)
+    def test_event_stream(self):
+        """Test streaming the changes as server-sent events.
+
+        Clients should be able to resume from the last event they
+        received.
+        """
+        first = create_activity()
+        second = create_activity()
+
+        request = self.factory.get(
+            self.url,
+            HTTP_ACCEPT='text/event-stream',
+            HTTP_LAST_EVENT_ID=str(feed.get_sequence() - 1))
+        response = self.view(request)
+        content = b''.join(response.streaming_content).decode('utf-8')
+
+        self.assertEqual('text/event-stream', response['Content-Type'])
+        self.assertTrue(content.startswith('retry: 10\n\n'))
+        self.assertNotIn('"id": {},'.format(first.pk), content)
+
+        data = [
+            json.loads(line[len('data: '):])
+            for line in content.splitlines()
+            if line.startswith('data: ')
+        ]
+
+        self.assertEqual([second.pk], [change['id'] for change in data])
+
+    def test_invalid_since(self):
+        """Test requesting changes after an invalid sequence number.
+
+        A 400 status code should be returned.
+        """
+        response = self.view(self.factory.get(self.url, {'since': -1}))
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework import status
+
+from timetracker import views
+from timetracker.testing_utils import RequestTestMixin, create_activity
+
+
+class TestActivityFilterBackend(RequestTestMixin, TestCase):
+    """Test cases for filtering the activity list view."""
+    url = reverse('activity-list')
+
+    def setUp(self):
+        """Create a list view and activities to filter."""
+        self.view = views.ActivityViewSet.as_view({'get': 'list'})
+
+        self.now = timezone.now()
+        self.old = create_activity(
+            title='Old',
+            start_time=self.now - timedelta(days=7),
+            end_time=self.now - timedelta(days=6))
+        self.recent = create_activity(
+            title='Recent',
+            start_time=self.now - timedelta(hours=3),
+            end_time=self.now - timedelta(hours=2))
+        self.running = create_activity(
+            title='Running',
+            start_time=self.now - timedelta(hours=1))
+
+    def get_ids(self, params):
+        """Get the ids of the activities matching some filters.
+
+        Args:
+            params (dict): The query parameters to send.
+
+        Returns:
+            list: The ids of the activities in the response.
+        """
+        request = self.factory.get(self.url, params)
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        return [item['id'] for item in response.data['results']]
+
+    def test_active(self):
+        """Test filtering by whether activities are in progress."""
+        self.assertEqual([self.running.pk], self.get_ids({'active': 'true'}))
+        self.assertEqual(
+            [self.old.pk, self.recent.pk], self.get_ids({'active': 'false'}))
+
+    def test_ended_after(self):
+        """Test filtering activities by their end time.
+
+        In-progress activities have no end time, so they should not be
+        included.
+        """
+        params = {'ended_after': (self.now - timedelta(days=1)).isoformat()}
+
+        self.assertEqual([self.recent.pk], self.get_ids(params))
+
+    def test_invalid_filter(self):
+        """Test passing an invalid filter value.
+
+        The response should have a 400 status code and describe the
+        invalid parameter.
+        """
+        request = self.factory.get(self.url, {'start_after': 'yesterday'})
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('start_after', response.data)
+
+    def test_min_duration(self):
+        """Test filtering activities by their duration.
+
+        Only completed activities lasting at least the given duration
+        should be returned.
+        """
+        params = {'min_duration': '2:00:00'}
+
+        self.assertEqual([self.old.pk], self.get_ids(params))
+
+    def test_start_range(self):
+        """Test filtering activities by a range of start times."""
+        params = {
+            'start_after': (self.now - timedelta(days=1)).isoformat(),
+            'start_before': (self.now - timedelta(minutes=90)).isoformat(),
+        }
+
+        self.assertEqual([self.recent.pk], self.get_ids(params))
+
+    def test_title_prefix(self):
+        """Test filtering activities by the start of their title."""
+        self.assertEqual(
+            [self.recent.pk, self.running.pk], self.get_ids({'title': 'R'}))
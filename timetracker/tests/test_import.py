@@ -0,0 +1,125 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from timetracker import export, models
+from timetracker.testing_utils import create_activity
+
+
+class TestImportActivitiesCommand(TestCase):
+    """Test cases for the `import_activities` management command."""
+
+    def setUp(self):
+        """Create a directory for the files to import."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the directory of files to import."""
+        shutil.rmtree(self.directory)
+
+    def write_file(self, name, lines):
+        """Write a file to import.
+
+        Args:
+            name (str): The name of the file.
+            lines (list): The lines to write to the file.
+
+        Returns:
+            str: The path of the file.
+        """
+        path = os.path.join(self.directory, name)
+        with io.open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(u''.join(lines))
+
+        return path
+
+    def test_import_csv(self):
+        """Test importing activities exported as CSV.
+
+        Importing an export should recreate the exported activities.
+        """
+        create_activity(title='A1')
+        create_activity(title='A2')
+        lines = list(export.iter_csv(models.Activity.objects.all()))
+        models.Activity.objects.all().delete()
+
+        path = self.write_file('activities.csv', lines)
+        call_command('import_activities', path, stdout=StringIO())
+
+        self.assertEqual(
+            ['A1', 'A2'],
+            list(models.Activity.objects.order_by('title').values_list(
+                'title', flat=True)))
+
+    def test_import_csv_unicode(self):
+        """Test importing a CSV file with non-ASCII titles."""
+        path = self.write_file('activities.csv', [
+            u'title,start_time\r\n',
+            u'Caf\xe9,2016-08-01T09:00:00\r\n',
+        ])
+        call_command('import_activities', path, stdout=StringIO())
+
+        self.assertEqual(
+            [u'Caf\xe9'],
+            list(models.Activity.objects.values_list('title', flat=True)))
+
+    def test_import_ndjson(self):
+        """Test importing activities in chunks.
+
+        Each chunk should be committed and reported.
+        """
+        path = self.write_file('activities.ndjson', [
+            '{"title": "A1", "start_time": "2016-08-01T09:00:00"}\n',
+            '\n',
+            '{"title": "A2", "end_time": "2016-08-01T11:00:00"}\n',
+            '{"title": "A3"}\n',
+        ])
+
+        out = StringIO()
+        call_command('import_activities', path, chunk_size=2, stdout=out)
+
+        self.assertEqual(3, models.Activity.objects.count())
+        self.assertIn('Committed 2 activities', out.getvalue())
+        self.assertIn('Imported 3 activities', out.getvalue())
+
+    def test_resume(self):
+        """Test resuming a failed import.
+
+        Chunks committed before an invalid activity should be kept, and
+        running the import again with the same checkpoint should skip
+        them.
+        """
+        path = self.write_file('activities.ndjson', [
+            '{"title": "A1"}\n',
+            '{"title": "A2"}\n',
+            '{"title": "A3", "start_time": "never"}\n',
+        ])
+        checkpoint = os.path.join(self.directory, 'checkpoint')
+
+        with self.assertRaises(CommandError) as context:
+            call_command('import_activities', path, chunk_size=2,
+                         checkpoint=checkpoint, stdout=StringIO())
+
+        self.assertIn('Activity 3', str(context.exception))
+        self.assertEqual(2, models.Activity.objects.count())
+        self.assertEqual(
+            ['activities.ndjson', 'checkpoint'],
+            sorted(os.listdir(self.directory)))
+
+        self.write_file('activities.ndjson', [
+            '{"title": "A1"}\n',
+            '{"title": "A2"}\n',
+            '{"title": "A3"}\n',
+        ])
+        call_command('import_activities', path, chunk_size=2,
+                     checkpoint=checkpoint, stdout=StringIO())
+
+        self.assertEqual(
+            ['A1', 'A2', 'A3'],
+            list(models.Activity.objects.order_by('title').values_list(
+                'title', flat=True)))
@@ -0,0 +1,94 @@
+from base64 import b64encode
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+
+from timetracker import metrics
+from timetracker.testing_utils import create_activity
+
+
+MIDDLEWARE = ['timetracker.metrics.InstrumentationMiddleware']
+
+
+@override_settings(MIDDLEWARE=MIDDLEWARE, TIMETRACKER_METRICS_ENABLED=True)
+class TestInstrumentation(TestCase):
+    """Test cases for instrumenting requests."""
+
+    def setUp(self):
+        """Start each test without any recorded metrics."""
+        metrics.reset_metrics()
+
+    def test_disabled(self):
+        """Test making a request with instrumentation disabled.
+
+        Nothing should be measured or recorded.
+        """
+        with self.settings(TIMETRACKER_METRICS_ENABLED=False):
+            response = self.client.get(reverse('activity-list'))
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual({}, metrics.get_metrics())
+
+    def test_metrics_view(self):
+        """Test getting the recorded metrics.
+
+        The totals for each endpoint should be returned.
+        """
+        self.client.get(reverse('activity-list'))
+
+        User.objects.create_user('admin', password='secret', is_staff=True)
+        response = self.client.get(
+            reverse('metrics'),
+            HTTP_AUTHORIZATION='Basic {}'.format(
+                b64encode(b'admin:secret').decode('ascii')))
+
+        self.assertEqual(1, response.data['GET activity-list']['requests'])
+
+    def test_metrics_view_anonymous(self):
+        """Test getting the recorded metrics without logging in.
+
+        The request should be refused.
+        """
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+    def test_record_request(self):
+        """Test recording the measurements of a request.
+
+        The number of queries and the time spent on each part of the
+        request should be totalled for the endpoint.
+        """
+        activity = create_activity()
+        url = reverse('activity-detail', kwargs={'pk': activity.pk})
+
+        self.client.get(url)
+        self.client.get(url)
+
+        totals = metrics.get_metrics()['GET activity-detail']
+
+        self.assertEqual(2, totals['requests'])
+        self.assertEqual(2, totals['queries'])
+        self.assertGreater(totals['total_ms'], 0)
+        self.assertGreater(totals['serialize_ms'], 0)
+        self.assertGreater(totals['render_ms'], 0)
+        self.assertLessEqual(totals['max_total_ms'], totals['total_ms'])
+
+    def test_server_timing(self):
+        """Test the ``Server-Timing`` header added to responses.
+
+        The header should describe each part of the request.
+        """
+        create_activity()
+
+        response = self.client.get(reverse('activity-list'))
+        names = [
+            entry.split(';')[0]
+            for entry in response['Server-Timing'].split(', ')
+        ]
+
+        self.assertEqual(['db', 'serialize', 'render', 'total'], names)
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
@@ -1,11 +1,14 @@
 from datetime import timedelta
 
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
 from django.utils import timezone
 
 import mock
 
 from timetracker import models
+from timetracker.testing_utils import create_activity
 
 
 class TestActivityModel(TestCase):
@@ -28,6 +31,24 @@ class TestActivityModel(TestCase):
         self.assertEqual(start_time, activity.start_time)
         self.assertEqual(end_time, activity.end_time)
 
+    def test_duration(self):
+        """Test the stored duration of an activity.
+
+        The duration should be calculated when the activity is saved,
+        and should be `None` while the activity is in progress.
+        """
+        start_time = timezone.now()
+        activity = models.Activity.objects.create(
+            title='Test Activity', start_time=start_time)
+
+        self.assertIsNone(activity.duration)
+
+        activity.end_time = start_time + timedelta(minutes=90)
+        activity.save()
+        activity.refresh_from_db()
+
+        self.assertEqual(timedelta(minutes=90), activity.duration)
+
     def test_creation_defaults(self):
         """Test the defaults for the `Activity` model.
 
@@ -46,6 +67,26 @@ class TestActivityModel(TestCase):
         self.assertEqual(time, activity.start_time)
         self.assertIsNone(activity.end_time)
 
+    def test_indexes(self):
+        """Test the indexes on the `Activity` table.
+
+        There should be composite indexes on `start_time` and `id` for
+        listing activities, both overall and for each owner, and an
+        index for in-progress activities.
+        """
+        table = models.Activity._meta.db_table
+
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, table)
+
+        columns = [info['columns'] for info in constraints.values()
+                   if info['index']]
+
+        self.assertIn(['start_time', 'id'], columns)
+        self.assertIn(['owner_id', 'start_time', 'id'], columns)
+        self.assertIn('timetracker_activity_active', constraints)
+
     def test_is_active(self):
         """Test the `Activity` model's `is_active` property.
 
@@ -103,3 +144,149 @@ class TestActivityModel(TestCase):
         activity = models.Activity(title=title, start_time=start_time)
 
         self.assertEqual(expected, str(activity))
+
+
+class TestActivityQuerySet(TestCase):
+    """Test cases for the `Activity` model's custom queryset."""
+
+    def test_active(self):
+        """Test getting the in-progress activities."""
+        running = create_activity()
+        create_activity(end_time=timezone.now())
+
+        self.assertEqual([running], list(models.Activity.objects.active()))
+
+    def test_completed(self):
+        """Test getting the activities that have ended."""
+        create_activity()
+        completed = create_activity(end_time=timezone.now())
+
+        self.assertEqual(
+            [completed], list(models.Activity.objects.completed()))
+
+    def test_delete_sliced(self):
+        """Test deleting a slice of the activities.
+
+        The deletion should be refused, like Django's own `delete`, and
+        nothing should be deleted.
+        """
+        create_activity()
+
+        with self.assertRaises(AssertionError):
+            models.Activity.objects.all()[:1].delete()
+
+        self.assertEqual(1, models.Activity.objects.count())
+
+    def test_overlapping(self):
+        """Test getting the activities overlapping a period of time.
+
+        Activities that end when the period starts, or start when it
+        ends, should not be included. In-progress activities should be
+        treated as if they never end.
+        """
+        now = timezone.now()
+        before = create_activity(
+            start_time=now - timedelta(hours=3),
+            end_time=now - timedelta(hours=2))
+        during = create_activity(
+            start_time=now - timedelta(hours=2),
+            end_time=now - timedelta(minutes=30))
+        running = create_activity(start_time=now - timedelta(hours=4))
+        create_activity(start_time=now)
+
+        overlapping = models.Activity.objects.overlapping(
+            now - timedelta(hours=2), now)
+
+        self.assertEqual({during, running}, set(overlapping))
+        self.assertNotIn(before, overlapping)
+
+    def test_start(self):
+        """Test starting an activity.
+
+        Every in-progress activity should be stopped at the time the new
+        activity starts.
+        """
+        running1 = create_activity()
+        running2 = create_activity()
+        start_time = timezone.now()
+
+        activity, stopped = models.Activity.objects.start(
+            'New', start_time=start_time)
+
+        self.assertEqual({running1, running2}, set(stopped))
+        self.assertEqual([activity], list(models.Activity.objects.active()))
+        self.assertEqual(start_time, activity.start_time)
+
+    def test_start_before_running(self):
+        """Test starting an activity before one that is in progress.
+
+        The new activity shouldn't be created, since the running one
+        can't be stopped before it started.
+        """
+        running = create_activity()
+
+        with self.assertRaises(ValueError):
+            models.Activity.objects.start(
+                'New', start_time=running.start_time - timedelta(hours=2))
+
+        self.assertEqual([running], list(models.Activity.objects.all()))
+
+    def test_start_locks_timer(self):
+        """Test the timer locked while starting activities.
+
+        Each owner should have a single timer, created on first use.
+        """
+        user = User.objects.create_user('owner')
+
+        models.Activity.objects.start('A')
+        models.Activity.objects.start('B')
+        models.Activity.objects.filter(owner=user).start('C', owner=user)
+
+        self.assertEqual(
+            [0, user.pk],
+            list(models.ActivityTimer.objects.order_by(
+                'owner_key').values_list('owner_key', flat=True)))
+
+    def test_stop_before_start(self):
+        """Test stopping activities at a time before they started.
+
+        Activities that started after the end time should be left in
+        progress.
+        """
+        running = create_activity()
+
+        stopped = models.Activity.objects.stop(
+            end_time=running.start_time - timedelta(hours=1))
+
+        self.assertEqual([], stopped)
+        self.assertEqual([running], list(models.Activity.objects.active()))
+
+    def test_stop_duration(self):
+        """Test the duration of stopped activities.
+
+        The duration should be stored by the database when an activity
+        is stopped.
+        """
+        running = create_activity()
+        end_time = running.start_time + timedelta(hours=2)
+
+        models.Activity.objects.stop(end_time=end_time)
+        running.refresh_from_db()
+
+        self.assertEqual(timedelta(hours=2), running.duration)
+
+    def test_with_duration(self):
+        """Test annotating activities with their current duration.
+
+        In-progress activities should be measured up to the given time.
+        """
+        now = timezone.now()
+        create_activity(start_time=now - timedelta(hours=3),
+                        end_time=now - timedelta(hours=2))
+        create_activity(start_time=now - timedelta(minutes=30))
+
+        durations = models.Activity.objects.with_duration(now).order_by(
+            'start_time').values_list('current_duration', flat=True)
+
+        self.assertEqual(
+            [timedelta(hours=1), timedelta(minutes=30)], list(durations))
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from timetracker import models, overlaps
+from timetracker.testing_utils import create_activity
+
+
+class TestFindOverlaps(TestCase):
+    """Test cases for finding overlapping activities."""
+
+    def setUp(self):
+        """Create activities that overlap in different ways."""
+        self.now = timezone.now()
+
+        self.first = create_activity(
+            start_time=self.now - timedelta(hours=4),
+            end_time=self.now - timedelta(hours=2))
+        self.inner = create_activity(
+            start_time=self.now - timedelta(hours=3),
+            end_time=self.now - timedelta(minutes=150))
+        self.adjacent = create_activity(
+            start_time=self.now - timedelta(hours=2),
+            end_time=self.now - timedelta(hours=1))
+        self.running = create_activity(
+            start_time=self.now - timedelta(minutes=90))
+
+    def find(self, **kwargs):
+        """Find the overlaps between all activities.
+
+        Returns:
+            list: The overlaps found.
+        """
+        return list(overlaps.find_overlaps(
+            models.Activity.objects.all(), **kwargs))
+
+    def test_find_overlaps(self):
+        """Test finding overlapping activities.
+
+        Activities that end exactly when another starts don't overlap,
+        and in-progress activities overlap everything after their start.
+        """
+        self.assertEqual([
+            overlaps.Overlap(
+                self.first.pk, self.inner.pk,
+                self.now - timedelta(hours=3),
+                self.now - timedelta(minutes=150)),
+            overlaps.Overlap(
+                self.adjacent.pk, self.running.pk,
+                self.now - timedelta(minutes=90),
+                self.now - timedelta(hours=1)),
+        ], self.find())
+
+    def test_find_overlaps_chunked(self):
+        """Test finding overlaps while fetching activities in chunks.
+
+        The results shouldn't depend on the chunk size.
+        """
+        self.assertEqual(self.find(), self.find(chunk_size=1))
+
+    def test_find_overlaps_window(self):
+        """Test finding overlaps within a window of time.
+
+        The overlaps should be clipped to the window.
+        """
+        start = self.now - timedelta(minutes=75)
+
+        self.assertEqual([
+            overlaps.Overlap(
+                self.adjacent.pk, self.running.pk,
+                start, self.now - timedelta(hours=1)),
+        ], self.find(start=start, end=self.now))
+
+    def test_running_overlaps(self):
+        """Test finding overlaps between in-progress activities.
+
+        Overlaps between activities that are both in progress have no
+        end.
+        """
+        later = create_activity(start_time=self.now - timedelta(minutes=30))
+
+        expected = overlaps.Overlap(
+            self.running.pk, later.pk, later.start_time, None)
+
+        self.assertIn(expected, self.find())
+
+    def test_sweep_matches_pairwise(self):
+        """Test the sweep against comparing every pair of activities."""
+        activities = list(models.Activity.objects.all())
+        expected = set()
+        for a in activities:
+            for b in activities:
+                a_end = a.end_time or self.now + timedelta(days=1)
+                b_end = b.end_time or self.now + timedelta(days=1)
+                if ((a.start_time, a.pk) < (b.start_time, b.pk) and
+                        a.start_time < b_end and b.start_time < a_end):
+                    expected.add((a.pk, b.pk))
+
+        found = overlaps.iter_swept_overlaps(models.Activity.objects.all())
+
+        self.assertEqual(
+            expected, {(overlap.first, overlap.second) for overlap in found})
+
+
+class TestFindOverlapsCommand(TestCase):
+    """Test cases for the `find_overlaps` management command."""
+
+    def test_find_overlaps(self):
+        """Test listing overlapping activities.
+
+        Each overlapping pair should be written, followed by a count.
+        """
+        now = timezone.now()
+        first = create_activity(
+            start_time=now - timedelta(hours=2), end_time=now)
+        second = create_activity(start_time=now - timedelta(hours=1))
+
+        out = StringIO()
+        call_command('find_overlaps', stdout=out)
+
+        self.assertIn(
+            '{} and {} overlap'.format(first.pk, second.pk), out.getvalue())
+        self.assertIn('Found 1 overlapping', out.getvalue())
+
+    def test_no_overlaps(self):
+        """Test running the command when nothing overlaps."""
+        create_activity()
+
+        out = StringIO()
+        call_command('find_overlaps', stdout=out)
+
+        self.assertIn('No overlapping activities found.', out.getvalue())
@@ -0,0 +1,206 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.core.urlresolvers import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from rest_framework import status
+from rest_framework.test import force_authenticate
+
+from timetracker import archive, feed, models, overlaps, views
+from timetracker.testing_utils import RequestTestMixin, create_activity
+
+
+def create_user(username):
+    """Create a user to own activities.
+
+    Args:
+        username (str): The user's username.
+
+    Returns:
+        User: The new user.
+    """
+    return get_user_model().objects.create_user(username=username)
+
+
+@override_settings(TIMETRACKER_SCOPE_TO_OWNER=True)
+class TestOwnerScoping(RequestTestMixin, TestCase):
+    """Test cases for scoping the activity views to their owners."""
+
+    def setUp(self):
+        """Create two users with an activity each."""
+        self.alice = create_user('alice')
+        self.bob = create_user('bob')
+
+        self.alices = models.Activity.objects.create(
+            owner=self.alice, title='Alice')
+        self.bobs = models.Activity.objects.create(
+            owner=self.bob, title='Bob')
+
+    def get(self, view, url, user, **kwargs):
+        """Make an authenticated GET request to a view.
+
+        Args:
+            view: The view to request.
+            url (str): The URL of the request.
+            user (User): The user making the request.
+
+        Returns:
+            Response: The view's response.
+        """
+        request = self.factory.get(url)
+        force_authenticate(request, user=user)
+
+        return view(request, **kwargs)
+
+    def test_anonymous(self):
+        """Test listing activities without authenticating.
+
+        Since activities are scoped to their owners, a 403 status code
+        should be returned.
+        """
+        view = views.ActivityViewSet.as_view({'get': 'list'})
+        response = view(self.factory.get(reverse('activity-list')))
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+
+    def test_changes(self):
+        """Test the change feed only containing the user's changes."""
+        changes = feed.get_changes(0, 100, owner=self.alice)
+
+        self.assertEqual([self.alices.pk], [c['id'] for c in changes])
+
+    def test_create(self):
+        """Test creating an activity.
+
+        The new activity should belong to the user who created it.
+        """
+        view = views.ActivityViewSet.as_view({'post': 'create'})
+        request = self.factory.post(reverse('activity-list'), {'title': 'A'})
+        force_authenticate(request, user=self.alice)
+
+        response = view(request)
+        activity = models.Activity.objects.get(pk=response.data['id'])
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(self.alice, activity.owner)
+
+    def test_detail_other_owner(self):
+        """Test retrieving another user's activity.
+
+        A 404 status code should be returned.
+        """
+        view = views.ActivityViewSet.as_view({'get': 'retrieve'})
+        url = reverse('activity-detail', kwargs={'pk': self.bobs.pk})
+
+        response = self.get(view, url, self.alice, pk=self.bobs.pk)
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_list(self):
+        """Test listing activities.
+
+        Only the user's own activities should be listed.
+        """
+        view = views.ActivityViewSet.as_view({'get': 'list'})
+
+        response = self.get(view, reverse('activity-list'), self.alice)
+
+        self.assertEqual(
+            [self.alices.pk],
+            [item['id'] for item in response.data['results']])
+
+    def test_start(self):
+        """Test starting an activity.
+
+        Only the user's own activities should be stopped, and the new
+        activity should belong to them.
+        """
+        view = views.ActivityViewSet.as_view({'post': 'start'})
+        request = self.factory.post(reverse('activity-start'), {'title': 'A'})
+        force_authenticate(request, user=self.alice)
+
+        response = view(request)
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(
+            self.alice, models.Activity.objects.get(
+                pk=response.data['id']).owner)
+        self.assertEqual(
+            {self.bobs.pk, response.data['id']},
+            set(models.Activity.objects.active().values_list(
+                'pk', flat=True)))
+
+
+class TestOwnerOverlaps(TestCase):
+    """Test cases for finding overlaps between owned activities."""
+
+    def test_different_owners(self):
+        """Test activities with different owners at the same time.
+
+        Only activities with the same owner should overlap.
+        """
+        alice = create_user('alice')
+        bob = create_user('bob')
+        start_time = timezone.now() - timedelta(hours=1)
+
+        first = models.Activity.objects.create(
+            owner=alice, start_time=start_time)
+        models.Activity.objects.create(owner=bob, start_time=start_time)
+        second = models.Activity.objects.create(
+            owner=alice, start_time=start_time)
+
+        found = overlaps.find_overlaps(models.Activity.objects.all())
+
+        self.assertEqual(
+            [(first.pk, second.pk)],
+            [(overlap.first, overlap.second) for overlap in found])
+
+
+class TestAssignActivityOwnerCommand(TestCase):
+    """Test cases for the `assign_activity_owner` management command."""
+
+    def test_assign(self):
+        """Test assigning the unowned activities to a user.
+
+        Activities that already have an owner should be left alone.
+        """
+        alice = create_user('alice')
+        bob = create_user('bob')
+        unowned = create_activity()
+        owned = models.Activity.objects.create(owner=bob)
+
+        call_command('assign_activity_owner', 'alice', stdout=StringIO())
+
+        unowned.refresh_from_db()
+        owned.refresh_from_db()
+
+        self.assertEqual(alice, unowned.owner)
+        self.assertEqual(bob, owned.owner)
+        self.assertEqual(
+            [unowned.pk],
+            [change['id'] for change in feed.get_changes(0, 100, alice)])
+
+    def test_assign_archived(self):
+        """Test assigning unowned archived activities to a user."""
+        alice = create_user('alice')
+        now = timezone.now()
+        create_activity(
+            start_time=now - timedelta(days=60),
+            end_time=now - timedelta(days=59))
+        archive.archive_activities(now - timedelta(days=30))
+
+        call_command('assign_activity_owner', 'alice', stdout=StringIO())
+
+        self.assertEqual(
+            [alice.pk],
+            list(models.ArchivedActivity.objects.values_list(
+                'owner_id', flat=True)))
+
+    def test_unknown_user(self):
+        """Test assigning activities to a user that doesn't exist."""
+        with self.assertRaises(CommandError):
+            call_command('assign_activity_owner', 'nobody', stdout=StringIO())
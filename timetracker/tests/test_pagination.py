@@ -0,0 +1,154 @@
+from datetime import timedelta
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from rest_framework import status
+
+from timetracker import pagination, views
+from timetracker.testing_utils import (
+    DatasetMixin, RequestTestMixin, create_activity)
+
+
+class TestActivityCursorPagination(RequestTestMixin, TestCase):
+    """Test cases for paginating the activity list view."""
+    url = reverse('activity-list')
+
+    def setUp(self):
+        """Create a list view and some activities to paginate."""
+        self.view = views.ActivityViewSet.as_view({'get': 'list'})
+
+        # Half of the activities share a start time so that the `id`
+        # tie breaker is exercised.
+        now = timezone.now()
+        self.activities = [
+            create_activity(start_time=now - timedelta(hours=i // 2))
+            for i in range(6)
+        ]
+        self.activities.sort(key=lambda a: (a.start_time, a.pk))
+
+    def get_page(self, url):
+        """Get a page of activities from the list view.
+
+        Args:
+            url (str): The URL of the page to get.
+
+        Returns:
+            Response: The response from the list view.
+        """
+        request = self.factory.get(url)
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        return response
+
+    def get_ids(self, response):
+        """Get the ids of the activities in a page.
+
+        Args:
+            response (Response): The response containing the page.
+
+        Returns:
+            list: The ids of the activities in the page.
+        """
+        return [item['id'] for item in response.data['results']]
+
+    @override_settings(TIMETRACKER_PAGE_SIZE=4)
+    def test_first_page(self):
+        """Test getting the first page of results.
+
+        The first page should contain the earliest activities, a link to
+        the next page, and no link to a previous page.
+        """
+        response = self.get_page(self.url)
+
+        expected = [a.pk for a in self.activities[:4]]
+
+        self.assertEqual(expected, self.get_ids(response))
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    @override_settings(TIMETRACKER_PAGE_SIZE=2)
+    def test_follow_links(self):
+        """Test following the links between pages.
+
+        Following the next links should return every activity exactly
+        once, and following the previous links back should return the
+        same pages in reverse.
+        """
+        pages = [self.get_page(self.url)]
+        while pages[-1].data['next'] is not None:
+            pages.append(self.get_page(pages[-1].data['next']))
+
+        ids = [pk for page in pages for pk in self.get_ids(page)]
+
+        self.assertEqual([a.pk for a in self.activities], ids)
+        self.assertEqual(3, len(pages))
+
+        response = self.get_page(pages[-1].data['previous'])
+
+        self.assertEqual(self.get_ids(pages[1]), self.get_ids(response))
+
+        response = self.get_page(response.data['previous'])
+
+        self.assertEqual(self.get_ids(pages[0]), self.get_ids(response))
+        self.assertIsNone(response.data['previous'])
+
+    def test_invalid_cursor(self):
+        """Test passing an invalid cursor.
+
+        If the cursor can't be decoded, a 404 status code should be
+        returned.
+        """
+        request = self.factory.get(self.url, {'cursor': 'not-a-cursor'})
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    @override_settings(TIMETRACKER_MAX_PAGE_SIZE=3)
+    def test_page_size_param(self):
+        """Test requesting a specific page size.
+
+        Clients should be able to request a page size, but it should be
+        capped at the maximum page size.
+        """
+        response = self.get_page('{}?page_size=2'.format(self.url))
+
+        self.assertEqual(2, len(response.data['results']))
+
+        response = self.get_page('{}?page_size=5'.format(self.url))
+
+        self.assertEqual(3, len(response.data['results']))
+
+
+class TestLargeCursorPagination(DatasetMixin, RequestTestMixin, TestCase):
+    """Test cases for paginating a large number of activities."""
+    dataset = 'large'
+    url = reverse('activity-list')
+
+    @override_settings(TIMETRACKER_PAGE_SIZE=10)
+    def test_deep_page(self):
+        """Test getting a page deep into the results.
+
+        The page should contain the activities following the cursor,
+        and be fetched with the same number of queries as the first
+        page.
+        """
+        view = views.ActivityViewSet.as_view({'get': 'list'})
+        positions = list(self.activities.order_by(
+            'start_time', 'id').values_list('start_time', 'id')[90000:90011])
+
+        paginator = pagination.ActivityCursorPagination()
+        paginator.base_url = self.url
+        url = paginator.encode_cursor(pagination.Cursor(
+            positions[0][0], positions[0][1], reverse=False))
+
+        # The bounds of the archive, the ETag, and the page.
+        with self.assertNumQueries(3):
+            response = view(self.factory.get(url))
+
+        self.assertEqual(
+            [pk for _, pk in positions[1:]],
+            [item['id'] for item in response.data['results']])
@@ -0,0 +1,215 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import force_authenticate
+
+from timetracker import archive, models, projects, serializers, views
+from timetracker.testing_utils import (
+    RequestTestMixin, create_activities, create_activity)
+
+
+class TestProjectAssignment(TestCase):
+    """Test cases for assigning activities to projects."""
+
+    def test_bulk_create(self):
+        """Test creating activities in bulk.
+
+        Each distinct title should get a single project.
+        """
+        serializer = serializers.ActivitySerializer(
+            data=[{'title': 'A'}, {'title': 'B'}, {'title': 'A'}], many=True)
+        serializer.is_valid(raise_exception=True)
+        activities = serializer.save()
+
+        self.assertEqual(2, models.Project.objects.count())
+        self.assertEqual(activities[0].project_id, activities[2].project_id)
+        self.assertEqual('B', activities[1].project.name)
+
+    def test_bulk_update(self):
+        """Test changing the titles of activities in bulk."""
+        activity = create_activity(title='A')
+
+        serializer = serializers.ActivitySerializer(
+            [activity], data=[{'title': 'B'}], many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        activity.refresh_from_db()
+        self.assertEqual('B', activity.project.name)
+
+    def test_create(self):
+        """Test creating activities with the same title.
+
+        They should share a project named after their title.
+        """
+        first = create_activity(title='A')
+        second = create_activity(title='A')
+
+        self.assertEqual(first.project_id, second.project_id)
+        self.assertEqual('A', first.project.name)
+
+    def test_create_activities(self):
+        """Test creating activities using the test factory."""
+        activities = create_activities(4, titles=('A', 'B'))
+
+        self.assertEqual(
+            ['A', 'B', 'A', 'B'],
+            [activity.project.name for activity in activities])
+
+    def test_update(self):
+        """Test changing an activity's title.
+
+        The activity should be moved to the new title's project, and
+        saving it again shouldn't look the project up again.
+        """
+        activity = models.Activity.objects.get(pk=create_activity().pk)
+        activity.title = 'Renamed'
+        activity.save()
+
+        self.assertEqual('Renamed', activity.project.name)
+
+        activity.end_time = activity.start_time + timedelta(hours=1)
+        with CaptureQueriesContext(connection) as queries:
+            activity.save()
+
+        self.assertFalse(any(
+            models.Project._meta.db_table in query['sql']
+            for query in queries.captured_queries))
+
+
+class TestProjectCache(TestCase):
+    """Test cases for caching the ids of projects."""
+
+    def tearDown(self):
+        """Forget the project ids cached by the test."""
+        projects.clear()
+
+    def test_cached(self):
+        """Test getting the ids of cached projects.
+
+        The database shouldn't be queried.
+        """
+        project = models.Project.objects.create(name='A')
+        projects.remember(connection.alias, {'A': project.pk})
+
+        with self.assertNumQueries(0):
+            ids = models.Project.objects.get_ids(['A'])
+
+        self.assertEqual({'A': project.pk}, ids)
+
+    def test_delete(self):
+        """Test deleting a project.
+
+        The cached ids should be forgotten.
+        """
+        project = models.Project.objects.create(name='A')
+        projects.remember(connection.alias, {'A': project.pk})
+
+        project.delete()
+
+        self.assertEqual({}, projects.get_cached(connection.alias, ['A']))
+
+    @override_settings(TIMETRACKER_PROJECT_CACHE_SIZE=2)
+    def test_eviction(self):
+        """Test caching more projects than the cache can hold.
+
+        The least recently used project should be evicted.
+        """
+        projects.remember('default', {'A': 1, 'B': 2})
+        projects.get_cached('default', ['A'])
+        projects.remember('default', {'C': 3})
+
+        self.assertEqual(
+            {'A': 1, 'C': 3},
+            projects.get_cached('default', ['A', 'B', 'C']))
+
+    def test_uncommitted(self):
+        """Test getting the ids of projects inside a transaction.
+
+        Projects created inside the transaction shouldn't be cached
+        until it commits.
+        """
+        ids = models.Project.objects.get_ids(['A', 'B'])
+
+        self.assertEqual(['A', 'B'], sorted(ids))
+        self.assertEqual(
+            {}, projects.get_cached(connection.alias, ['A', 'B']))
+
+
+class TestProjectViews(RequestTestMixin, TestCase):
+    """Test cases for filtering activities by project."""
+
+    def setUp(self):
+        """Create activities with different titles."""
+        start = datetime(2016, 8, 1, 9)
+        self.first = create_activity(
+            title='A', start_time=start, end_time=start + timedelta(hours=1))
+        self.second = create_activity(
+            title='B', start_time=start, end_time=start + timedelta(hours=2))
+
+    def test_filter(self):
+        """Test listing the activities of a project."""
+        view = views.ActivityViewSet.as_view({'get': 'list'})
+        request = self.factory.get(
+            reverse('activity-list'), {'project': self.second.project_id})
+        response = view(request)
+
+        self.assertEqual(
+            [(self.second.pk, self.second.project_id)],
+            [(item['id'], item['project'])
+             for item in response.data['results']])
+
+    def test_list(self):
+        """Test listing the projects."""
+        view = views.ProjectViewSet.as_view({'get': 'list'})
+        response = view(self.factory.get(reverse('project-list')))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [{'id': self.first.project_id, 'name': 'A'},
+             {'id': self.second.project_id, 'name': 'B'}],
+            response.data)
+
+    @override_settings(TIMETRACKER_SCOPE_TO_OWNER=True)
+    def test_list_scoped(self):
+        """Test listing the projects of a user's activities.
+
+        The projects of their archived activities should be included,
+        and each project listed once.
+        """
+        user = User.objects.create_user('owner')
+        self.second.owner = user
+        self.second.save()
+        models.Activity.objects.create(owner=user, title='B')
+
+        archived = create_activity(
+            title='C', start_time=datetime(2016, 1, 1, 9),
+            end_time=datetime(2016, 1, 1, 10))
+        archived.owner = user
+        archived.save()
+        archive.archive_activities(datetime(2016, 2, 1))
+
+        view = views.ProjectViewSet.as_view({'get': 'list'})
+        request = self.factory.get(reverse('project-list'))
+        force_authenticate(request, user=user)
+        response = view(request)
+
+        self.assertEqual(
+            ['B', 'C'], [item['name'] for item in response.data])
+
+    def test_summary(self):
+        """Test summarizing the activities of a project."""
+        view = views.ActivityViewSet.as_view({'get': 'summary'})
+        request = self.factory.get(
+            reverse('activity-summary'), {'project': self.first.project_id})
+        response = view(request)
+
+        self.assertEqual(
+            [('A', '01:00:00')],
+            [(row['title'], row['total_duration']) for row in response.data])
@@ -0,0 +1,99 @@
+from datetime import date, datetime, timedelta
+
+from django.test import TestCase
+
+from timetracker import models, reports
+from timetracker.testing_utils import create_activity
+
+
+class TestSummarize(TestCase):
+    """Test cases for summarizing activities."""
+
+    def test_crossing_period(self):
+        """Test summarizing an activity spanning two days.
+
+        The activity's duration should be split between the two days,
+        and it should be counted in each of them.
+        """
+        create_activity(
+            title='Late',
+            start_time=datetime(2016, 8, 1, 23),
+            end_time=datetime(2016, 8, 2, 1, 30))
+
+        summary = reports.summarize(models.Activity.objects.all())
+
+        self.assertEqual(
+            [(date(2016, 8, 1), timedelta(hours=1), 1),
+             (date(2016, 8, 2), timedelta(hours=1, minutes=30), 1)],
+            [(row['period'], row['total_duration'], row['count'])
+             for row in summary])
+
+    def test_daily_totals(self):
+        """Test summarizing activities by day.
+
+        Activities with the same title on the same day should be
+        combined, and in-progress activities should be ignored.
+        """
+        start = datetime(2016, 8, 1, 9)
+        create_activity(
+            title='A', start_time=start, end_time=start + timedelta(hours=1))
+        create_activity(
+            title='A',
+            start_time=start + timedelta(hours=2),
+            end_time=start + timedelta(hours=5))
+        create_activity(
+            title='B', start_time=start, end_time=start + timedelta(hours=2))
+        create_activity(title='C', start_time=start)
+
+        # The contained and crossing activities, and the names of their
+        # projects.
+        with self.assertNumQueries(3):
+            summary = reports.summarize(models.Activity.objects.all())
+
+        self.assertEqual(2, len(summary))
+        self.assertEqual('A', summary[0]['title'])
+        self.assertEqual(date(2016, 8, 1), summary[0]['period'])
+        self.assertEqual(2, summary[0]['count'])
+        self.assertEqual(timedelta(hours=4), summary[0]['total_duration'])
+        self.assertEqual(timedelta(hours=2), summary[0]['average_duration'])
+        self.assertEqual('B', summary[1]['title'])
+        self.assertEqual(timedelta(hours=2), summary[1]['total_duration'])
+
+    def test_invalid_period(self):
+        """Test summarizing with an unknown period.
+
+        A `ValueError` should be raised.
+        """
+        with self.assertRaises(ValueError):
+            reports.summarize(models.Activity.objects.all(), 'year')
+
+    def test_monthly_totals(self):
+        """Test summarizing activities by month."""
+        for day in (1, 15, 31):
+            start = datetime(2016, 8, day, 9)
+            create_activity(start_time=start, end_time=start + timedelta(
+                hours=1))
+
+        summary = reports.summarize(models.Activity.objects.all(), 'month')
+
+        self.assertEqual(1, len(summary))
+        self.assertEqual(date(2016, 8, 1), summary[0]['period'])
+        self.assertEqual(3, summary[0]['count'])
+
+    def test_weekly_totals(self):
+        """Test summarizing activities by week.
+
+        Weeks start on Monday, so activities on Sunday and Monday should
+        be in different weeks.
+        """
+        # August 7th, 2016 was a Sunday.
+        for day in (6, 7, 8):
+            start = datetime(2016, 8, day, 9)
+            create_activity(start_time=start, end_time=start + timedelta(
+                hours=1))
+
+        summary = reports.summarize(models.Activity.objects.all(), 'week')
+
+        self.assertEqual(
+            [(date(2016, 8, 1), 2), (date(2016, 8, 8), 1)],
+            [(row['period'], row['count']) for row in summary])
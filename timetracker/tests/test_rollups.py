@@ -0,0 +1,295 @@
+from datetime import date, datetime, timedelta
+
+from django.core.management import CommandError, call_command
+from django.core.urlresolvers import reverse
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from rest_framework import status
+
+from timetracker import models, reports, rollups, serializers, views
+from timetracker.testing_utils import RequestTestMixin, create_activity
+
+
+def get_totals():
+    """Get the daily totals of every rollup.
+
+    Returns:
+        list: The day, title, count, and total duration of each total.
+    """
+    return [
+        (row['period'], row['title'], row['count'], row['total_duration'])
+        for row in rollups.get_daily_totals(
+            models.ActivityRollup.objects.all())
+    ]
+
+
+def get_summary():
+    """Get the daily summary computed from the activities.
+
+    Returns:
+        list: The day, title, count, and total duration of each total.
+    """
+    return [
+        (row['period'], row['title'], row['count'], row['total_duration'])
+        for row in reports.summarize(models.Activity.objects.all())
+    ]
+
+
+class TestIncrementalRollups(TestCase):
+    """Test cases for keeping the rollups up to date."""
+
+    def setUp(self):
+        """Create a completed activity."""
+        self.start = datetime(2016, 8, 1, 9)
+        self.activity = create_activity(
+            title='A',
+            start_time=self.start,
+            end_time=self.start + timedelta(hours=2))
+
+    def test_bulk_create(self):
+        """Test creating activities using the list serializer."""
+        serializer = serializers.ActivitySerializer(data=[
+            {'title': 'A', 'start_time': '2016-08-01T12:00:00',
+             'end_time': '2016-08-01T13:00:00'},
+            {'title': 'B', 'start_time': '2016-08-01T23:00:00',
+             'end_time': '2016-08-02T01:00:00'},
+        ], many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(get_summary(), get_totals())
+        self.assertEqual(
+            (date(2016, 8, 1), 'A', 2, timedelta(hours=3)), get_totals()[0])
+
+    def test_bulk_update(self):
+        """Test moving an activity to another title and day in bulk."""
+        activities = models.Activity.objects.in_bulk([self.activity.pk])
+        serializer = serializers.ActivitySerializer(
+            list(activities.values()),
+            data=[{'title': 'B',
+                   'start_time': '2016-08-03T09:00:00',
+                   'end_time': '2016-08-03T10:00:00'}],
+            many=True,
+            partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(
+            [(date(2016, 8, 3), 'B', 1, timedelta(hours=1))],
+            get_totals())
+
+    def test_create(self):
+        """Test creating activities.
+
+        Completed activities should be added to the rollups, and
+        in-progress activities should be ignored.
+        """
+        create_activity(
+            title='A',
+            start_time=self.start + timedelta(hours=3),
+            end_time=self.start + timedelta(hours=4))
+        create_activity(title='A', start_time=self.start)
+
+        self.assertEqual(
+            [(date(2016, 8, 1), 'A', 2, timedelta(hours=3))], get_totals())
+
+    def test_crossing_midnight(self):
+        """Test an activity spanning two days.
+
+        The rollups should match the daily summary.
+        """
+        create_activity(
+            title='Late',
+            start_time=datetime(2016, 8, 1, 23),
+            end_time=datetime(2016, 8, 2, 1, 30))
+
+        self.assertEqual(get_summary(), get_totals())
+
+    def test_delete(self):
+        """Test deleting the only activity of a day and title.
+
+        The empty rollup should be removed.
+        """
+        models.Activity.objects.all().delete()
+
+        self.assertFalse(models.ActivityRollup.objects.exists())
+
+    def test_insert_concurrent(self):
+        """Test inserting rollups another transaction inserted first.
+
+        The contributions should be added to the existing rollups.
+        """
+        models.ActivityRollup.objects.insert_missing([
+            models.ActivityRollup(
+                date=self.start.date(), title='A', count=1,
+                total_seconds=3600),
+            models.ActivityRollup(
+                date=self.start.date(), title='B', count=1,
+                total_seconds=1800),
+        ])
+
+        self.assertEqual([
+            (date(2016, 8, 1), 'A', 2, timedelta(hours=3)),
+            (date(2016, 8, 1), 'B', 1, timedelta(minutes=30)),
+        ], get_totals())
+        self.assertEqual(2, models.ActivityRollup.objects.count())
+
+    def test_unowned_unique(self):
+        """Test inserting a duplicate rollup without an owner.
+
+        The partial unique index should reject it.
+        """
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                models.ActivityRollup.objects.create(
+                    date=self.start.date(), title='A', count=1)
+
+    def test_stop(self):
+        """Test stopping an in-progress activity."""
+        create_activity(title='B', start_time=self.start)
+        models.Activity.objects.stop(end_time=self.start + timedelta(hours=1))
+
+        self.assertEqual(get_summary(), get_totals())
+
+    def test_update(self):
+        """Test changing an activity's title and end time.
+
+        The activity should be moved to its new rollup.
+        """
+        self.activity.title = 'B'
+        self.activity.end_time = self.start + timedelta(hours=3)
+        self.activity.save()
+
+        self.assertEqual(
+            [(date(2016, 8, 1), 'B', 1, timedelta(hours=3))], get_totals())
+
+    def test_update_unloaded(self):
+        """Test saving an activity that wasn't loaded from the database.
+
+        The activity's previous contribution should still be removed.
+        """
+        activity = models.Activity(
+            pk=self.activity.pk,
+            title='A',
+            start_time=self.start,
+            end_time=self.start + timedelta(hours=1))
+        activity.save()
+
+        self.assertEqual(
+            [(date(2016, 8, 1), 'A', 1, timedelta(hours=1))], get_totals())
+
+
+class TestRebuildRollups(TestCase):
+    """Test cases for rebuilding the rollups."""
+
+    def setUp(self):
+        """Create activities on several days."""
+        for day in range(1, 6):
+            start = datetime(2016, 8, day, 22)
+            create_activity(
+                title='A',
+                start_time=start,
+                end_time=start + timedelta(hours=3))
+            create_activity(
+                title='B', start_time=start, end_time=start)
+
+        self.expected = get_summary()
+
+    def test_command(self):
+        """Test rebuilding the rollups using the management command.
+
+        Rollups that drifted or are left over from deleted activities
+        should be replaced.
+        """
+        models.ActivityRollup.objects.update(count=7)
+        models.ActivityRollup.objects.create(
+            date=date(2015, 1, 1), title='Old', count=1)
+
+        output = StringIO()
+        call_command(
+            'rebuild_activity_rollups',
+            '--workers', '1',
+            '--chunk-days', '2',
+            stdout=output)
+
+        self.assertEqual(self.expected, get_totals())
+        self.assertIn(
+            'Created {} rollups.'.format(len(self.expected)),
+            output.getvalue())
+
+    def test_command_invalid_range(self):
+        """Test rebuilding a range of days that ends before it starts."""
+        with self.assertRaises(CommandError):
+            call_command(
+                'rebuild_activity_rollups',
+                '--start', '2016-08-03',
+                '--end', '2016-08-01',
+                stdout=StringIO())
+
+    def test_range(self):
+        """Test rebuilding some of the days.
+
+        Only the rollups of those days should be replaced.
+        """
+        models.ActivityRollup.objects.update(count=7)
+
+        rollups.rebuild_rollups(start=date(2016, 8, 2), end=date(2016, 8, 4))
+
+        counts = dict(models.ActivityRollup.objects.filter(
+            title='A').values_list('date', 'count'))
+        self.assertEqual(7, counts[date(2016, 8, 1)])
+        self.assertEqual(2, counts[date(2016, 8, 2)])
+        self.assertEqual(2, counts[date(2016, 8, 3)])
+        self.assertEqual(7, counts[date(2016, 8, 4)])
+
+
+class TestDailyTotalsView(RequestTestMixin, TestCase):
+    """Test cases for the daily totals view."""
+    url = reverse('activity-daily-totals')
+
+    def setUp(self):
+        """Transform `ActivityViewSet` to a normal view function."""
+        self.view = views.ActivityViewSet.as_view({'get': 'daily_totals'})
+
+    def test_daily_totals(self):
+        """Test getting the totals of a range of days.
+
+        The response should match the daily summary of those days.
+        """
+        for day in range(1, 4):
+            start = datetime(2016, 8, day, 9)
+            create_activity(
+                title='A',
+                start_time=start,
+                end_time=start + timedelta(hours=2))
+            create_activity(
+                title='B',
+                start_time=start,
+                end_time=start + timedelta(hours=1))
+
+        request = self.factory.get(self.url, {
+            'start': '2016-08-02',
+            'end': '2016-08-03',
+            'title': 'A',
+        })
+        with self.assertNumQueries(1):
+            response = self.view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(1, len(response.data))
+        self.assertEqual('A', response.data[0]['title'])
+        self.assertEqual('2016-08-02', response.data[0]['period'])
+        self.assertEqual('02:00:00', response.data[0]['total_duration'])
+
+    def test_invalid_date(self):
+        """Test requesting totals with an invalid date.
+
+        A 400 status code should be returned.
+        """
+        request = self.factory.get(self.url, {'start': 'yesterday'})
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('start', response.data)
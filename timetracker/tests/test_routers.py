@@ -0,0 +1,177 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.urlresolvers import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+
+from timetracker import cache, models, routers, views
+from timetracker.testing_utils import RequestTestMixin, create_activity
+
+
+@override_settings(TIMETRACKER_REPLICAS=['replica'])
+class TestReplicaRouter(TestCase):
+    """Test cases for routing queries to replicas."""
+
+    def setUp(self):
+        """Create a router to test."""
+        self.router = routers.ReplicaRouter()
+
+    def tearDown(self):
+        """Stop allowing replica reads."""
+        routers.set_replica_reads(False)
+
+    def test_other_apps(self):
+        """Test routing the models of other apps.
+
+        The router should leave them to the default routing.
+        """
+        routers.set_replica_reads(True)
+
+        self.assertIsNone(self.router.db_for_read(get_user_model()))
+        self.assertIsNone(self.router.db_for_write(get_user_model()))
+
+    def test_read(self):
+        """Test routing reads.
+
+        Reads should only go to the replica while replica reads are
+        enabled.
+        """
+        self.assertEqual('default', self.router.db_for_read(models.Activity))
+
+        routers.set_replica_reads(True)
+
+        self.assertEqual('replica', self.router.db_for_read(models.Activity))
+
+    @override_settings(TIMETRACKER_REPLICAS=['a', 'b'])
+    def test_pinned(self):
+        """Test reading repeatedly while replica reads are enabled.
+
+        Every read should go to the same replica until replica reads
+        are enabled again.
+        """
+        routers.set_replica_reads(True)
+        first = {self.router.db_for_read(models.Activity) for _ in range(3)}
+
+        routers.set_replica_reads(True)
+        second = {self.router.db_for_read(models.Activity) for _ in range(3)}
+
+        self.assertEqual(1, len(first))
+        self.assertEqual({'a', 'b'}, first | second)
+
+    @override_settings(TIMETRACKER_REPLICAS={'a': 2, 'b': 1})
+    def test_weights(self):
+        """Test reading from weighted replicas.
+
+        Each replica should be used by requests in proportion to its
+        weight.
+        """
+        aliases = []
+        for _ in range(6):
+            routers.set_replica_reads(True)
+            aliases.append(self.router.db_for_read(models.Activity))
+
+        self.assertEqual(4, aliases.count('a'))
+        self.assertEqual(2, aliases.count('b'))
+
+    def test_write(self):
+        """Test routing writes.
+
+        Writes should go to the default database, and later reads should
+        follow them there.
+        """
+        routers.set_replica_reads(True)
+
+        self.assertEqual('default', self.router.db_for_write(models.Activity))
+        self.assertEqual('default', self.router.db_for_read(models.Activity))
+
+
+@override_settings(
+    DATABASE_ROUTERS=['timetracker.routers.ReplicaRouter'],
+    TIMETRACKER_REPLICAS=['replica'])
+class TestReplicaViews(RequestTestMixin, TestCase):
+    """Test cases for the activity views reading from replicas."""
+    multi_db = True
+
+    def setUp(self):
+        """Create an activity that only exists on the default database."""
+        self.activity = create_activity()
+
+    def test_change_feed(self):
+        """Test reading the change feed.
+
+        The feed should be read from the default database.
+        """
+        view = views.ActivityViewSet.as_view({'get': 'changes'})
+        request = self.factory.get(
+            reverse('activity-changes'), {'since': 0})
+        response = view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [self.activity.pk], [c['id'] for c in response.data['changes']])
+
+    def test_export(self):
+        """Test exporting activities.
+
+        The activities should be read from the replica while the
+        response is streamed.
+        """
+        models.Activity.objects.using('replica').create(title='Replicated')
+
+        view = views.ActivityViewSet.as_view({'get': 'export'})
+        response = view(self.factory.get(reverse('activity-export')))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            ['Replicated'], [json.loads(line)['title'] for line in lines])
+
+    def test_list(self):
+        """Test listing activities.
+
+        The activities should be read from the replica.
+        """
+        replicated = models.Activity.objects.using('replica').create(
+            title='Replicated')
+
+        view = views.ActivityViewSet.as_view({'get': 'list'})
+        response = view(self.factory.get(reverse('activity-list')))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [replicated.pk],
+            [item['id'] for item in response.data['results']])
+
+    @override_settings(TIMETRACKER_CACHE_ENABLED=True)
+    def test_list_not_cached(self):
+        """Test listing activities from a replica with caching enabled.
+
+        The response shouldn't be cached, since the replica may lag
+        behind the changes that invalidate the cache.
+        """
+        caches['default'].clear()
+        cache.reset_stats()
+
+        view = views.ActivityViewSet.as_view({'get': 'list'})
+        view(self.factory.get(reverse('activity-list')))
+        view(self.factory.get(reverse('activity-list')))
+
+        self.assertEqual(0, cache.get_stats()['hits'])
+
+    def test_write(self):
+        """Test starting an activity.
+
+        The activity should be written to the default database, and the
+        request's reads should not use the replica afterwards.
+        """
+        view = views.ActivityViewSet.as_view({'post': 'start'})
+        response = view(self.factory.post(
+            reverse('activity-start'), {'title': 'New'}))
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertTrue(models.Activity.objects.using('default').filter(
+            pk=response.data['id']).exists())
+        self.assertFalse(routers.replica_reads_enabled())
@@ -1,6 +1,6 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from timetracker import models, serializers
@@ -70,10 +70,60 @@ class TestActivitySerializer(TestCase):
         expected = {
             'id': activity.id,
             'title': activity.title,
+            'project': activity.project_id,
             'start_time': activity.start_time.isoformat(),
             'end_time': activity.end_time.isoformat(),
+            'duration': '01:00:00',
         }
 
         serializer = serializers.ActivitySerializer(activity)
 
         self.assertEqual(expected, serializer.data)
+
+
+class TestActivityReadSerializer(TestCase):
+    """Test cases for the fast activity read serializer."""
+
+    def test_matches_model_serializer(self):
+        """Test the output of the read serializer.
+
+        Serializing activities or their values should produce the same
+        representation as `ActivitySerializer`.
+        """
+        end_time = timezone.now()
+        activities = [
+            create_activity(start_time=end_time - timedelta(hours=1),
+                            end_time=end_time),
+            create_activity(title='In Progress'),
+        ]
+
+        expected = serializers.ActivitySerializer(activities, many=True).data
+        rows = models.Activity.objects.order_by('pk').values(
+            *serializers.ActivityReadSerializer.fields)
+
+        self.assertEqual(
+            expected,
+            serializers.ActivityReadSerializer(activities, many=True).data)
+        self.assertEqual(
+            expected,
+            serializers.ActivityReadSerializer(list(rows), many=True).data)
+        self.assertEqual(
+            expected[0],
+            serializers.ActivityReadSerializer(activities[0]).data)
+
+    @override_settings(TIME_ZONE='UTC')
+    def test_compact_fields(self):
+        """Test serializing some fields in the compact representation.
+
+        Times should be given as seconds since the epoch and durations
+        as seconds.
+        """
+        activity = create_activity(
+            start_time=datetime(1970, 1, 2),
+            end_time=datetime(1970, 1, 2, 0, 1, 30))
+
+        serializer = serializers.ActivityReadSerializer(
+            activity, compact=True, fields=('start_time', 'duration'))
+
+        self.assertEqual(
+            {'start_time': 86400.0, 'duration': 90.0}, serializer.data)
@@ -0,0 +1,180 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from rest_framework import status
+
+from timetracker import models, sync, views
+from timetracker.testing_utils import RequestTestMixin, create_activity
+
+
+class TestSync(TestCase):
+    """Test cases for syncing activities."""
+
+    def test_full_sync(self):
+        """Test syncing without a token.
+
+        Every activity should be returned in pages, followed by a token
+        that only returns later changes.
+        """
+        activities = [create_activity(title=str(i)) for i in range(3)]
+
+        first = sync.sync(None, limit=2)
+        second = sync.sync(sync.decode_token(first['token']), limit=2)
+        third = sync.sync(sync.decode_token(second['token']), limit=2)
+
+        self.assertTrue(first['more'])
+        self.assertFalse(second['more'])
+        synced = first['activities'] + second['activities']
+
+        self.assertEqual(
+            [activity.pk for activity in activities],
+            [item['id'] for item in synced])
+        self.assertEqual([], third['activities'])
+        self.assertEqual(second['token'], third['token'])
+
+    def test_incremental_sync(self):
+        """Test syncing after a previous sync.
+
+        Only the changed activities should be returned, along with the
+        ids of deleted activities.
+        """
+        unchanged = create_activity(title='Unchanged')
+        updated = create_activity(title='Updated')
+        deleted = create_activity(title='Deleted')
+        deleted_pk = deleted.pk
+
+        token = sync.decode_token(sync.sync(None, limit=10)['token'])
+
+        updated.end_time = timezone.now()
+        updated.save()
+        deleted.delete()
+        created = create_activity(title='Created')
+
+        result = sync.sync(token, limit=10)
+
+        self.assertEqual(
+            [updated.pk, created.pk],
+            [item['id'] for item in result['activities']])
+        self.assertEqual([deleted_pk], result['deleted'])
+        self.assertNotIn(
+            unchanged.pk, [item['id'] for item in result['activities']])
+
+    def test_other_owners(self):
+        """Test syncing while only other owners change activities.
+
+        The token should move past their changes, so that it doesn't
+        expire once they are pruned.
+        """
+        owner = User.objects.create_user('owner')
+        other = User.objects.create_user('other')
+        token = sync.decode_token(sync.sync(None, 10, owner)['token'])
+
+        for _ in range(3):
+            models.Activity.objects.create(owner=other)
+
+        token = sync.decode_token(sync.sync(token, 10, owner)['token'])
+        sync.prune_changes(timezone.now() + timedelta(days=1))
+        result = sync.sync(token, 10, owner)
+
+        self.assertEqual([], result['activities'])
+        self.assertFalse(result['more'])
+
+    def test_pruned(self):
+        """Test syncing with a token from before pruned changes.
+
+        The sync should be rejected so that the client starts a full
+        sync.
+        """
+        create_activity()
+        token = sync.decode_token(sync.sync(None, limit=10)['token'])
+        create_activity()
+        create_activity()
+
+        sync.prune_changes(timezone.now() + timedelta(days=1))
+
+        with self.assertRaises(sync.SyncExpired):
+            sync.sync(token, limit=10)
+
+    def test_token_round_trip(self):
+        """Test encoding and decoding sync tokens."""
+        for token in (sync.SyncToken(12, None), sync.SyncToken(0, 5)):
+            self.assertEqual(
+                token, sync.decode_token(sync.encode_token(token)))
+
+        with self.assertRaises(ValueError):
+            sync.decode_token('not a token')
+
+
+class TestActivitySyncView(RequestTestMixin, TestCase):
+    """Test cases for the activity sync view."""
+    url = reverse('activity-sync')
+
+    def setUp(self):
+        """Transform `ActivityViewSet` to a normal view function."""
+        self.view = views.ActivityViewSet.as_view({'get': 'sync'})
+
+    def test_expired(self):
+        """Test syncing with an expired token.
+
+        A 410 status code should be returned.
+        """
+        token = sync.encode_token(sync.SyncToken(100, None))
+
+        response = self.view(self.factory.get(self.url, {'since': token}))
+
+        self.assertEqual(status.HTTP_410_GONE, response.status_code)
+
+    def test_invalid_token(self):
+        """Test syncing with an invalid token.
+
+        A 400 status code should be returned.
+        """
+        response = self.view(self.factory.get(self.url, {'since': 'nope'}))
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('since', response.data)
+
+    def test_sync(self):
+        """Test syncing activities.
+
+        The response should contain the activities and the token for
+        the next sync.
+        """
+        activity = create_activity()
+
+        response = self.view(self.factory.get(self.url))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [activity.pk],
+            [item['id'] for item in response.data['activities']])
+        self.assertFalse(response.data['more'])
+        self.assertEqual([], response.data['deleted'])
+
+
+class TestPruneChangesCommand(TestCase):
+    """Test cases for the `prune_changes` management command."""
+
+    def test_prune_changes(self):
+        """Test deleting old changes.
+
+        Changes older than the retention period should be deleted, but
+        the most recent change should always be kept.
+        """
+        for _ in range(3):
+            create_activity()
+
+        models.ActivityChange.objects.update(
+            created_at=timezone.now() - timedelta(days=31))
+
+        out = StringIO()
+        call_command('prune_changes', stdout=out)
+
+        self.assertEqual(1, models.ActivityChange.objects.count())
+        self.assertIn('Deleted 2 changes.', out.getvalue())
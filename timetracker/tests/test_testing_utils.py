@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+
+from timetracker import models, reports, rollups
+from timetracker.testing_utils import DatasetMixin, create_activities
+
+
+class TestCreateActivities(TestCase):
+    """Test cases for creating activities in bulk for tests."""
+
+    def test_even(self):
+        """Test creating evenly distributed activities.
+
+        The activities should start one interval apart, use the titles
+        in turn, and the last ones should be left in progress.
+        """
+        start_time = datetime(2016, 8, 1, 9)
+        activities = list(create_activities(
+            3,
+            in_progress=1,
+            start_time=start_time,
+            titles=('A', 'B')))
+
+        self.assertEqual(
+            [('A', start_time, start_time + timedelta(minutes=30)),
+             ('B', start_time + timedelta(hours=1),
+              start_time + timedelta(hours=1, minutes=30)),
+             ('A', start_time + timedelta(hours=2), None)],
+            [(a.title, a.start_time, a.end_time) for a in activities])
+        self.assertEqual(timedelta(minutes=30), activities[0].duration)
+
+    def test_invalid_distribution(self):
+        """Test creating activities with an unknown distribution."""
+        with self.assertRaises(ValueError):
+            create_activities(1, distribution='normal')
+
+    def test_random(self):
+        """Test creating randomly distributed activities.
+
+        The same seed should produce the same activities, and their
+        creation should be recorded like that of any other activity.
+        """
+        start_time = datetime(2016, 8, 1)
+        first = create_activities(
+            10, distribution='random', start_time=start_time)
+        second = create_activities(
+            10, distribution='random', start_time=start_time)
+
+        self.assertEqual(
+            list(first.values_list('start_time', 'end_time')),
+            list(second.values_list('start_time', 'end_time')))
+        self.assertEqual(20, models.ActivityChange.objects.count())
+        self.assertEqual(
+            reports.summarize(models.Activity.objects.all()),
+            rollups.get_daily_totals(models.ActivityRollup.objects.all()))
+
+
+class TestDatasetMixin(DatasetMixin, TestCase):
+    """Test cases for sharing a dataset between tests."""
+    dataset = 'month'
+
+    def test_dataset(self):
+        """Test the dataset being created for the test case."""
+        self.assertEqual(240, self.activities.count())
+        self.assertEqual(1, models.Activity.objects.active().count())
@@ -1,12 +1,15 @@
-from datetime import timedelta
+import json
+from datetime import datetime, timedelta
 
 from django.core.urlresolvers import reverse
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from rest_framework import status
 
-from timetracker import models, serializers, views
+from timetracker import models, renderers, serializers, views
 from timetracker.testing_utils import RequestTestMixin, create_activity
 
 
@@ -68,6 +71,41 @@ class TestActivityDetailView(RequestTestMixin, TestCase):
 
         self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
 
+    def test_not_modified(self):
+        """Test requesting an activity the client already has.
+
+        If the ETag or modification time sent by the client matches the
+        activity, a 304 status code should be returned.
+        """
+        activity = create_activity()
+
+        url = reverse('activity-detail', kwargs={'pk': activity.pk})
+        request = self.factory.get(url)
+        response = self.view(request, pk=activity.pk)
+
+        request = self.factory.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        etag_response = self.view(request, pk=activity.pk)
+
+        request = self.factory.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        date_response = self.view(request, pk=activity.pk)
+
+        self.assertEqual(
+            status.HTTP_304_NOT_MODIFIED, etag_response.status_code)
+        self.assertEqual(response['ETag'], etag_response['ETag'])
+        self.assertEqual(
+            status.HTTP_304_NOT_MODIFIED, date_response.status_code)
+
+        activity.title = 'New Title'
+        activity.save()
+
+        request = self.factory.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        response = self.view(request, pk=activity.pk)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
     def test_partial_update(self):
         """Test partially updating an `Activity` instance.
 
@@ -142,7 +180,31 @@ class TestActivityListView(RequestTestMixin, TestCase):
         response = self.view(request)
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(serializer.data, response.data)
+        self.assertEqual(serializer.data, response.data['results'])
+
+    @override_settings(TIME_ZONE='UTC')
+    def test_compact(self):
+        """Test listing activities using the compact renderer.
+
+        The results should be rendered as columns, with times and
+        durations given in seconds.
+        """
+        start_time = datetime(2016, 8, 1)
+        activity = create_activity(
+            start_time=start_time, end_time=start_time + timedelta(hours=1))
+
+        request = self.factory.get(
+            self.url,
+            {'fields': 'id,end_time,duration'},
+            HTTP_ACCEPT=renderers.CompactJSONRenderer.media_type)
+        response = self.view(request)
+        response.render()
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({
+            'fields': ['id', 'end_time', 'duration'],
+            'rows': [[activity.pk, 1470013200.0, 3600.0]],
+        }, json.loads(response.content.decode('utf-8'))['results'])
 
     def test_create(self):
         """Test creating a new `Activity` instance.
@@ -164,10 +226,96 @@ class TestActivityListView(RequestTestMixin, TestCase):
         self.assertEqual(data['start_time'], response.data['start_time'])
         self.assertEqual(data['end_time'], response.data['end_time'])
 
+    def test_not_modified(self):
+        """Test requesting a list the client already has.
+
+        If the client's ETag matches the list, a 304 status code should
+        be returned. Creating, updating, or deleting an activity should
+        change the list's ETag.
+        """
+        activity = create_activity(title='A1')
+
+        def get_etag_response(etag):
+            request = self.factory.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+            return self.view(request)
+
+        etag = self.view(self.factory.get(self.url))['ETag']
+        response = get_etag_response(etag)
+
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+        changes = [
+            lambda: create_activity(title='A2'),
+            lambda: models.Activity.objects.filter(pk=activity.pk).update(
+                title='New', updated_at=timezone.now() + timedelta(hours=1)),
+            lambda: models.Activity.objects.filter(pk=activity.pk).delete(),
+        ]
+
+        for change in changes:
+            change()
+            response = get_etag_response(etag)
+
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+            etag = response['ETag']
+
+    def test_fields(self):
+        """Test listing only some of the fields of activities.
+
+        Only the requested fields should be serialized, and only those
+        needed by the paginator should be selected as well.
+        """
+        activity = create_activity(title='A1')
+
+        request = self.factory.get(self.url, {'fields': 'end_time, id'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [{'id': activity.pk, 'end_time': None}],
+            response.data['results'])
+        self.assertNotIn('"title"', queries.captured_queries[-1]['sql'])
+
+    def test_fields_unknown(self):
+        """Test requesting a field activities don't have.
+
+        A 400 status code should be returned.
+        """
+        request = self.factory.get(self.url, {'fields': 'id,owner'})
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('fields', response.data)
+
+    def test_longest(self):
+        """Test listing the longest activities.
+
+        Completed activities should be listed from longest to shortest,
+        up to the given limit.
+        """
+        now = timezone.now()
+        activities = [
+            create_activity(start_time=now - timedelta(hours=hours),
+                            end_time=now)
+            for hours in (1, 3, 2)
+        ]
+        create_activity(start_time=now - timedelta(days=1))
+
+        view = views.ActivityViewSet.as_view({'get': 'longest'})
+        request = self.factory.get(reverse('activity-longest'), {'limit': 2})
+        response = view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [activities[1].pk, activities[2].pk],
+            [item['id'] for item in response.data])
+
     def test_no_activites(self):
         """Test the view with no activities.
 
-        If there are no `Activity` instances, an empty list should be
+        If there are no `Activity` instances, an empty page should be
         returned.
         """
         request = self.factory.get(self.url)
@@ -177,4 +325,405 @@ class TestActivityListView(RequestTestMixin, TestCase):
 
         response.render()
 
-        self.assertEqual([], response.data)
+        self.assertEqual([], response.data['results'])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+
+class TestActivityOverlapsView(RequestTestMixin, TestCase):
+    """Test cases for the activity overlaps view."""
+    url = reverse('activity-overlaps')
+
+    def setUp(self):
+        """Transform `ActivityViewSet` to a normal view function."""
+        self.view = views.ActivityViewSet.as_view({'get': 'overlaps'})
+
+    def test_invalid_window(self):
+        """Test searching a window that ends before it starts.
+
+        A 400 status code should be returned.
+        """
+        now = timezone.now()
+        request = self.factory.get(self.url, {
+            'start': now.isoformat(),
+            'end': (now - timedelta(hours=1)).isoformat(),
+        })
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_overlaps(self):
+        """Test listing overlapping activities.
+
+        Each overlapping pair should be returned along with the length
+        of the overlap.
+        """
+        now = timezone.now()
+        first = create_activity(
+            start_time=now - timedelta(hours=3),
+            end_time=now - timedelta(hours=1))
+        second = create_activity(
+            start_time=now - timedelta(hours=2),
+            end_time=now)
+        create_activity(
+            start_time=now - timedelta(hours=5),
+            end_time=now - timedelta(hours=4))
+
+        request = self.factory.get(self.url)
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(1, len(response.data))
+        self.assertEqual(first.pk, response.data[0]['first'])
+        self.assertEqual(second.pk, response.data[0]['second'])
+        self.assertEqual('01:00:00', response.data[0]['duration'])
+
+
+class TestActivitySummaryView(RequestTestMixin, TestCase):
+    """Test cases for the activity summary view."""
+    url = reverse('activity-summary')
+
+    def setUp(self):
+        """Transform `ActivityViewSet` to a normal view function."""
+        self.view = views.ActivityViewSet.as_view({'get': 'summary'})
+
+    def test_invalid_period(self):
+        """Test requesting an unknown period.
+
+        A 400 status code should be returned.
+        """
+        request = self.factory.get(self.url, {'period': 'decade'})
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('period', response.data)
+
+    def test_summary(self):
+        """Test summarizing activities.
+
+        The response should contain the serialized totals for each title
+        and period.
+        """
+        end_time = timezone.now().replace(hour=12)
+        create_activity(
+            title='A', start_time=end_time - timedelta(hours=2),
+            end_time=end_time)
+
+        request = self.factory.get(self.url, {'title': 'A'})
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(1, len(response.data))
+        self.assertEqual('A', response.data[0]['title'])
+        self.assertEqual(1, response.data[0]['count'])
+        self.assertEqual('02:00:00', response.data[0]['total_duration'])
+
+
+class TestActivityBulkView(RequestTestMixin, TestCase):
+    """Test cases for the bulk activity view."""
+    url = reverse('activity-bulk')
+
+    def setUp(self):
+        """Transform `ActivityViewSet` to a normal view function."""
+        self.view = views.ActivityViewSet.as_view({
+            'delete': 'bulk',
+            'patch': 'bulk',
+            'post': 'bulk',
+        })
+
+    def test_create(self):
+        """Test creating activities in bulk.
+
+        Sending a list of activities should create all of them in a
+        single insert, and record their creation in a single insert.
+        """
+        data = [{'title': 'A1'}, {'title': 'A2'}, {'title': 'A3'}]
+
+        request = self.factory.post(self.url, data, format='json')
+
+        # The inserts are wrapped in savepoints since the test case is
+        # already inside a transaction, and SQLite needs another query
+        # to get the ids of the new activities. The new titles' projects
+        # are looked up, created, and looked up again.
+        with self.assertNumQueries(12):
+            response = self.view(request)
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(
+            sorted(models.Activity.objects.values_list('pk', flat=True)),
+            [item['id'] for item in response.data])
+        self.assertEqual(
+            ['A1', 'A2', 'A3'],
+            list(models.Activity.objects.order_by('title').values_list(
+                'title', flat=True)))
+
+    def test_create_invalid(self):
+        """Test creating activities with an invalid item.
+
+        The errors for each item should be returned, and none of the
+        activities should be created.
+        """
+        data = [{'title': 'A1'}, {'start_time': 'never'}]
+
+        request = self.factory.post(self.url, data, format='json')
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual({}, response.data[0])
+        self.assertIn('title', response.data[1])
+        self.assertIn('start_time', response.data[1])
+        self.assertEqual(0, models.Activity.objects.count())
+
+    def test_delete(self):
+        """Test deleting activities in bulk.
+
+        The activities with the given ids should be deleted.
+        """
+        activity1 = create_activity()
+        activity2 = create_activity()
+        activity3 = create_activity()
+
+        data = {'ids': [activity1.pk, activity3.pk]}
+
+        request = self.factory.delete(self.url, data, format='json')
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        self.assertEqual(
+            [activity2.pk],
+            list(models.Activity.objects.values_list('pk', flat=True)))
+
+    def test_delete_queries(self):
+        """Test the queries made to delete many activities.
+
+        The number of queries shouldn't grow with the number of
+        activities, and their deletion should still be recorded and
+        removed from the rollups.
+        """
+        start = datetime(2016, 8, 1, 9)
+        activities = [
+            create_activity(
+                title='A', start_time=start,
+                end_time=start + timedelta(hours=1))
+            for _ in range(20)
+        ]
+
+        data = {'ids': [activity.pk for activity in activities]}
+        request = self.factory.delete(self.url, data, format='json')
+
+        # The activities are locked, read, and deleted, their deletion
+        # is recorded, and the rollup of their day and title is read and
+        # updated, inside savepoints.
+        with self.assertNumQueries(12):
+            response = self.view(request)
+
+        self.assertEqual(status.HTTP_204_NO_CONTENT, response.status_code)
+        self.assertFalse(models.Activity.objects.exists())
+        self.assertFalse(models.ActivityRollup.objects.exists())
+        self.assertEqual(
+            20, models.ActivityChange.objects.filter(
+                action=models.ActivityChange.DELETED).count())
+
+    def test_update(self):
+        """Test updating activities in bulk.
+
+        Each activity should be updated with the fields given for it.
+        """
+        activity1 = create_activity(title='A1')
+        activity2 = create_activity(title='A2')
+        end_time = timezone.now()
+
+        data = [
+            {'id': activity1.pk, 'title': 'New A1'},
+            {'id': activity2.pk, 'end_time': end_time.isoformat()},
+        ]
+
+        request = self.factory.patch(self.url, data, format='json')
+        response = self.view(request)
+
+        activity1.refresh_from_db()
+        activity2.refresh_from_db()
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            serializers.ActivitySerializer(
+                [activity1, activity2], many=True).data,
+            response.data)
+        self.assertEqual('New A1', activity1.title)
+        self.assertIsNone(activity1.end_time)
+        self.assertEqual('A2', activity2.title)
+        self.assertEqual(end_time, activity2.end_time)
+
+    def test_update_unknown_id(self):
+        """Test updating an activity that doesn't exist.
+
+        An error should be returned for the unknown item, and none of
+        the activities should be updated.
+        """
+        activity = create_activity(title='A1')
+
+        data = [
+            {'id': activity.pk, 'title': 'New A1'},
+            {'id': activity.pk + 1, 'title': 'Missing'},
+        ]
+
+        request = self.factory.patch(self.url, data, format='json')
+        response = self.view(request)
+
+        activity.refresh_from_db()
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual({}, response.data[0])
+        self.assertIn('id', response.data[1])
+        self.assertEqual('A1', activity.title)
+
+    def test_update_duplicate_id(self):
+        """Test updating the same activity with more than one item.
+
+        An error should be returned for each of the items, and the
+        activity shouldn't be updated.
+        """
+        activity = create_activity(title='A1')
+
+        data = [
+            {'id': activity.pk, 'title': 'First'},
+            {'id': activity.pk, 'title': 'Second'},
+        ]
+
+        request = self.factory.patch(self.url, data, format='json')
+        response = self.view(request)
+
+        activity.refresh_from_db()
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('id', response.data[0])
+        self.assertIn('id', response.data[1])
+        self.assertEqual('A1', activity.title)
+
+
+class TestActivityExportView(RequestTestMixin, TestCase):
+    """Test cases for the activity export view."""
+    url = reverse('activity-export')
+
+    def setUp(self):
+        """Transform `ActivityViewSet` to a normal view function."""
+        self.view = views.ActivityViewSet.as_view({'get': 'export'})
+
+    def test_export(self):
+        """Test exporting activities.
+
+        The response should stream the activities matching the filters
+        in the requested format.
+        """
+        create_activity(title='A1')
+        create_activity(title='B1')
+
+        request = self.factory.get(
+            self.url, {'file_format': 'csv', 'title': 'A'})
+        response = self.view(request)
+
+        content = b''.join(response.streaming_content).decode('utf-8')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('text/csv', response['Content-Type'])
+        self.assertEqual(2, len(content.splitlines()))
+
+    def test_invalid_format(self):
+        """Test requesting an unknown export format.
+
+        A 400 status code should be returned.
+        """
+        request = self.factory.get(self.url, {'file_format': 'xml'})
+        response = self.view(request)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+
+class TestActivityTimerViews(RequestTestMixin, TestCase):
+    """Test cases for starting and stopping activities."""
+
+    def setUp(self):
+        """Transform `ActivityViewSet` to normal view functions."""
+        self.start_view = views.ActivityViewSet.as_view({'post': 'start'})
+        self.stop_view = views.ActivityViewSet.as_view({'post': 'stop'})
+
+    def test_start(self):
+        """Test starting an activity.
+
+        The new activity should be created, and the activity that was
+        in progress should end when the new one starts.
+        """
+        running = create_activity(title='Running')
+
+        request = self.factory.post(reverse('activity-start'), {
+            'title': 'New',
+        })
+        response = self.view_and_refresh(self.start_view, request, running)
+
+        new = models.Activity.objects.get(pk=response.data['id'])
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual('New', new.title)
+        self.assertEqual(new.start_time, running.end_time)
+        self.assertEqual([new], list(models.Activity.objects.active()))
+
+    def test_start_before_running(self):
+        """Test starting an activity before the one in progress.
+
+        A 400 status code should be returned.
+        """
+        running = create_activity(title='Running')
+
+        request = self.factory.post(reverse('activity-start'), {
+            'title': 'New',
+            'start_time': (
+                running.start_time - timedelta(hours=2)).isoformat(),
+        })
+        response = self.view_and_refresh(self.start_view, request, running)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('start_time', response.data)
+        self.assertIsNone(running.end_time)
+
+    def test_stop(self):
+        """Test stopping the activity that is in progress."""
+        running = create_activity(title='Running')
+        end_time = timezone.now() + timedelta(minutes=5)
+
+        request = self.factory.post(reverse('activity-stop'), {
+            'end_time': end_time.isoformat(),
+        })
+        response = self.view_and_refresh(self.stop_view, request, running)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([running.pk], [item['id'] for item in response.data])
+        self.assertEqual(end_time, running.end_time)
+        self.assertFalse(models.Activity.objects.active().exists())
+
+    def test_stop_nothing_running(self):
+        """Test stopping when no activity is in progress.
+
+        A 409 status code should be returned.
+        """
+        create_activity(end_time=timezone.now())
+
+        request = self.factory.post(reverse('activity-stop'))
+        response = self.stop_view(request)
+
+        self.assertEqual(status.HTTP_409_CONFLICT, response.status_code)
+
+    def view_and_refresh(self, view, request, activity):
+        """Call a view and reload an activity afterwards.
+
+        Args:
+            view: The view to call.
+            request (Request): The request to pass to the view.
+            activity (Activity): The activity to reload.
+
+        Returns:
+            Response: The view's response.
+        """
+        response = view(request)
+        activity.refresh_from_db()
+
+        return response
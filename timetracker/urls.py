@@ -7,8 +7,12 @@ from timetracker import views
 
 router = DefaultRouter()
 router.register(r'activities', views.ActivityViewSet, base_name='activity')
+router.register(r'projects', views.ProjectViewSet, base_name='project')
 
 
 urlpatterns = [
     url(r'^', include(router.urls)),
+    url(r'^cache-stats/$', views.CacheStatsView.as_view(),
+        name='cache-stats'),
+    url(r'^metrics/$', views.MetricsView.as_view(), name='metrics'),
 ]
@@ -1,9 +1,784 @@
-from rest_framework import viewsets
+from itertools import islice
 
-from timetracker import models, serializers
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse
 
+from rest_framework import permissions, status, views, viewsets
+from rest_framework.decorators import list_route
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-class ActivityViewSet(viewsets.ModelViewSet):
-    """View set for viewing and editing `Activity` instances."""
+from timetracker import (
+    archive, cache, conditional, export, feed, filters, metrics, models,
+    overlaps, pagination, renderers, reports, rollups, routers, serializers,
+    sync)
+from timetracker.app_settings import app_settings
+
+
+class ActivityViewSet(metrics.InstrumentedViewMixin,
+                      routers.ReplicaViewMixin,
+                      viewsets.ModelViewSet):
+    """View set for viewing and editing `Activity` instances.
+
+    The list of activities is paginated using keyset pagination ordered
+    by ``(start_time, id)``, and can be filtered using the parameters
+    described in `ActivityFilterBackend`.
+
+    The list, detail, and summary views also read archived activities
+    when the requested time range reaches into the archive.
+
+    The list, detail, and report actions read from the replicas if
+    `ReplicaRouter` is installed. The change feed and sync read from the
+    default database, since their sequence numbers have to keep
+    increasing for each client.
+    """
+    filter_backends = (filters.ActivityFilterBackend,)
+    pagination_class = pagination.ActivityCursorPagination
     queryset = models.Activity.objects.all()
+    renderer_classes = (
+        api_settings.DEFAULT_RENDERER_CLASSES +
+        [renderers.CompactJSONRenderer])
+    replica_actions = (
+        'daily_totals', 'export', 'list', 'longest', 'overlaps', 'retrieve',
+        'summary')
     serializer_class = serializers.ActivitySerializer
+
+    def get_fields(self):
+        """Get the fields requested by the `fields` query parameter.
+
+        Returns:
+            tuple: The names of the requested fields, in the order they
+                are serialized in, or every field if none were requested.
+
+        Raises:
+            ValidationError: If an unknown field is requested.
+        """
+        all_fields = serializers.ActivityReadSerializer.fields
+
+        value = self.request.query_params.get('fields', '')
+        requested = set(name.strip() for name in value.split(','))
+        requested.discard('')
+
+        if not requested:
+            return all_fields
+
+        unknown = requested.difference(all_fields)
+        if unknown:
+            raise ValidationError({
+                'fields': ['Unknown fields: {}.'.format(
+                    ', '.join(sorted(unknown)))],
+            })
+
+        return tuple(name for name in all_fields if name in requested)
+
+    def get_archived_queryset(self):
+        """Get the archived activities the request may access.
+
+        Returns:
+            QuerySet: The owner's archived activities if activities are
+                scoped to their owners, otherwise every archived
+                activity.
+        """
+        queryset = models.ArchivedActivity.objects.all()
+
+        owner = self.get_owner()
+        if owner is not None:
+            queryset = queryset.filter(owner=owner)
+
+        return queryset
+
+    def get_combined_queryset(self):
+        """Get the filtered activities, including any archived ones.
+
+        The archive is only read if the request's filters can match
+        archived activities.
+
+        Returns:
+            The filtered activities, combined with the filtered archived
+                activities in a `CombinedQuerySet` if necessary.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+
+        params = filters.ActivityFilterBackend().get_filters(self.request)
+        if not archive.reaches_archive(params):
+            return queryset
+
+        return archive.CombinedQuerySet([
+            queryset,
+            self.filter_queryset(self.get_archived_queryset()),
+        ])
+
+    def get_owner(self):
+        """Get the user whose activities the request is scoped to.
+
+        Returns:
+            User: The authenticated user if ``TIMETRACKER_SCOPE_TO_OWNER``
+                is enabled, otherwise `None`.
+        """
+        if not app_settings.SCOPE_TO_OWNER:
+            return None
+
+        return self.request.user
+
+    def get_read_serializer(self, instance, many=False):
+        """Get the fast read serializer for a response.
+
+        The serializer only includes the fields requested by the client,
+        and uses compact representations if the compact renderer was
+        selected.
+
+        Args:
+            instance: The activity, or list of activities, to serialize.
+            many (bool, optional): Whether a list is being serialized.
+
+        Returns:
+            ActivityReadSerializer: The serializer for the activities.
+        """
+        compact = (self.request.accepted_renderer.format ==
+                   renderers.CompactJSONRenderer.format)
+
+        return serializers.ActivityReadSerializer(
+            instance, compact=compact, fields=self.get_fields(), many=many)
+
+    def get_permissions(self):
+        """Get the permissions required to use the view.
+
+        Returns:
+            list: The view's permissions, including a requirement to be
+                authenticated if activities are scoped to their owners.
+        """
+        permission_classes = list(self.permission_classes)
+        if app_settings.SCOPE_TO_OWNER:
+            permission_classes.append(permissions.IsAuthenticated)
+
+        return [permission() for permission in permission_classes]
+
+    def get_queryset(self):
+        """Get the activities the request may access.
+
+        Returns:
+            QuerySet: The owner's activities if activities are scoped to
+                their owners, otherwise every activity.
+        """
+        queryset = super(ActivityViewSet, self).get_queryset()
+
+        owner = self.get_owner()
+        if owner is not None:
+            queryset = queryset.filter(owner=owner)
+
+        return queryset
+
+    def perform_create(self, serializer):
+        """Save a new activity, assigning it to its owner.
+
+        Args:
+            serializer (ActivitySerializer): The serializer containing
+                the new activity's data.
+        """
+        serializer.save(owner=self.get_owner())
+
+    def list(self, request, *args, **kwargs):
+        """List activities using the fast read serializer.
+
+        Only the serialized fields are selected, and the rows are
+        serialized directly without creating model instances. Clients
+        can limit the fields to the ones given in the `fields` query
+        parameter. If the client already has the current version of the
+        list, a 304 response is returned instead. Archived activities are
+        included if the filters reach into the archive.
+
+        If caching is enabled, the serialized page is cached until an
+        activity is changed.
+        """
+        key, cached = self.get_cache_entry(request)
+        if cached is not None:
+            return self.get_cached_response(request, cached)
+
+        fields = self.get_fields()
+        queryset = self.get_combined_queryset()
+
+        etag = conditional.get_list_etag(request, queryset)
+        if conditional.is_not_modified(request, etag):
+            return conditional.not_modified(etag)
+
+        # The paginator needs the position of each activity.
+        position_fields = pagination.ActivityCursorPagination.position_fields
+        queryset = queryset.values(*fields + tuple(
+            name for name in position_fields if name not in fields))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_read_serializer(page, many=True)
+            with self.timed('serialize'):
+                data = serializer.data
+
+            response = self.get_paginated_response(data)
+        else:
+            serializer = self.get_read_serializer(queryset, many=True)
+            with self.timed('serialize'):
+                response = Response(serializer.data)
+
+        cache.set_response(key, response.data, etag)
+
+        return conditional.set_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve an activity using the fast read serializer.
+
+        Clients can limit the fields to the ones given in the `fields`
+        query parameter. If the client already has the current version
+        of the activity, a 304 response is returned instead. Activities
+        that aren't found are looked up in the archive.
+
+        If caching is enabled, the serialized activity is cached until
+        an activity is changed.
+        """
+        key, cached = self.get_cache_entry(request)
+        if cached is not None:
+            return self.get_cached_response(request, cached)
+
+        try:
+            activity = self.get_object()
+        except Http404:
+            activity = get_object_or_404(
+                self.get_archived_queryset(), pk=kwargs[self.lookup_field])
+
+        etag = conditional.get_detail_etag(request, activity)
+        if conditional.is_not_modified(request, etag, activity.updated_at):
+            return conditional.not_modified(etag, activity.updated_at)
+
+        with self.timed('serialize'):
+            data = self.get_read_serializer(activity).data
+
+        cache.set_response(key, data, etag, activity.updated_at)
+
+        return conditional.set_validators(
+            Response(data), etag, activity.updated_at)
+
+    def get_cache_entry(self, request):
+        """Look up the cached response to a request.
+
+        Responses read from a replica aren't cached, since a lagging
+        replica could return data from before a change that has already
+        invalidated the cache, which would then be served until the
+        response expired. Cached responses are still served.
+
+        Args:
+            request (Request): The request being responded to.
+
+        Returns:
+            tuple: The key to cache the response under, or `None` if it
+                shouldn't be cached, and the cached response, as
+                returned by `cache.get_response`.
+        """
+        key, cached = cache.get_response(request)
+        if routers.reads_from_replica(models.Activity):
+            key = None
+
+        return key, cached
+
+    def get_cached_response(self, request, cached):
+        """Build a response from a cached response.
+
+        Args:
+            request (Request): The request being responded to.
+            cached (dict): The cached response.
+
+        Returns:
+            Response: A 304 response if the client already has the
+                cached version, otherwise a response containing the
+                cached data.
+        """
+        etag = cached['etag']
+        last_modified = cached['last_modified']
+
+        if conditional.is_not_modified(request, etag, last_modified):
+            return conditional.not_modified(etag, last_modified)
+
+        return conditional.set_validators(
+            Response(cached['data']), etag, last_modified)
+
+    @list_route(methods=['delete', 'patch', 'post'])
+    def bulk(self, request):
+        """Create, update, or delete many activities at once.
+
+        A POST request creates an activity for each item in the list it
+        contains. A PATCH request updates the activity identified by the
+        `id` of each item in its list. A DELETE request deletes the
+        activities whose ids are given in its `ids` list.
+
+        Each request is handled in a single transaction, and if any item
+        is invalid, nothing is saved and the errors for each item are
+        returned.
+        """
+        handlers = {
+            'DELETE': self.bulk_destroy,
+            'PATCH': self.bulk_update,
+            'POST': self.bulk_create,
+        }
+
+        return handlers[request.method](request)
+
+    def bulk_create(self, request):
+        """Create the activities in a request's list of items.
+
+        Args:
+            request (Request): The request containing the activities.
+
+        Returns:
+            Response: A response containing the created activities.
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            self.perform_create(serializer)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_destroy(self, request):
+        """Delete the activities with the ids given in a request.
+
+        Ids that don't match an activity are ignored.
+
+        Args:
+            request (Request): The request containing the ids.
+
+        Returns:
+            Response: An empty response.
+        """
+        serializer = serializers.ActivityBulkDeleteSerializer(
+            data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            self.get_queryset().filter(
+                pk__in=serializer.validated_data['ids']).delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def bulk_update(self, request):
+        """Update the activities in a request's list of items.
+
+        Each item must contain the `id` of the activity to update, along
+        with the fields to change.
+
+        Args:
+            request (Request): The request containing the updates.
+
+        Returns:
+            Response: A response containing the updated activities.
+
+        Raises:
+            ValidationError: If any of the items are invalid, don't
+                match an activity, or match the same activity as another
+                item.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError({
+                'non_field_errors': ['Expected a list of items.'],
+            })
+
+        ids = []
+        for item in request.data:
+            try:
+                ids.append(int(item['id']))
+            except (KeyError, TypeError, ValueError):
+                ids.append(None)
+
+        activities = self.get_queryset().in_bulk(
+            [pk for pk in ids if pk is not None])
+
+        serializer = self.get_serializer(
+            [activities.get(pk) for pk in ids],
+            data=request.data,
+            many=True,
+            partial=True)
+
+        if serializer.is_valid():
+            errors = [{} for _ in ids]
+        else:
+            errors = [dict(item_errors) for item_errors in serializer.errors]
+
+        for pk, item_errors in zip(ids, errors):
+            if pk is None:
+                item_errors['id'] = ['A valid id is required.']
+            elif pk not in activities:
+                item_errors['id'] = ['Not found.']
+            elif ids.count(pk) > 1:
+                item_errors['id'] = ['Each activity can only be updated once.']
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        with transaction.atomic():
+            serializer.save()
+
+        return Response(serializer.data)
+
+    @list_route(
+        methods=['get'],
+        renderer_classes=(
+            api_settings.DEFAULT_RENDERER_CLASSES +
+            [renderers.EventStreamRenderer]))
+    def changes(self, request):
+        """List the changes made to activities.
+
+        Each change has a sequence number, and the `since` query
+        parameter gives the sequence number of the last change the
+        client has seen. Only the most recent change to each activity is
+        returned. Without `since`, no changes are returned and the
+        response only contains the current sequence number, which
+        clients should fetch before listing the activities.
+
+        If there are no changes, the request is held open for up to
+        `timeout` seconds (0 by default) until a change is made. Clients
+        accepting ``text/event-stream`` instead receive each change as a
+        server-sent event for up to ``TIMETRACKER_FEED_TIMEOUT``
+        seconds, and can resume using the ``Last-Event-ID`` header.
+        """
+        serializer = serializers.ActivityChangesQuerySerializer(
+            data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        since = serializer.validated_data.get('since')
+        limit = app_settings.MAX_PAGE_SIZE
+        owner = self.get_owner()
+
+        if request.accepted_renderer.format == 'event-stream':
+            last_event_id = request.META.get('HTTP_LAST_EVENT_ID', '')
+            if last_event_id.isdigit():
+                since = int(last_event_id)
+            elif since is None:
+                since = feed.get_sequence()
+
+            response = StreamingHttpResponse(
+                feed.iter_events(
+                    since, app_settings.FEED_TIMEOUT, limit, owner),
+                content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+
+            return response
+
+        if since is None:
+            return Response({'sequence': feed.get_sequence(), 'changes': []})
+
+        # The sequence number is read before waiting, so that no change
+        # made while waiting is skipped if the client gets none.
+        sequence = feed.get_sequence()
+
+        timeout = min(
+            serializer.validated_data.get('timeout', 0),
+            app_settings.FEED_TIMEOUT)
+        changes = feed.wait_for_changes(since, timeout, limit, owner)
+
+        return Response({
+            'sequence': (
+                changes[-1]['sequence'] if changes else max(since, sequence)),
+            'changes': changes,
+        })
+
+    @list_route(methods=['get'], url_path='daily-totals')
+    def daily_totals(self, request):
+        """Get the time spent on activities each day.
+
+        The totals are read from the daily rollups rather than computed
+        from the activities, and are in the same format as the daily
+        summary. They can be limited to the days from the `start` date
+        up to, but not including, the `end` date, and to the titles
+        starting with the `title` query parameter.
+        """
+        serializer = serializers.ActivityDailyTotalsQuerySerializer(
+            data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        owner = self.get_owner()
+        queryset = models.ActivityRollup.objects.all()
+        if owner is not None:
+            queryset = queryset.filter(owner=owner)
+        if 'start' in params:
+            queryset = queryset.filter(date__gte=params['start'])
+        if 'end' in params:
+            queryset = queryset.filter(date__lt=params['end'])
+        if 'title' in params:
+            queryset = queryset.filter(title__startswith=params['title'])
+
+        with self.timed('db'):
+            totals = rollups.get_daily_totals(queryset)
+
+        return Response(serializers.ActivitySummarySerializer(
+            totals, many=True).data)
+
+    @list_route(methods=['get'])
+    def export(self, request):
+        """Stream all activities matching the list view's filters.
+
+        The export format is chosen using the `file_format` query
+        parameter, which may be 'ndjson' (the default) or 'csv'.
+        """
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in export.FORMATS:
+            raise ValidationError({
+                'file_format': ['Must be one of: {}.'.format(
+                    ', '.join(sorted(export.FORMATS.keys())))],
+            })
+
+        exporter, content_type = export.FORMATS[file_format]
+
+        # The response is streamed after the request is handled and
+        # replica reads are disallowed again, so the activities are
+        # read from the request's database explicitly.
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.using(queryset.db)
+
+        response = StreamingHttpResponse(
+            exporter(queryset), content_type=content_type)
+        response['Content-Disposition'] = (
+            'attachment; filename="activities.{}"'.format(file_format))
+
+        return response
+
+    def get_limit(self, request, default=10):
+        """Get the number of items to return from a request.
+
+        The limit is given by the `limit` query parameter, and is capped
+        at the largest allowed page size.
+
+        Args:
+            request (Request): The request being responded to.
+            default (int, optional): The limit to use if none is given.
+
+        Returns:
+            int: The number of items to return.
+
+        Raises:
+            ValidationError: If the limit is not an integer.
+        """
+        try:
+            limit = int(request.query_params.get('limit', default))
+        except ValueError:
+            raise ValidationError({'limit': ['A valid integer is required.']})
+
+        return max(1, min(limit, app_settings.MAX_PAGE_SIZE))
+
+    @list_route(methods=['get'])
+    def longest(self, request):
+        """List the completed activities that lasted the longest.
+
+        The number of activities returned is given by the `limit` query
+        parameter, which defaults to 10. The same filters as the list
+        view are supported.
+        """
+        limit = self.get_limit(request)
+
+        queryset = self.filter_queryset(self.get_queryset()).completed()
+        rows = queryset.order_by('-duration', 'id').values(
+            *serializers.ActivityReadSerializer.fields)[:limit]
+
+        return Response(
+            serializers.ActivityReadSerializer(rows, many=True).data)
+
+    @list_route(methods=['get'])
+    def overlaps(self, request):
+        """List the pairs of activities that overlap each other.
+
+        The search can be limited to a window of time using the `start`
+        and `end` query parameters, and the number of overlaps returned
+        is given by the `limit` query parameter, which defaults to 100.
+        The same filters as the list view are supported.
+        """
+        serializer = serializers.ActivityOverlapWindowSerializer(
+            data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        limit = self.get_limit(request, default=100)
+        queryset = self.filter_queryset(self.get_queryset())
+
+        found = overlaps.find_overlaps(
+            queryset, **serializer.validated_data)
+
+        return Response(serializers.ActivityOverlapSerializer(
+            list(islice(found, limit)), many=True).data)
+
+    @list_route(methods=['post'])
+    def start(self, request):
+        """Start a new activity.
+
+        Any activity that is in progress is stopped at the time the new
+        activity starts, so that only one activity is ever in progress.
+        A new activity can't start before one that is in progress.
+        """
+        serializer = serializers.ActivityStartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            activity, _ = self.get_queryset().start(
+                owner=self.get_owner(), **serializer.validated_data)
+        except ValueError as e:
+            raise ValidationError({'start_time': [str(e)]})
+
+        return Response(
+            serializers.ActivityReadSerializer(activity).data,
+            status=status.HTTP_201_CREATED)
+
+    @list_route(methods=['post'])
+    def stop(self, request):
+        """Stop the activity that is in progress.
+
+        If no activity is in progress, a 409 response is returned.
+        """
+        serializer = serializers.ActivityStopSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        stopped = self.get_queryset().stop(**serializer.validated_data)
+        if not stopped:
+            return Response(
+                {'detail': 'No activity is in progress.'},
+                status=status.HTTP_409_CONFLICT)
+
+        return Response(
+            serializers.ActivityReadSerializer(stopped, many=True).data)
+
+    @list_route(methods=['get'])
+    def sync(self, request):
+        """Get the activities changed since a client last synced.
+
+        The `since` query parameter is the token returned by the
+        client's previous sync. Without it, a full sync is started. The
+        response contains the created or updated `activities`, the ids
+        of the `deleted` activities, the `token` for the next sync, and
+        whether there is `more` to sync straight away. The number of
+        items returned is given by the `limit` query parameter, which
+        defaults to the largest allowed page size.
+
+        If the token has expired, a 410 response is returned and the
+        client must start a full sync.
+        """
+        encoded = request.query_params.get('since')
+        if encoded:
+            try:
+                token = sync.decode_token(encoded)
+            except ValueError as e:
+                raise ValidationError({'since': [str(e)]})
+        else:
+            token = None
+
+        limit = self.get_limit(request, default=app_settings.MAX_PAGE_SIZE)
+
+        return Response(sync.sync(token, limit, self.get_owner()))
+
+    @list_route(methods=['get'])
+    def summary(self, request):
+        """Summarize the time spent on activities.
+
+        The totals are grouped by title and by the period given in the
+        `period` query parameter, which may be 'day' (the default),
+        'week', or 'month'. The same filters as the list view are
+        supported, and archived activities are included in the same way.
+        """
+        period = request.query_params.get('period', 'day')
+        if period not in reports.PERIODS:
+            raise ValidationError({
+                'period': ['Must be one of: {}.'.format(
+                    ', '.join(reports.PERIODS))],
+            })
+
+        queryset = self.get_combined_queryset()
+        if isinstance(queryset, archive.CombinedQuerySet):
+            summary = reports.merge_summaries(*[
+                reports.summarize(combined, period)
+                for combined in queryset.querysets])
+        else:
+            summary = reports.summarize(queryset, period)
+
+        serializer = serializers.ActivitySummarySerializer(summary, many=True)
+
+        return Response(serializer.data)
+
+
+class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
+    """View set for listing the projects activities belong to.
+
+    Clients can use the ids of the projects to filter activities using
+    the `project` query parameter. If activities are scoped to their
+    owners, only the projects of the user's activities are listed.
+    """
+    pagination_class = None
+    queryset = models.Project.objects.order_by('name')
+    serializer_class = serializers.ProjectSerializer
+
+    def get_permissions(self):
+        """Get the permissions required to use the view.
+
+        Returns:
+            list: The view's permissions, including a requirement to be
+                authenticated if activities are scoped to their owners.
+        """
+        permission_classes = list(self.permission_classes)
+        if app_settings.SCOPE_TO_OWNER:
+            permission_classes.append(permissions.IsAuthenticated)
+
+        return [permission() for permission in permission_classes]
+
+    def get_queryset(self):
+        """Get the projects the request may access.
+
+        Returns:
+            QuerySet: The projects of the user's current and archived
+                activities if activities are scoped to their owners,
+                otherwise every project.
+        """
+        queryset = super(ProjectViewSet, self).get_queryset()
+
+        if app_settings.SCOPE_TO_OWNER:
+            # Subqueries are used rather than joins, which would join
+            # every current and archived activity of each project.
+            user = self.request.user
+            queryset = queryset.filter(
+                Q(pk__in=models.Activity.objects.filter(
+                    owner=user).values('project')) |
+                Q(pk__in=models.ArchivedActivity.objects.filter(
+                    owner=user).values('project')))
+
+        return queryset
+
+
+class CacheStatsView(views.APIView):
+    """View reporting the hit and miss counts of the response cache.
+
+    The counts are specific to the process serving the request. Only
+    staff users can read them.
+    """
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        """Get the cache statistics.
+
+        Returns:
+            Response: A response containing the number of cache hits and
+                misses, and the ratio of hits to lookups.
+        """
+        return Response(cache.get_stats())
+
+
+class MetricsView(views.APIView):
+    """View reporting the measurements made by the instrumentation.
+
+    The totals are specific to the process serving the request, and are
+    only collected while ``TIMETRACKER_METRICS_ENABLED`` is true. Only
+    staff users can read them.
+    """
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        """Get the recorded metrics.
+
+        Returns:
+            Response: A response containing the totals recorded for each
+                endpoint.
+        """
+        return Response(metrics.get_metrics())